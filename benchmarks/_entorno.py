@@ -0,0 +1,71 @@
+"""
+Utilidades compartidas por los benchmarks: configuran Django contra una base
+SQLite temporal (con las migraciones aplicadas) para no tocar db.sqlite3.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def preparar_django(**opciones_bd):
+    sys.path.insert(0, str(RAIZ))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sweetify.settings')
+
+    import django
+    from django.conf import settings
+
+    directorio = tempfile.mkdtemp(prefix='sweetify-bench-')
+    settings.DATABASES['default']['NAME'] = os.path.join(directorio, 'bench.sqlite3')
+    settings.DATABASES['default'].update(opciones_bd)
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return directorio
+
+
+def crear_catalogo(productos=200, resenas_por_producto=10, stock=0):
+    from productos.models import Categoria, Producto, Reseña
+
+    categoria = Categoria.objects.create(nombre='Benchmark')
+    creados = Producto.objects.bulk_create([
+        Producto(nombre=f'Producto {i}', descripcion='Descripción de prueba ' * 5,
+                 precio=Decimal('9.90'), categoria=categoria, stock=stock)
+        for i in range(productos)
+    ])
+    Reseña.objects.bulk_create([
+        Reseña(producto=producto, nombre=f'Cliente {j}', comentario='Muy rico', calificacion=j % 5 + 1)
+        for producto in creados
+        for j in range(resenas_por_producto)
+    ], batch_size=1000)
+    return categoria, creados
+
+
+def en_hilos(funcion, hilos, repeticiones):
+    """Ejecuta `funcion` `repeticiones` veces en cada hilo y devuelve los segundos transcurridos."""
+    from django.db import connection
+
+    barrera = threading.Barrier(hilos + 1)
+
+    def trabajador():
+        barrera.wait()
+        try:
+            for _ in range(repeticiones):
+                funcion()
+        finally:
+            connection.close()
+
+    lista = [threading.Thread(target=trabajador) for _ in range(hilos)]
+    for hilo in lista:
+        hilo.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for hilo in lista:
+        hilo.join()
+    return time.perf_counter() - inicio
@@ -0,0 +1,72 @@
+"""
+Peticiones concurrentes al catálogo: despliegue WSGI (un hilo por petición) frente
+a ASGI con la vista síncrona de DRF y con las vistas asíncronas de
+productos/vistas_async.py.
+
+    python benchmarks/bench_asgi.py [--concurrencia 16] [--peticiones 25]
+
+Usa los manejadores de Django en proceso (Client / AsyncClient), sin servidor HTTP,
+para medir solo la aplicación. Con servidores reales la comparación equivale a
+`gunicorn sweetify.wsgi --threads N` frente a `uvicorn sweetify.asgi:application`.
+"""
+import argparse
+import asyncio
+import time
+
+from _entorno import crear_catalogo, en_hilos, preparar_django
+
+URL_SYNC = '/api/productos/'
+URL_ASYNC = '/api/async/productos/'
+
+
+def medir_wsgi(concurrencia, peticiones):
+    from django.test import Client
+
+    def peticion():
+        assert Client().get(URL_SYNC).status_code == 200
+
+    return en_hilos(peticion, concurrencia, peticiones)
+
+
+def medir_asgi(url, concurrencia, peticiones):
+    from django.test import AsyncClient
+
+    async def cliente():
+        client = AsyncClient()
+        for _ in range(peticiones):
+            response = await client.get(url)
+            assert response.status_code == 200
+
+    async def todos():
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+        return time.perf_counter() - inicio
+
+    return asyncio.run(todos())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--peticiones', type=int, default=25, help='peticiones por cliente')
+    args = parser.parse_args()
+
+    preparar_django()
+    from django.conf import settings
+    # Sin caché de respuestas ni restricción de host: se mide el trabajo completo de la vista
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    settings.ALLOWED_HOSTS = ['*']
+    crear_catalogo(productos=200, resenas_por_producto=10, stock=100)
+
+    total = args.concurrencia * args.peticiones
+    for nombre, medir in (
+        ('WSGI, vista DRF', lambda: medir_wsgi(args.concurrencia, args.peticiones)),
+        ('ASGI, vista DRF', lambda: medir_asgi(URL_SYNC, args.concurrencia, args.peticiones)),
+        ('ASGI, vista async', lambda: medir_asgi(URL_ASYNC, args.concurrencia, args.peticiones)),
+    ):
+        segundos = medir()
+        print(f'{nombre:>18}: {total / segundos:8.1f} peticiones/s  ({total} en {segundos:.2f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Filas por segundo al serializar el listado de productos y de reseñas: ModelSerializer
+sobre instancias frente a la ruta rápida de productos/rapido.py sobre `.values()`.
+
+    python benchmarks/bench_rapido.py [--productos 500] [--repeticiones 5]
+
+Cada medición incluye la consulta y la serialización (sin renderizar a JSON).
+"""
+import argparse
+import time
+
+from _entorno import crear_catalogo, preparar_django
+
+
+def medir(funcion, filas, repeticiones):
+    funcion()  # calentamiento
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return filas * repeticiones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--productos', type=int, default=500)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    preparar_django()
+    from django.test import RequestFactory
+    from productos.models import Producto, Reseña
+    from productos.rapido import ProductosRapidos, ReseñasRapidas
+    from productos.serializers import ProductoSerializer, ReseñaSerializer
+
+    crear_catalogo(productos=args.productos, resenas_por_producto=10)
+    context = {'request': RequestFactory().get('/api/productos/')}
+    productos = Producto.objects.con_resenas_recientes().con_stock_disponible().order_by('id')
+    resenas = Reseña.objects.order_by('id')
+
+    casos = (
+        ('productos', productos.count(),
+         lambda: ProductoSerializer(productos.all(), many=True, context=context).data,
+         lambda: ProductosRapidos(context).representar(
+             productos.prefetch_related(None).values(*ProductosRapidos(context).columnas()))),
+        ('reseñas', resenas.count(),
+         lambda: ReseñaSerializer(resenas.all(), many=True, context=context).data,
+         lambda: ReseñasRapidas(context).representar(resenas.values(*ReseñasRapidas(context).columnas()))),
+    )
+    for nombre, filas, serializer, rapida in casos:
+        normal = medir(serializer, filas, args.repeticiones)
+        veloz = medir(rapida, filas, args.repeticiones)
+        print(f'{nombre:>10}: serializer {normal:9.0f} filas/s   rápida {veloz:9.0f} filas/s   x{veloz / normal:.1f}')
+
+
+if __name__ == '__main__':
+    main()
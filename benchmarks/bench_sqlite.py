@@ -0,0 +1,95 @@
+"""
+Rendimiento de lectura/escritura concurrente en SQLite con la configuración por
+defecto de Django frente a la de sweetify/settings.py (WAL, busy_timeout,
+synchronous=NORMAL, mmap, cache_size, BEGIN IMMEDIATE y conexiones persistentes).
+
+    python benchmarks/bench_sqlite.py [--lectores 6] [--escritores 2] [--segundos 5]
+
+Cada configuración se ejecuta en su propio proceso y sobre una base nueva.
+"""
+import argparse
+import subprocess
+import sys
+import threading
+import time
+
+from _entorno import crear_catalogo, preparar_django
+
+CONFIG_BASE = {'OPTIONS': {}, 'CONN_MAX_AGE': 0}
+
+
+def ejecutar(modo, lectores, escritores, segundos):
+    preparar_django(**(CONFIG_BASE if modo == 'base' else {}))
+    from django.db import OperationalError, close_old_connections, connection
+    from productos import inventario
+    from productos.models import Producto, Reseña
+
+    _, productos = crear_catalogo(productos=200, resenas_por_producto=10, stock=10 ** 6)
+    ids = [producto.pk for producto in productos]
+    fin = time.perf_counter() + segundos
+    contadores = {'lecturas': 0, 'escrituras': 0, 'bloqueos': 0}
+    candado = threading.Lock()
+
+    def contar(clave):
+        with candado:
+            contadores[clave] += 1
+
+    def lector():
+        while time.perf_counter() < fin:
+            try:
+                list(Producto.objects.con_resenas_recientes().con_stock_disponible()[:20])
+                contar('lecturas')
+            except OperationalError:
+                contar('bloqueos')
+            # Equivale al fin de una petición: con CONN_MAX_AGE la conexión se reutiliza
+            close_old_connections()
+        connection.close()
+
+    def escritor(indice):
+        i = indice
+        while time.perf_counter() < fin:
+            producto_id = ids[i % len(ids)]
+            i += 1
+            try:
+                inventario.decrementar_stock(producto_id, 1)
+                Reseña.objects.create(producto_id=producto_id, nombre='Bench', comentario='Rico', calificacion=5)
+                contar('escrituras')
+            except OperationalError:
+                contar('bloqueos')
+            close_old_connections()
+        connection.close()
+
+    hilos = [threading.Thread(target=lector) for _ in range(lectores)]
+    hilos += [threading.Thread(target=escritor, args=(i,)) for i in range(escritores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    print(
+        f"{modo:>8}: {contadores['lecturas'] / segundos:8.0f} lecturas/s  "
+        f"{contadores['escrituras'] / segundos:8.0f} escrituras/s  "
+        f"{contadores['bloqueos']:5d} errores 'database is locked'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lectores', type=int, default=6)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--modo', choices=['base', 'ajustado'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        ejecutar(args.modo, args.lectores, args.escritores, args.segundos)
+        return
+    for modo in ('base', 'ajustado'):
+        subprocess.run([
+            sys.executable, __file__, '--modo', modo, '--lectores', str(args.lectores),
+            '--escritores', str(args.escritores), '--segundos', str(args.segundos),
+        ], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compara el decremento de stock anterior (refresh_from_db + save dentro de
+transaction.atomic) con el UPDATE condicional de productos.inventario.
+
+    python benchmarks/bench_stock.py [--hilos 8] [--operaciones 200]
+"""
+import argparse
+
+from _entorno import crear_catalogo, en_hilos, preparar_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hilos', type=int, default=8)
+    parser.add_argument('--operaciones', type=int, default=200, help="Decrementos por hilo")
+    args = parser.parse_args()
+
+    preparar_django(OPTIONS={'timeout': 30})
+    from django.db import OperationalError, transaction
+    from productos import inventario
+    from productos.models import Producto
+
+    total = args.hilos * args.operaciones
+    _, (producto,) = crear_catalogo(productos=1, resenas_por_producto=0, stock=total)
+
+    def anterior():
+        while True:
+            try:
+                with transaction.atomic():
+                    p = Producto.objects.get(pk=producto.pk)
+                    p.refresh_from_db()
+                    if p.stock >= 1:
+                        p.stock -= 1
+                        p.save()
+                return
+            except OperationalError:
+                continue
+
+    def condicional():
+        while True:
+            try:
+                inventario.decrementar_stock(producto.pk, 1)
+                return
+            except OperationalError:
+                continue
+
+    for nombre, funcion in (('read-modify-write', anterior), ('UPDATE condicional', condicional)):
+        Producto.objects.filter(pk=producto.pk).update(stock=total)
+        segundos = en_hilos(funcion, args.hilos, args.operaciones)
+        restante = Producto.objects.get(pk=producto.pk).stock
+        print(f"{nombre:>20}: {total / segundos:8.0f} decrementos/s  (stock final {restante}, esperado 0)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Categoria, Producto, Reseña  # 👈 añadimos Reseña
+from . import busqueda
+from .models import Categoria, Producto, Reseña, Reserva  # 👈 añadimos Reseña
 
 @admin.register(Producto)
 class ProductoAdmin(admin.ModelAdmin):
@@ -7,6 +8,12 @@ class ProductoAdmin(admin.ModelAdmin):
     list_filter = ['categoria', 'disponible']
     search_fields = ['nombre']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Índice FTS5 en lugar de recorrer la tabla con icontains
+        if not search_term:
+            return queryset, False
+        return queryset.filter(pk__in=busqueda.buscar_ids(search_term, limite=1000)), False
+
 @admin.register(Categoria)
 class CategoriaAdmin(admin.ModelAdmin):
     list_display = ['nombre']
@@ -17,3 +24,8 @@ class ReseñaAdmin(admin.ModelAdmin):
     list_filter = ['calificacion', 'producto']
     search_fields = ['nombre', 'comentario']
 
+
+@admin.register(Reserva)
+class ReservaAdmin(admin.ModelAdmin):
+    list_display = ['producto', 'cantidad', 'estado', 'creado_en', 'expira_en']
+    list_filter = ['estado']
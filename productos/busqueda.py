@@ -0,0 +1,72 @@
+"""
+Búsqueda de texto completo de productos.
+
+En SQLite usa las tablas FTS5 creadas en la migración 0009 (mantenidas por
+triggers, así que también cubren bulk_create/update y SQL directo): ranking
+BM25, prefijos para autocompletado y tokenización sin tildes. En otros motores
+recurre a `icontains`.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Producto
+
+# Peso de cada columna de productos_producto_fts en BM25 (nombre, descripcion)
+PESOS_PRODUCTO = (10.0, 1.0)
+# Una coincidencia solo en reseñas puntúa menos que una en el propio producto
+PESO_RESENAS = 0.5
+
+
+def terminos(texto):
+    return re.findall(r'\w+', texto or '')
+
+
+def consulta_fts(texto):
+    """Convierte el texto del usuario en una consulta FTS5 segura: cada término entre comillas y como prefijo."""
+    return ' '.join(f'"{termino}"*' for termino in terminos(texto))
+
+
+def buscar_ids(texto, limite=20, incluir_resenas=False):
+    """Ids de productos que coinciden con `texto`, del más al menos relevante."""
+    if not terminos(texto):
+        return []
+    if connection.vendor != 'sqlite':
+        return _buscar_ids_icontains(texto, limite, incluir_resenas)
+
+    consulta = consulta_fts(texto)
+    puntuaciones = {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid, bm25(productos_producto_fts, %s, %s) AS rango FROM productos_producto_fts "
+            "WHERE productos_producto_fts MATCH %s ORDER BY rango LIMIT %s",
+            [*PESOS_PRODUCTO, consulta, limite],
+        )
+        puntuaciones.update(cursor.fetchall())
+        if incluir_resenas:
+            cursor.execute(
+                'SELECT r.producto_id, MIN(f.rango) AS rango FROM ('
+                # `rank` equivale a bm25() (no se puede llamar a bm25() bajo un GROUP BY)
+                '    SELECT rowid, rank AS rango FROM productos_resena_fts '
+                '    WHERE productos_resena_fts MATCH %s'
+                ') f JOIN "productos_reseña" r ON r.id = f.rowid '
+                'GROUP BY r.producto_id ORDER BY rango LIMIT %s',
+                [consulta, limite],
+            )
+            for producto_id, rango in cursor.fetchall():
+                # BM25 en FTS5 es negativo: cuanto menor, más relevante
+                rango *= PESO_RESENAS
+                if rango < puntuaciones.get(producto_id, 0):
+                    puntuaciones[producto_id] = rango
+    return sorted(puntuaciones, key=puntuaciones.get)[:limite]
+
+
+def _buscar_ids_icontains(texto, limite, incluir_resenas):
+    filtro = Q()
+    for termino in terminos(texto):
+        coincide = Q(nombre__icontains=termino) | Q(descripcion__icontains=termino)
+        if incluir_resenas:
+            coincide |= Q(resenas__comentario__icontains=termino)
+        filtro &= coincide
+    return list(Producto.objects.filter(filtro).distinct().order_by('id').values_list('id', flat=True)[:limite])
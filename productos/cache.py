@@ -0,0 +1,79 @@
+"""
+Caché de respuestas de las vistas de lectura del catálogo.
+
+Cada modelo tiene una "generación" en la caché; la clave de una respuesta
+incluye el host, la ruta, los parámetros de consulta (filtros, orden, cursor...), el
+formato y las generaciones de los modelos de los que depende la vista. Una
+escritura cambia la generación de los modelos afectados, así que solo dejan de
+usarse las respuestas que podían haber cambiado.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+PREFIJO = 'catalogo'
+CLAVE_ACIERTOS = f'{PREFIJO}:aciertos'
+CLAVE_FALLOS = f'{PREFIJO}:fallos'
+
+
+def obtener_cache():
+    return caches[settings.PRODUCTOS_CACHE_ALIAS]
+
+
+def _clave_generacion(modelo):
+    return f'{PREFIJO}:gen:{modelo._meta.label_lower}'
+
+
+def _nueva_generacion():
+    # Valores únicos (no un contador): una generación desalojada de la caché no
+    # puede volver a coincidir con respuestas antiguas
+    return time.time_ns()
+
+
+def generaciones(modelos):
+    cache = obtener_cache()
+    claves = [_clave_generacion(modelo) for modelo in modelos]
+    valores = cache.get_many(claves)
+    for clave in claves:
+        if clave not in valores:
+            cache.add(clave, _nueva_generacion(), None)
+            valores[clave] = cache.get(clave)
+    return [valores[clave] for clave in claves]
+
+
+def invalidar(modelos):
+    obtener_cache().set_many({_clave_generacion(modelo): _nueva_generacion() for modelo in modelos}, None)
+
+
+def clave_respuesta(request, modelos, extra=()):
+    parametros = sorted((clave, sorted(valores)) for clave, valores in request.query_params.lists())
+    # El host forma parte de la clave: las respuestas contienen URLs absolutas
+    partes = [
+        request.get_host(), request.path, repr(parametros), request.accepted_renderer.format,
+        *map(str, generaciones(modelos)), *map(str, extra),
+    ]
+    return f'{PREFIJO}:respuesta:' + hashlib.sha1('|'.join(partes).encode()).hexdigest()
+
+
+def registrar(acierto):
+    cache = obtener_cache()
+    clave = CLAVE_ACIERTOS if acierto else CLAVE_FALLOS
+    try:
+        cache.incr(clave)
+    except ValueError:
+        if not cache.add(clave, 1, None):
+            cache.incr(clave)
+
+
+def estadisticas():
+    valores = obtener_cache().get_many([CLAVE_ACIERTOS, CLAVE_FALLOS])
+    aciertos = valores.get(CLAVE_ACIERTOS, 0)
+    fallos = valores.get(CLAVE_FALLOS, 0)
+    total = aciertos + fallos
+    return {
+        'aciertos': aciertos,
+        'fallos': fallos,
+        'tasa_aciertos': round(aciertos / total, 4) if total else None,
+    }
@@ -0,0 +1,84 @@
+"""
+Mantenimiento de los agregados de calificación desnormalizados en Producto
+(total de reseñas, suma, promedio e histograma de 1 a 5 estrellas).
+"""
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from .models import Producto, Reseña
+
+ESTRELLAS = range(1, 6)
+CAMPOS_AGREGADOS = [
+    'resenas_count', 'calificacion_suma', 'calificacion_promedio',
+    *(f'estrellas_{i}' for i in ESTRELLAS),
+    'actualizado_en',
+]
+
+
+def _promedio(suma, total):
+    return Coalesce(Cast(suma, FloatField()) / NullIf(total, Value(0)), Value(0.0))
+
+
+def aplicar_resena(producto_id, calificacion, signo=1):
+    """
+    Suma (signo=1) o resta (signo=-1) una reseña a los agregados de su producto
+    con un único UPDATE atómico sobre los valores actuales de la fila.
+    """
+    total = F('resenas_count') + signo
+    suma = F('calificacion_suma') + signo * calificacion
+    campos = {
+        'resenas_count': total,
+        'calificacion_suma': suma,
+        'calificacion_promedio': _promedio(suma, total),
+        'actualizado_en': timezone.now(),
+    }
+    if calificacion in ESTRELLAS:
+        campos[f'estrellas_{calificacion}'] = F(f'estrellas_{calificacion}') + signo
+    Producto.objects.filter(pk=producto_id).update(**campos)
+
+
+def recalcular(producto_ids=None, batch_size=500):
+    """
+    Recalcula desde cero los agregados de los productos indicados (o de todos)
+    con una consulta agregada y actualizaciones por lotes.
+    """
+    resenas = Reseña.objects.all()
+    if producto_ids is not None:
+        producto_ids = list(producto_ids)
+        if not producto_ids:
+            return 0
+        resenas = resenas.filter(producto_id__in=producto_ids)
+    agregados = {
+        fila['producto_id']: fila
+        for fila in resenas.order_by().values('producto_id').annotate(
+            total=Count('id'),
+            suma=Sum('calificacion'),
+            **{f'e{i}': Count('id', filter=Q(calificacion=i)) for i in ESTRELLAS},
+        )
+    }
+    if producto_ids is None:
+        producto_ids = Producto.objects.values_list('id', flat=True).iterator()
+
+    ahora = timezone.now()
+    actualizados = 0
+    lote = []
+    for producto_id in producto_ids:
+        fila = agregados.get(producto_id, {})
+        total = fila.get('total', 0)
+        suma = fila.get('suma') or 0
+        producto = Producto(
+            pk=producto_id,
+            resenas_count=total,
+            calificacion_suma=suma,
+            calificacion_promedio=suma / total if total else 0.0,
+            **{f'estrellas_{i}': fila.get(f'e{i}', 0) for i in ESTRELLAS},
+            actualizado_en=ahora,
+        )
+        lote.append(producto)
+        if len(lote) >= batch_size:
+            actualizados += Producto.objects.bulk_update(lote, CAMPOS_AGREGADOS)
+            lote = []
+    if lote:
+        actualizados += Producto.objects.bulk_update(lote, CAMPOS_AGREGADOS)
+    return actualizados
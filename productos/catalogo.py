@@ -0,0 +1,87 @@
+"""
+Versión global del catálogo.
+
+Cada escritura sobre categorías, productos, reseñas o reservas incrementa
+`VersionCatalogo.version` dentro de la misma transacción. Las vistas de lectura
+la usan como ETag/Last-Modified para responder 304 sin serializar nada, y la
+caché de respuestas (productos/cache.py) invalida lo que depende de los modelos
+modificados.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F, Subquery
+from django.utils import timezone
+
+from . import cache
+from .models import Reserva, VersionCatalogo
+
+# Modelos pendientes dentro de cambios_agrupados() (None fuera del bloque)
+_pendientes = ContextVar('catalogo_pendientes', default=None)
+
+
+def version_actual():
+    """Devuelve `(version, actualizado_en)` con una sola consulta."""
+    fila = VersionCatalogo.objects.filter(pk=1).values_list('version', 'actualizado_en').first()
+    if fila is None:
+        fila = (0, VersionCatalogo.objects.get_or_create(pk=1)[0].actualizado_en)
+    return fila
+
+
+def version_con_reservas(ahora=None):
+    """
+    Como version_actual(), para respuestas que incluyen el stock disponible:
+    una reserva que vence lo cambia sin escribir nada hasta que pasa
+    expirar_reservas. Devuelve `(version, modificado, proximo_vencimiento)`,
+    donde `modificado` cuenta también la última reserva activa ya vencida y
+    `proximo_vencimiento` es el de la primera reserva activa aún vigente (o
+    None). Sigue siendo una sola consulta.
+    """
+    ahora = ahora or timezone.now()
+    activas = Reserva.objects.filter(estado=Reserva.ACTIVA)
+    fila = VersionCatalogo.objects.filter(pk=1).annotate(
+        proximo=Subquery(activas.filter(expira_en__gt=ahora).order_by('expira_en').values('expira_en')[:1]),
+        vencida=Subquery(activas.filter(expira_en__lte=ahora).order_by('-expira_en').values('expira_en')[:1]),
+    ).values_list('version', 'actualizado_en', 'proximo', 'vencida').first()
+    if fila is None:
+        version, modificado = version_actual()
+        return version, modificado, Reserva.objects.activas(ahora).order_by('expira_en').values_list('expira_en', flat=True).first()
+    version, modificado, proximo, vencida = fila
+    return version, max(modificado, vencida) if vencida else modificado, proximo
+
+
+def marcar_cambio(*modelos):
+    """
+    Incrementa la versión del catálogo (llamar dentro de la transacción de la
+    escritura) e invalida las respuestas en caché que dependen de `modelos`.
+    """
+    pendientes = _pendientes.get()
+    if pendientes is not None:
+        pendientes.add(None)
+        pendientes.update(modelos)
+        return
+    if not VersionCatalogo.objects.filter(pk=1).update(version=F('version') + 1, actualizado_en=timezone.now()):
+        VersionCatalogo.objects.create(pk=1, version=1)
+    if modelos:
+        # También tras el COMMIT: una lectura concurrente pudo cachear datos
+        # anteriores a la escritura con la generación recién invalidada
+        cache.invalidar(modelos)
+        transaction.on_commit(lambda: cache.invalidar(modelos))
+
+
+@contextmanager
+def cambios_agrupados():
+    """
+    Acumula las llamadas a marcar_cambio() del bloque (p. ej. las señales
+    post_delete de un borrado masivo, una por fila) y marca una sola vez al
+    salir sin errores.
+    """
+    pendientes = set()
+    token = _pendientes.set(pendientes)
+    try:
+        yield
+    finally:
+        _pendientes.reset(token)
+    if pendientes:
+        marcar_cambio(*(modelo for modelo in pendientes if modelo is not None))
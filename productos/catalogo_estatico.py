@@ -0,0 +1,116 @@
+"""
+Exportación del catálogo a JSON estático para servirlo desde un CDN o nginx.
+
+Genera en el directorio de destino:
+
+- `categoria-<id>.<hash>.json` con los productos disponibles de cada categoría
+  (imagen y variantes, precio y resumen de calificaciones). El nombre lleva el
+  hash del contenido, así que puede servirse con `Cache-Control: immutable`.
+- `manifest.json` (sin hash, caché corta) con la versión del catálogo y, por
+  categoría, el archivo vigente y la firma de las filas con que se generó.
+
+En cada ejecución solo se regeneran las categorías cuya firma cambió (productos
+añadidos, borrados, movidos o modificados, o la propia categoría). El stock no se
+exporta: cambia con cada venta y está en la API.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from .catalogo import version_actual
+from .models import Categoria, Producto
+from .rapido import ProductosRapidos
+from .renderers import ORJSONRenderer
+
+MANIFEST = 'manifest.json'
+CAMPOS = [
+    'id', 'nombre', 'descripcion', 'precio', 'imagen', 'imagen_srcset',
+    'resenas_count', 'calificacion_promedio',
+    'estrellas_1', 'estrellas_2', 'estrellas_3', 'estrellas_4', 'estrellas_5',
+]
+
+
+def firmas_categorias():
+    """`{categoria_id: (nombre, firma)}` en una sola consulta agregada."""
+    disponibles = Q(productos__disponible=True)
+    filas = Categoria.objects.annotate(
+        total=Count('productos', filter=disponibles),
+        ultimo=Max('productos__actualizado_en', filter=disponibles),
+        suma_ids=Sum('productos__id', filter=disponibles),
+    ).values_list('id', 'nombre', 'actualizado_en', 'total', 'ultimo', 'suma_ids')
+    return {
+        pk: (nombre, f'{actualizada.isoformat()}|{total}|{ultimo and ultimo.isoformat()}|{suma_ids or 0}')
+        for pk, nombre, actualizada, total, ultimo, suma_ids in filas
+    }
+
+
+def _escribir(ruta, contenido):
+    # Escritura atómica: nginx nunca sirve un archivo a medias
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, prefix='.tmp-')
+    with os.fdopen(descriptor, 'wb') as archivo:
+        archivo.write(contenido)
+    os.chmod(temporal, 0o644)
+    os.replace(temporal, ruta)
+
+
+def leer_manifest(destino):
+    try:
+        return json.loads((Path(destino) / MANIFEST).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {'categorias': {}}
+
+
+def exportar(destino, forzar=False, purgar=True):
+    """Exporta las categorías que cambiaron; devuelve `(regeneradas, total)`."""
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    anterior = leer_manifest(destino)['categorias']
+    firmas = firmas_categorias()
+
+    cambiadas = [
+        pk for pk, (_, firma) in firmas.items()
+        if forzar or anterior.get(str(pk), {}).get('firma') != firma
+        or not (destino / anterior[str(pk)]['archivo']).exists()
+    ]
+
+    productos = defaultdict(list)
+    if cambiadas:
+        rapida = ProductosRapidos(campos=CAMPOS, expandir=())
+        filas = Producto.objects.para_campos(CAMPOS).filter(
+            categoria__in=cambiadas, disponible=True
+        ).order_by('categoria', 'id').values(*rapida.columnas(['categoria']))
+        filas = list(filas)
+        for fila, item in zip(filas, rapida.representar(filas)):
+            productos[fila['categoria']].append(item)
+
+    renderer = ORJSONRenderer()
+    categorias = {}
+    for pk, (nombre, firma) in firmas.items():
+        if pk not in cambiadas:
+            categorias[str(pk)] = anterior[str(pk)]
+            continue
+        contenido = renderer.render({'categoria': {'id': pk, 'nombre': nombre}, 'productos': productos[pk]})
+        archivo = f'categoria-{pk}.{hashlib.sha256(contenido).hexdigest()[:12]}.json'
+        if not (destino / archivo).exists():
+            _escribir(destino / archivo, contenido)
+        categorias[str(pk)] = {
+            'nombre': nombre, 'archivo': archivo, 'productos': len(productos[pk]), 'firma': firma,
+        }
+
+    version, _ = version_actual()
+    manifest = {'version': version, 'generado_en': timezone.now().isoformat(), 'categorias': categorias}
+    # El manifest se escribe al final: siempre apunta a archivos ya completos
+    _escribir(destino / MANIFEST, renderer.render(manifest))
+
+    if purgar:
+        vigentes = {datos['archivo'] for datos in categorias.values()}
+        for ruta in destino.glob('categoria-*.json'):
+            if ruta.name not in vigentes:
+                ruta.unlink()
+    return len(cambiadas), len(firmas)
@@ -0,0 +1,120 @@
+"""
+Compresión gzip / brotli de las respuestas según `Accept-Encoding`.
+
+- Solo se comprimen tipos de texto (JSON, CSV, HTML...) de al menos
+  `COMPRESION_MINIMO_BYTES`: en respuestas pequeñas la cabecera gzip y el
+  tiempo de CPU no compensan.
+- Brotli se usa si el cliente lo acepta y el paquete `brotli` está instalado.
+- Las respuestas JSON cacheadas por CacheRespuestaMixin guardan también sus
+  bytes comprimidos (misma clave y mismas generaciones), así que un acierto de
+  caché no vuelve a comprimir el mismo JSON. El HTML de la API navegable no:
+  lleva el token CSRF de cada cliente.
+"""
+import gzip
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+from . import cache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - está en requirements; sin él se sirve gzip
+    brotli = None
+
+TIPOS_COMPRIMIBLES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml',
+    'application/x-ndjson', 'image/svg+xml',
+)
+RE_CODIFICACION = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$')
+
+
+def codificaciones_aceptadas(cabecera):
+    """`{codificación: q}` a partir de la cabecera Accept-Encoding."""
+    aceptadas = {}
+    for parte in cabecera.lower().split(','):
+        coincidencia = RE_CODIFICACION.match(parte)
+        if not coincidencia:
+            continue
+        try:
+            q = float(coincidencia[2]) if coincidencia[2] else 1.0
+        except ValueError:
+            continue
+        aceptadas[coincidencia[1]] = q
+    return aceptadas
+
+
+def elegir_codificacion(cabecera):
+    aceptadas = codificaciones_aceptadas(cabecera)
+    comodin = aceptadas.get('*', 0)
+    disponibles = ('br', 'gzip') if brotli is not None else ('gzip',)
+    candidatas = [(aceptadas.get(codificacion, comodin), codificacion) for codificacion in disponibles]
+    # Mayor q; a igualdad, el orden de preferencia (br antes que gzip)
+    q, codificacion = max(candidatas, key=lambda candidata: candidata[0])
+    return codificacion if q > 0 else None
+
+
+def comprimir(contenido, codificacion):
+    if codificacion == 'br':
+        return brotli.compress(contenido, quality=settings.COMPRESION_NIVEL_BROTLI)
+    # mtime=0: mismos bytes para el mismo contenido
+    return gzip.compress(contenido, compresslevel=settings.COMPRESION_NIVEL_GZIP, mtime=0)
+
+
+class CompresionMiddleware:
+    """Comprime las respuestas negociando la codificación. Admite WSGI y ASGI sin cambiar de hilo."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.procesar(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.procesar(request, await self.get_response(request))
+
+    def procesar(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(TIPOS_COMPRIMIBLES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.status_code != 200 or len(response.content) < settings.COMPRESION_MINIMO_BYTES:
+            return response
+        codificacion = elegir_codificacion(request.headers.get('Accept-Encoding', ''))
+        if codificacion is None:
+            return response
+
+        contenido = self.comprimido(response, codificacion)
+        if len(contenido) >= len(response.content):
+            return response
+        response.content = contenido
+        response['Content-Length'] = str(len(contenido))
+        response['Content-Encoding'] = codificacion
+        # Como GZipMiddleware: el cuerpo ya no es idéntico byte a byte
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def comprimido(self, response, codificacion):
+        clave = getattr(response, 'clave_cache', None)
+        # Solo el JSON es igual para todos los clientes con la misma clave
+        if clave is None or not isinstance(getattr(response, 'accepted_renderer', None), JSONRenderer):
+            return comprimir(response.content, codificacion)
+        almacen = cache.obtener_cache()
+        clave = f'{clave}:{codificacion}'
+        contenido = almacen.get(clave)
+        if contenido is None:
+            contenido = comprimir(response.content, codificacion)
+            almacen.set(clave, contenido, settings.PRODUCTOS_CACHE_TIMEOUT)
+        return contenido
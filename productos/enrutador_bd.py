@@ -0,0 +1,122 @@
+"""
+Enrutado de lecturas a una réplica de solo lectura.
+
+- Las acciones `list` y `retrieve` de los viewsets del catálogo leen de la
+  réplica (`REPLICA_ALIAS`) si está configurada en DATABASES.
+- Todas las escrituras van al primario, y tras una escritura las lecturas de la
+  misma petición también.
+- El cliente que escribió queda "pegado" al primario durante
+  `REPLICA_STICKY_SEGUNDOS` (cookie), para que lea lo que acaba de escribir
+  aunque la réplica vaya con retraso.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+COOKIE = 'ultima_escritura'
+
+_leer_de_replica = ContextVar('leer_de_replica', default=False)
+_escribio = ContextVar('escribio', default=False)
+# Cookie de escritura reciente: la petición lee del primario aunque no escriba
+_pegado = ContextVar('pegado', default=False)
+
+
+def replica_configurada():
+    return settings.REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def leyendo_de_replica():
+    """Envía a la réplica las lecturas hechas dentro del bloque (salvo que ya se haya escrito)."""
+    token = _leer_de_replica.set(True)
+    try:
+        yield
+    finally:
+        _leer_de_replica.reset(token)
+
+
+class EnrutadorReplica:
+    def db_for_read(self, model, **hints):
+        if _leer_de_replica.get() and not _escribio.get() and not _pegado.get() and replica_configurada():
+            return settings.REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _escribio.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica y primario contienen los mismos datos
+        return True
+
+
+class LecturaReplicaMixin:
+    """Marca las acciones de solo lectura del viewset para que lean de la réplica."""
+    acciones_replica = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        self._token_replica = _leer_de_replica.set(self.action in self.acciones_replica)
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_token_replica', None)
+        if token is not None:
+            _leer_de_replica.reset(token)
+            self._token_replica = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PrimarioTrasEscrituraMiddleware:
+    """
+    Aísla el estado del enrutador por petición y aplica la regla de lectura pegada al primario.
+    Admite WSGI y ASGI sin cambiar de hilo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _antes(self, request):
+        try:
+            ultima = float(request.COOKIES.get(COOKIE, 0))
+        except ValueError:
+            ultima = 0
+        pegado = time.time() - ultima < settings.REPLICA_STICKY_SEGUNDOS
+        return _pegado.set(pegado), _escribio.set(False), _leer_de_replica.set(False)
+
+    def _despues(self, response, escribio):
+        # Cada escritura renueva la ventana, también las hechas dentro de ella
+        if escribio:
+            response.set_cookie(COOKIE, str(time.time()), max_age=settings.REPLICA_STICKY_SEGUNDOS, httponly=True, samesite='Lax')
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token_pegado, token_escribio, token_replica = self._antes(request)
+        try:
+            response = self.get_response(request)
+            escribio = _escribio.get()
+        finally:
+            _pegado.reset(token_pegado)
+            _escribio.reset(token_escribio)
+            _leer_de_replica.reset(token_replica)
+        return self._despues(response, escribio)
+
+    async def __acall__(self, request):
+        token_pegado, token_escribio, token_replica = self._antes(request)
+        try:
+            response = await self.get_response(request)
+            escribio = _escribio.get()
+        finally:
+            _pegado.reset(token_pegado)
+            _escribio.reset(token_escribio)
+            _leer_de_replica.reset(token_replica)
+        return self._despues(response, escribio)
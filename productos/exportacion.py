@@ -0,0 +1,137 @@
+"""
+Exportación en streaming (NDJSON o CSV) de productos y reseñas.
+
+Las filas se leen con `.values().iterator(chunk_size)` (cursor del lado del
+servidor donde el backend lo admite) y se serializan trozo a trozo con la ruta
+rápida de productos/rapido.py, así que la memoria no depende del tamaño de la
+tabla: solo hay un trozo en memoria a la vez.
+
+Bajo ASGI Django acumularía entero un iterador síncrono antes de enviarlo, así
+que ahí el contenido es un generador asíncrono sobre `.aiterator(chunk_size)`.
+"""
+import csv
+import datetime
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+
+from .importacion import lotes
+from .renderers import ORJSONRenderer
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def parsear_fecha(valor, fin=False):
+    """Fecha u hora ISO 8601; una fecha sola es el inicio del día (o el del día siguiente si `fin`)."""
+    try:
+        dia = parse_date(valor)
+        momento = parse_datetime(valor) if dia is None else None
+    except ValueError:
+        dia = momento = None
+    if dia is not None:
+        if fin:
+            dia += datetime.timedelta(days=1)
+        momento = datetime.datetime.combine(dia, datetime.time.min)
+    elif momento is None:
+        raise serializers.ValidationError(f'Fecha no válida: "{valor}".')
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento
+
+
+class _Eco:
+    """Destino de csv.writer que devuelve cada línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def codificador(formato, columnas):
+    """`(cabecera, linea)`: la primera línea (o None) y la función que convierte cada item en una línea."""
+    if formato == 'ndjson':
+        renderer = ORJSONRenderer()
+        return None, lambda item: renderer.render(item) + b'\n'
+
+    escritor = csv.writer(_Eco())
+
+    def linea(item):
+        # Los valores anidados (variantes, reseñas, categoría) van como JSON en su celda
+        return escritor.writerow([
+            json.dumps(valor, ensure_ascii=False) if isinstance(valor, (dict, list)) else valor
+            for valor in map(item.get, columnas)
+        ])
+    return escritor.writerow(columnas), linea
+
+
+class ExportacionMixin:
+    """
+    Acción `exportar/` de solo lectura para administradores:
+    `?formato=ndjson|csv&categoria=<id>&desde=<fecha>&hasta=<fecha>`.
+    La vista declara `exportacion_campo_fecha` y `exportacion_campo_categoria`.
+    """
+    exportacion_campo_fecha = None
+    exportacion_campo_categoria = None
+
+    def filtrar_exportacion(self, queryset):
+        parametros = self.request.query_params
+        if parametros.get('categoria'):
+            try:
+                queryset = queryset.filter(**{self.exportacion_campo_categoria: int(parametros['categoria'])})
+            except ValueError:
+                raise serializers.ValidationError('La categoría debe ser un número entero.')
+        if parametros.get('desde'):
+            queryset = queryset.filter(**{f'{self.exportacion_campo_fecha}__gte': parsear_fecha(parametros['desde'])})
+        if parametros.get('hasta'):
+            queryset = queryset.filter(**{f'{self.exportacion_campo_fecha}__lt': parsear_fecha(parametros['hasta'], fin=True)})
+        return queryset
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def exportar(self, request):
+        formato = request.query_params.get('formato', 'ndjson')
+        if formato not in FORMATOS:
+            raise serializers.ValidationError(f'Formato no válido: use {" o ".join(FORMATOS)}.')
+
+        rapida = self.get_lista_rapida()
+        queryset = self.filtrar_exportacion(self.get_queryset()).prefetch_related(None).order_by('pk')
+        filas = queryset.values(*rapida.columnas())
+        tamano = settings.PRODUCTOS_EXPORTACION_CHUNK
+        cabecera, linea = codificador(formato, [nombre for nombre, _, _ in rapida.campos])
+
+        def contenido():
+            if cabecera:
+                yield cabecera
+            for trozo in lotes(filas.iterator(chunk_size=tamano), tamano):
+                yield from map(linea, rapida.representar(trozo))
+
+        async def contenido_async():
+            if cabecera:
+                yield cabecera
+            trozo = []
+            async for fila in filas.aiterator(chunk_size=tamano):
+                trozo.append(fila)
+                if len(trozo) == tamano:
+                    for item in await sync_to_async(rapida.representar)(trozo):
+                        yield linea(item)
+                    trozo = []
+            if trozo:
+                for item in await sync_to_async(rapida.representar)(trozo):
+                    yield linea(item)
+
+        asincrona = isinstance(request._request, ASGIRequest)
+        response = StreamingHttpResponse(
+            contenido_async() if asincrona else contenido(), content_type=FORMATOS[formato]
+        )
+        nombre = self.queryset.model._meta.model_name
+        response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+        return response
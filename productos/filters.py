@@ -0,0 +1,33 @@
+import django_filters
+from rest_framework.filters import OrderingFilter
+
+from .models import Producto
+
+
+class ProductoFilter(django_filters.FilterSet):
+    # Usa el promedio desnormalizado, sin agregar reseñas en cada consulta
+    calificacion_min = django_filters.NumberFilter(field_name='calificacion_promedio', lookup_expr='gte')
+
+    class Meta:
+        model = Producto
+        fields = ['categoria', 'disponible']
+
+
+class OrdenConDesempate(OrderingFilter):
+    """
+    Añade `id` al final del orden pedido para que la paginación sea determinista.
+    Sin `?ordering=`, un filtro de `orden_por_filtro` de la vista impone el orden
+    de su índice: un rango ordenado por id obligaría a recorrer la tabla.
+    """
+
+    def get_default_ordering(self, view):
+        for parametro, orden in getattr(view, 'orden_por_filtro', {}).items():
+            if view.request.query_params.get(parametro) not in (None, ''):
+                return orden
+        return super().get_default_ordering(view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering = [*ordering, 'id']
+        return ordering
@@ -0,0 +1,132 @@
+"""
+Variantes responsive de Producto.imagen (varios anchos en WebP).
+
+Se generan con Pillow en un pool de procesos, fuera del ciclo de la petición, y
+se guardan junto al original con el hash de los bytes WebP en el nombre
+(`productos/torta.3f2a9c1b0d4e.640w.webp`): otra calidad u otro ancho dan otro
+archivo, y uno existente con el mismo nombre ya tiene exactamente ese contenido. El mapa resultante se guarda en
+`Producto.imagen_variantes`:
+
+    {"origen": "productos/torta.jpg", "variantes": {"320": "...", "640": "..."}}
+
+Este módulo no importa modelos a nivel de módulo para que los procesos del pool
+puedan importarlo sin inicializar Django.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+
+def generar_variantes(ruta_absoluta, nombre, anchos, calidad):
+    """
+    Genera las variantes WebP de la imagen `nombre` (relativo a MEDIA_ROOT) y
+    devuelve `{ancho: nombre_variante}`. Se ejecuta en los procesos del pool.
+    """
+    from PIL import Image, ImageOps
+
+    base, _ = os.path.splitext(nombre)
+    directorio = os.path.dirname(ruta_absoluta)
+
+    with Image.open(ruta_absoluta) as original:
+        imagen = ImageOps.exif_transpose(original)
+        imagen = imagen.convert('RGBA' if 'A' in imagen.getbands() else 'RGB')
+        variantes = {}
+        # No se amplían imágenes: el ancho mayor posible es el del original
+        for ancho in sorted({min(ancho, imagen.width) for ancho in anchos}):
+            copia = imagen.copy()
+            copia.thumbnail((ancho, ancho * 10), Image.LANCZOS)
+            codificada = BytesIO()
+            copia.save(codificada, 'WEBP', quality=calidad, method=4)
+            contenido = codificada.getvalue()
+            digest = hashlib.sha256(contenido).hexdigest()[:12]
+            nombre_variante = f'{base}.{digest}.{copia.width}w.webp'
+            destino = os.path.join(directorio, os.path.basename(nombre_variante))
+            if not os.path.exists(destino):
+                with open(destino, 'wb') as archivo:
+                    archivo.write(contenido)
+            variantes[str(copia.width)] = nombre_variante
+    return variantes
+
+
+def argumentos_variantes(nombre):
+    return (
+        os.path.join(settings.MEDIA_ROOT, nombre),
+        nombre,
+        tuple(settings.PRODUCTOS_VARIANTES_ANCHOS),
+        settings.PRODUCTOS_VARIANTES_CALIDAD,
+    )
+
+
+def obtener_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.PRODUCTOS_VARIANTES_PROCESOS)
+    return _pool
+
+
+def guardar_variantes(producto_id, nombre, variantes):
+    """Guarda el mapa de variantes solo si el producto sigue teniendo esa imagen."""
+    from django.db import transaction
+    from django.utils import timezone
+
+    from .catalogo import marcar_cambio
+    from .models import Producto
+
+    with transaction.atomic():
+        actualizados = Producto.objects.filter(pk=producto_id, imagen=nombre).update(
+            imagen_variantes={'origen': nombre, 'variantes': variantes}, actualizado_en=timezone.now()
+        )
+        if actualizados:
+            marcar_cambio(Producto)
+    return actualizados
+
+
+def programar_variantes(producto_id, nombre):
+    """
+    Encola la generación de variantes de `nombre` para el producto. Con
+    PRODUCTOS_VARIANTES_SINCRONAS (pruebas) se generan en el mismo proceso.
+    """
+    if settings.PRODUCTOS_VARIANTES_SINCRONAS:
+        guardar_variantes(producto_id, nombre, generar_variantes(*argumentos_variantes(nombre)))
+        return
+
+    def al_terminar(futuro):
+        from django.db import connection
+
+        if futuro.exception() is not None:
+            logger.error("No se pudieron generar las variantes de %s", nombre, exc_info=futuro.exception())
+            return
+        try:
+            guardar_variantes(producto_id, nombre, futuro.result())
+        finally:
+            # El callback corre en un hilo del pool: no dejamos su conexión abierta
+            connection.close()
+
+    obtener_pool().submit(generar_variantes, *argumentos_variantes(nombre)).add_done_callback(al_terminar)
+
+
+def urls_variantes(producto, request=None):
+    """Mapa `{ancho: url}` de las variantes vigentes de la imagen del producto."""
+    return urls_de_variantes(producto.imagen.name, producto.imagen_variantes, request)
+
+
+def urls_de_variantes(imagen, variantes, request=None):
+    """Como `urls_variantes`, a partir del nombre de la imagen y del JSON de variantes."""
+    from django.core.files.storage import default_storage
+
+    datos = variantes or {}
+    if not imagen or datos.get('origen') != imagen:
+        return {}
+    urls = {}
+    for ancho, nombre in datos.get('variantes', {}).items():
+        url = default_storage.url(nombre)
+        urls[ancho] = request.build_absolute_uri(url) if request is not None else url
+    return urls
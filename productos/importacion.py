@@ -0,0 +1,341 @@
+"""
+Importación masiva de categorías, productos y reseñas desde CSV o NDJSON.
+
+Los archivos se leen en streaming y se procesan por lotes: cada lote se valida
+de una vez (conversiones y validadores de los campos del modelo, más las reglas
+de `Producto.clean()`), resuelve sus relaciones con una consulta o con el mapa
+de categorías en memoria y se guarda con `bulk_create` y `bulk_update` en su propia
+transacción. Las filas inválidas se rechazan con su número de línea y el motivo
+sin detener la importación; se entregan a `al_rechazar` lote a lote y el
+resultado solo guarda las primeras, así que la memoria no crece con el archivo.
+"""
+import csv
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .catalogo import marcar_cambio
+from .models import Categoria, Producto, Reseña
+
+VERDADEROS = {'1', 'true', 'si', 'sí', 'yes'}
+# Rechazos que conserva el resultado para el resumen
+PRIMEROS_RECHAZOS = 10
+FALSOS = {'0', 'false', 'no', ''}
+
+
+def leer_filas(archivo, formato):
+    """Genera `(línea, fila)` de un archivo abierto en modo texto, sin cargarlo entero."""
+    if formato == 'csv':
+        lector = csv.DictReader(archivo)
+        for fila in lector:
+            yield lector.line_num, fila
+        return
+    for linea, texto in enumerate(archivo, start=1):
+        if not texto.strip():
+            continue
+        try:
+            fila = json.loads(texto)
+        except ValueError as exc:
+            fila = exc
+        yield linea, fila
+
+
+def lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+@dataclass
+class Resultado:
+    filas: int = 0
+    creados: int = 0
+    actualizados: int = 0
+    rechazados: int = 0
+    # `(línea, errores)` de los primeros PRIMEROS_RECHAZOS rechazos
+    primeros_rechazos: list = field(default_factory=list)
+    segundos: float = 0.0
+
+    @property
+    def filas_por_segundo(self):
+        return self.filas / self.segundos if self.segundos else 0.0
+
+
+class Importador(ABC):
+    """
+    Base de los importadores: `validar_lote` devuelve las filas limpias y las
+    rechazadas, y `guardar` escribe las limpias y devuelve `(creados, actualizados)`.
+    """
+    modelo = None
+    campos = ()
+    requeridos = ()
+
+    def __init__(self, tamano_lote=1000):
+        self.tamano_lote = tamano_lote
+        self.campos_modelo = {nombre: self.modelo._meta.get_field(nombre) for nombre in self.campos}
+
+    def importar(self, filas, al_rechazar=None):
+        """
+        Importa `filas` (`(línea, fila)`) por lotes. `al_rechazar(línea, errores, fila)`
+        recibe cada fila rechazada en cuanto se procesa su lote.
+        """
+        resultado = Resultado()
+        inicio = time.perf_counter()
+
+        def rechazar(rechazadas):
+            resultado.rechazados += len(rechazadas)
+            for linea, errores, fila in rechazadas:
+                if len(resultado.primeros_rechazos) < PRIMEROS_RECHAZOS:
+                    resultado.primeros_rechazos.append((linea, errores))
+                if al_rechazar is not None:
+                    al_rechazar(linea, errores, fila)
+
+        for lote in lotes(filas, self.tamano_lote):
+            resultado.filas += len(lote)
+            validas, rechazadas = self.validar_lote(lote)
+            rechazar(rechazadas)
+            if not validas:
+                continue
+            try:
+                with transaction.atomic():
+                    creados, actualizados = self.guardar(validas)
+                    marcar_cambio(*self.modelos_afectados)
+            except DatabaseError as exc:
+                # Se revierte el lote entero; el resto de la importación continúa
+                self.al_revertir()
+                rechazar([(linea, {'__all__': [str(exc)]}, fila) for linea, fila, _ in validas])
+                continue
+            resultado.creados += creados
+            resultado.actualizados += actualizados
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    @property
+    def modelos_afectados(self):
+        return (self.modelo,)
+
+    def al_revertir(self):
+        """Descarta el estado en memoria que dependía del lote revertido."""
+
+    def limpiar(self, fila, requeridos):
+        """Convierte y valida las columnas presentes con los campos del modelo."""
+        limpia, errores = {}, {}
+        for nombre in requeridos:
+            if fila.get(nombre) in (None, ''):
+                errores[nombre] = ['Este campo es obligatorio.']
+        for nombre, campo in self.campos_modelo.items():
+            if nombre not in fila or nombre in errores:
+                continue
+            valor = fila[nombre]
+            if isinstance(valor, str):
+                valor = valor.strip()
+            try:
+                limpia[nombre] = self.convertir(nombre, campo, valor)
+            except ValidationError as exc:
+                errores[nombre] = exc.messages
+        return limpia, errores
+
+    def convertir(self, nombre, campo, valor):
+        if campo.get_internal_type() == 'BooleanField' and isinstance(valor, str):
+            if valor.lower() not in VERDADEROS | FALSOS:
+                raise ValidationError('Valor booleano no válido.')
+            valor = valor.lower() in VERDADEROS
+        return campo.clean(valor, None)
+
+    def validar_lote(self, lote):
+        validas, rechazadas = [], []
+        for linea, fila in lote:
+            if not isinstance(fila, dict):
+                rechazadas.append((linea, {'__all__': [str(fila)]}, None))
+                continue
+            limpia, errores = self.limpiar(fila, self.requeridos)
+            if errores:
+                rechazadas.append((linea, errores, fila))
+            else:
+                validas.append((linea, fila, limpia))
+        return validas, rechazadas
+
+    @abstractmethod
+    def guardar(self, validas):
+        """Escribe las filas limpias del lote y devuelve `(creados, actualizados)`."""
+
+
+class ImportadorCategorias(Importador):
+    modelo = Categoria
+    campos = ('nombre',)
+    requeridos = ('nombre',)
+
+    def guardar(self, validas):
+        existentes = set(Categoria.objects.filter(
+            nombre__in={limpia['nombre'] for _, _, limpia in validas}
+        ).values_list('nombre', flat=True))
+        nuevas = {limpia['nombre'] for _, _, limpia in validas} - existentes
+        Categoria.objects.bulk_create([Categoria(nombre=nombre) for nombre in sorted(nuevas)])
+        return len(nuevas), 0
+
+
+class ImportadorProductos(Importador):
+    """
+    Inserta o actualiza productos. Con columna `id` actualiza ese producto; sin
+    ella busca por (categoría, nombre). `categoria` es el nombre de la categoría.
+    En las actualizaciones solo se escriben las columnas presentes en la fila.
+    """
+    modelo = Producto
+    campos = ('nombre', 'descripcion', 'precio', 'disponible', 'stock')
+    requeridos = ('nombre', 'descripcion', 'precio', 'categoria')
+
+    def __init__(self, tamano_lote=1000, crear_categorias=False):
+        super().__init__(tamano_lote)
+        self.crear_categorias = crear_categorias
+        self.cargar_categorias()
+
+    def cargar_categorias(self):
+        # Mapa nombre -> id en memoria para toda la importación (con nombres repetidos, el más antiguo)
+        self.categorias = dict(Categoria.objects.order_by('-id').values_list('nombre', 'id'))
+
+    def al_revertir(self):
+        # Las categorías creadas en el lote revertido ya no existen
+        self.cargar_categorias()
+
+    @property
+    def modelos_afectados(self):
+        return (Producto, Categoria) if self.crear_categorias else (Producto,)
+
+    def validar_lote(self, lote):
+        validas, rechazadas = [], []
+        for linea, fila in lote:
+            if not isinstance(fila, dict):
+                rechazadas.append((linea, {'__all__': [str(fila)]}, None))
+                continue
+            pk = fila.get('id')
+            # Al actualizar por id solo se validan las columnas presentes
+            requeridos = () if pk not in (None, '') else self.requeridos
+            limpia, errores = self.limpiar(fila, requeridos)
+            # Producto.clean()
+            if limpia.get('precio') is not None and limpia['precio'] < 0:
+                errores['precio'] = ['El precio no puede ser negativo.']
+            if pk not in (None, ''):
+                try:
+                    limpia['id'] = int(pk)
+                except (TypeError, ValueError):
+                    errores['id'] = ['Debe ser un número entero.']
+            categoria = fila.get('categoria')
+            if isinstance(categoria, str):
+                categoria = categoria.strip()
+            if categoria not in (None, ''):
+                limpia['categoria'] = categoria
+                if categoria not in self.categorias and not self.crear_categorias:
+                    errores['categoria'] = [f'No existe la categoría "{categoria}".']
+            if errores:
+                rechazadas.append((linea, errores, fila))
+            else:
+                validas.append((linea, fila, limpia))
+
+        # Las actualizaciones por id deben apuntar a productos existentes (una consulta por lote)
+        ids = {limpia['id'] for _, _, limpia in validas if 'id' in limpia}
+        if ids:
+            existentes = set(Producto.objects.filter(pk__in=ids).values_list('id', flat=True))
+            aceptadas = []
+            for linea, fila, limpia in validas:
+                if 'id' in limpia and limpia['id'] not in existentes:
+                    rechazadas.append((linea, {'id': [f'No existe el producto {limpia["id"]}.']}, fila))
+                else:
+                    aceptadas.append((linea, fila, limpia))
+            validas = aceptadas
+        return validas, rechazadas
+
+    def guardar(self, validas):
+        nuevas = {limpia['categoria'] for _, _, limpia in validas if 'categoria' in limpia} - set(self.categorias)
+        if nuevas:
+            for categoria in Categoria.objects.bulk_create([Categoria(nombre=nombre) for nombre in sorted(nuevas)]):
+                self.categorias[categoria.nombre] = categoria.pk
+
+        # Productos existentes del lote sin id: por (categoría, nombre), en una consulta
+        por_clave = [limpia for _, _, limpia in validas if 'id' not in limpia]
+        existentes = {}
+        if por_clave:
+            existentes = {
+                (categoria_id, nombre): pk
+                for pk, categoria_id, nombre in Producto.objects.filter(
+                    categoria_id__in={self.categorias[limpia['categoria']] for limpia in por_clave},
+                    nombre__in={limpia['nombre'] for limpia in por_clave},
+                ).order_by('-id').values_list('id', 'categoria_id', 'nombre')
+            }
+
+        crear, actualizar = {}, {}
+        for _, _, limpia in validas:
+            datos = dict(limpia)
+            if 'categoria' in datos:
+                datos['categoria_id'] = self.categorias[datos.pop('categoria')]
+            pk = datos.pop('id', None) or existentes.get((datos.get('categoria_id'), datos.get('nombre')))
+            if pk is None:
+                # La última fila con la misma clave gana
+                crear[(datos['categoria_id'], datos['nombre'])] = datos
+            else:
+                actualizar.setdefault(pk, {}).update(datos)
+
+        Producto.objects.bulk_create([Producto(**datos) for datos in crear.values()])
+
+        self.actualizar(actualizar)
+        return len(crear), len(actualizar)
+
+    def actualizar(self, actualizar):
+        """
+        `{pk: {columna: valor}}` con un bulk_update por grupo de columnas: cada
+        producto solo escribe las columnas presentes en su fila.
+        """
+        ahora = timezone.now()
+        grupos = {}
+        for pk, datos in actualizar.items():
+            grupos.setdefault(tuple(sorted(datos)), []).append(Producto(pk=pk, actualizado_en=ahora, **datos))
+        for columnas, productos in grupos.items():
+            # bulk_update no aplica auto_now
+            campos = [Producto._meta.get_field(columna).name for columna in columnas] + ['actualizado_en']
+            Producto.objects.bulk_update(productos, campos, batch_size=self.tamano_lote)
+
+
+class ImportadorReseñas(Importador):
+    """Inserta reseñas; `producto` es el id del producto. Los agregados se recalculan por lote."""
+    modelo = Reseña
+    campos = ('nombre', 'comentario', 'calificacion')
+    requeridos = ('producto', 'nombre', 'comentario', 'calificacion')
+
+    @property
+    def modelos_afectados(self):
+        return (Reseña, Producto)
+
+    def validar_lote(self, lote):
+        validas, rechazadas = super().validar_lote(lote)
+        ids = {}
+        for linea, fila, limpia in validas:
+            try:
+                ids[linea] = int(fila['producto'])
+            except (TypeError, ValueError):
+                ids[linea] = None
+        # Una consulta por lote para comprobar que existen los productos
+        existentes = set(Producto.objects.filter(pk__in={pk for pk in ids.values() if pk}).values_list('id', flat=True))
+        aceptadas = []
+        for linea, fila, limpia in validas:
+            if ids[linea] not in existentes:
+                rechazadas.append((linea, {'producto': [f'No existe el producto "{fila["producto"]}".']}, fila))
+                continue
+            limpia['producto_id'] = ids[linea]
+            aceptadas.append((linea, fila, limpia))
+        return aceptadas, rechazadas
+
+    def guardar(self, validas):
+        creadas = Reseña.objects.bulk_create([Reseña(**limpia) for _, _, limpia in validas])
+        return len(creadas), 0
+
+
+IMPORTADORES = {
+    'categorias': ImportadorCategorias,
+    'productos': ImportadorProductos,
+    'resenas': ImportadorReseñas,
+}
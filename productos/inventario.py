@@ -0,0 +1,214 @@
+"""
+Operaciones de inventario sobre Producto.stock.
+
+Todas descuentan stock con UPDATE condicionales (`stock >= cantidad`) en lugar de
+leer, modificar y guardar la fila, de modo que dos compras simultáneas nunca
+pueden vender más unidades de las que hay. Las reservas (`Reserva`) apartan
+unidades durante un tiempo: el stock disponible es el stock menos las reservas
+activas no vencidas.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from .catalogo import marcar_cambio
+from .models import Producto, Reserva
+
+
+class StockInsuficiente(Exception):
+    def __init__(self, nombre, stock):
+        super().__init__(f"Stock insuficiente para {nombre}. Stock actual: {stock}")
+        self.nombre = nombre
+        self.stock = stock
+
+
+def _sql_reservado(qn):
+    """Subconsulta con las unidades reservadas (activas y no vencidas) del producto de la fila."""
+    producto = qn(Producto._meta.db_table)
+    return (
+        f"(SELECT COALESCE(SUM({qn('cantidad')}), 0) FROM {qn(Reserva._meta.db_table)} "
+        f"WHERE {qn('producto_id')} = {producto}.{qn('id')} AND {qn('estado')} = %s AND {qn('expira_en')} > %s)"
+    )
+
+
+def _params_reservado():
+    return [Reserva.ACTIVA, connection.ops.adapt_datetimefield_value(timezone.now())]
+
+
+def _stock_disponible(producto_id):
+    return Producto.objects.con_stock_disponible().filter(pk=producto_id).values_list('nombre', 'stock_disponible').get()
+
+
+def _update_returning():
+    """
+    True si el motor admite `UPDATE ... RETURNING`: PostgreSQL y SQLite >= 3.35.
+    `can_return_columns_from_insert` solo habla del INSERT (MariaDB lo admite ahí,
+    no en UPDATE).
+    """
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35)
+
+
+def decrementar_stock(producto_id, cantidad):
+    """
+    Descuenta `cantidad` unidades con un único
+    `UPDATE ... SET stock = stock - n WHERE id = ? AND stock - reservado >= n`,
+    de modo que nunca se venden unidades apartadas por reservas activas.
+
+    Devuelve `(nombre, stock_restante)`. Lanza `Producto.DoesNotExist` si el
+    producto no existe y `StockInsuficiente` si no alcanza el stock.
+    """
+    qn = connection.ops.quote_name
+    ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+    sql = (
+        f"UPDATE {qn(Producto._meta.db_table)} SET {qn('stock')} = {qn('stock')} - %s, {qn('actualizado_en')} = %s "
+        f"WHERE {qn('id')} = %s AND {qn('stock')} - {_sql_reservado(qn)} >= %s"
+    )
+    params = [cantidad, ahora, producto_id, *_params_reservado(), cantidad]
+
+    with transaction.atomic():
+        if _update_returning():
+            # SQLite >= 3.35 y PostgreSQL devuelven el stock nuevo en la misma sentencia
+            with connection.cursor() as cursor:
+                cursor.execute(f"{sql} RETURNING {qn('nombre')}, {qn('stock')}", params)
+                fila = cursor.fetchone()
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                actualizadas = cursor.rowcount
+            fila = Producto.objects.filter(pk=producto_id).values_list('nombre', 'stock').get() if actualizadas else None
+        if fila is not None:
+            marcar_cambio(Producto)
+            return fila[0], fila[1]
+
+    # No se actualizó nada: o el producto no existe o no hay stock suficiente
+    raise StockInsuficiente(*_stock_disponible(producto_id))
+
+
+def procesar_checkout(lineas):
+    """
+    Descuenta el stock de todo un carrito en una sola transacción, todo o nada.
+
+    `lineas` es una lista de `(producto_id, cantidad)`. Las filas se bloquean en
+    orden de id (evita interbloqueos entre carritos que comparten productos) y
+    el número de consultas es constante: un SELECT ... FOR UPDATE y un UPDATE.
+
+    Devuelve `(ok, resultados)` con un resultado por línea, en el orden recibido.
+    """
+    pedidos = {}
+    for producto_id, cantidad in lineas:
+        pedidos[producto_id] = pedidos.get(producto_id, 0) + cantidad
+    ids = sorted(pedidos)
+
+    with transaction.atomic():
+        productos = {
+            fila[0]: fila
+            for fila in Producto.objects.select_for_update().con_stock_disponible().filter(pk__in=ids)
+            .order_by('pk').values_list('id', 'nombre', 'stock_disponible')
+        }
+
+        restante = {}
+        errores = {}
+        for producto_id in ids:
+            if producto_id not in productos:
+                errores[producto_id] = "Producto no encontrado."
+                continue
+            _, nombre, stock = productos[producto_id]
+            if stock < pedidos[producto_id]:
+                errores[producto_id] = f"Stock insuficiente para {nombre}. Stock actual: {stock}"
+                continue
+            restante[producto_id] = stock - pedidos[producto_id]
+
+        if not errores:
+            try:
+                actualizadas = Producto.objects.filter(pk__in=ids).update(
+                    stock=Case(
+                        *(When(pk=producto_id, then=F('stock') - cantidad) for producto_id, cantidad in pedidos.items()),
+                        default=F('stock'),
+                        output_field=Producto._meta.get_field('stock'),
+                    ),
+                    actualizado_en=timezone.now(),
+                )
+            except IntegrityError:
+                # CHECK (stock >= 0): otra transacción se adelantó pese al bloqueo
+                actualizadas = 0
+            if actualizadas != len(ids):
+                transaction.set_rollback(True)
+                errores = {producto_id: "El stock cambió durante la compra, inténtalo de nuevo." for producto_id in ids}
+            else:
+                marcar_cambio(Producto)
+        ok = not errores
+
+    resultados = []
+    for producto_id, cantidad in lineas:
+        resultado = {"producto": producto_id, "cantidad": cantidad}
+        if producto_id in errores:
+            resultado["error"] = errores[producto_id]
+        elif ok:
+            resultado["stock_restante"] = restante[producto_id]
+        resultados.append(resultado)
+    return ok, resultados
+
+
+def reservar(producto_id, cantidad, ttl=None):
+    """
+    Aparta `cantidad` unidades durante `ttl` segundos (PRODUCTOS_RESERVA_TTL por
+    defecto). Lanza `Producto.DoesNotExist` o `StockInsuficiente`.
+    """
+    ttl = ttl or settings.PRODUCTOS_RESERVA_TTL
+    with transaction.atomic():
+        # Bloquea la fila del producto para serializar reservas concurrentes
+        nombre, disponible = (
+            Producto.objects.select_for_update().con_stock_disponible().filter(pk=producto_id)
+            .values_list('nombre', 'stock_disponible').get()
+        )
+        if disponible < cantidad:
+            raise StockInsuficiente(nombre, disponible)
+        return Reserva.objects.create(
+            producto_id=producto_id, cantidad=cantidad, expira_en=timezone.now() + timedelta(seconds=ttl)
+        )
+
+
+def convertir_reserva(reserva_id):
+    """
+    Convierte una reserva activa en venta descontando su cantidad del stock.
+    Devuelve la reserva actualizada, o None si ya no estaba activa. Lanza
+    `StockInsuficiente` si el stock se editó por debajo de lo reservado.
+    """
+    with transaction.atomic():
+        reserva = Reserva.objects.select_for_update().filter(pk=reserva_id).activas().first()
+        if reserva is None:
+            return None
+        # Condicional como el resto: un PATCH pudo dejar el stock por debajo de la reserva
+        actualizadas = Producto.objects.filter(pk=reserva.producto_id, stock__gte=reserva.cantidad).update(
+            stock=F('stock') - reserva.cantidad, actualizado_en=timezone.now()
+        )
+        if not actualizadas:
+            raise StockInsuficiente(*Producto.objects.filter(pk=reserva.producto_id).values_list('nombre', 'stock').get())
+        reserva.estado = Reserva.CONVERTIDA
+        reserva.save(update_fields=['estado'])
+        return reserva
+
+
+def liberar_reserva(reserva_id):
+    """Devuelve las unidades de una reserva activa al stock disponible. True si se liberó."""
+    with transaction.atomic():
+        liberada = bool(Reserva.objects.filter(pk=reserva_id, estado=Reserva.ACTIVA).update(estado=Reserva.LIBERADA))
+        if liberada:
+            marcar_cambio(Reserva)
+    return liberada
+
+
+def expirar_reservas(ahora=None):
+    """Marca como expiradas todas las reservas vencidas con un único UPDATE."""
+    with transaction.atomic():
+        expiradas = Reserva.objects.filter(
+            estado=Reserva.ACTIVA, expira_en__lte=ahora or timezone.now()
+        ).update(estado=Reserva.EXPIRADA)
+        if expiradas:
+            marcar_cambio(Reserva)
+    return expiradas
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from productos.inventario import expirar_reservas
+
+
+class Command(BaseCommand):
+    help = "Marca como expiradas las reservas de stock vencidas (un único UPDATE por pasada)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cada', type=float, default=0,
+            help="Repite la pasada cada N segundos (barredor en segundo plano). 0 = una sola pasada.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            expiradas = expirar_reservas()
+            self.stdout.write(f"Reservas expiradas: {expiradas}")
+            if not options['cada']:
+                break
+            close_old_connections()
+            time.sleep(options['cada'])
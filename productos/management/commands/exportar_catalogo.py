@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from productos.catalogo_estatico import exportar
+
+
+class Command(BaseCommand):
+    help = "Exporta el catálogo a JSON estático por categoría (solo regenera lo que cambió)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', default=settings.CATALOGO_ESTATICO_DIR)
+        parser.add_argument('--todo', action='store_true', help="Regenera todas las categorías.")
+        parser.add_argument('--sin-purgar', action='store_true', help="Conserva los archivos de versiones anteriores.")
+
+    def handle(self, *args, **options):
+        regeneradas, total = exportar(options['destino'], forzar=options['todo'], purgar=not options['sin_purgar'])
+        self.stdout.write(self.style.SUCCESS(f"Catálogo exportado: {regeneradas} de {total} categorías regeneradas."))
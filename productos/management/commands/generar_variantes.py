@@ -0,0 +1,59 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from productos.catalogo import cambios_agrupados
+from productos.imagenes import argumentos_variantes, generar_variantes, guardar_variantes
+from productos.models import Producto
+
+
+class Command(BaseCommand):
+    help = "Genera en paralelo las variantes responsive de las imágenes de productos existentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help="Regenera también los productos que ya tienen variantes.")
+        parser.add_argument('--procesos', type=int, default=settings.PRODUCTOS_VARIANTES_PROCESOS)
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        productos = [
+            producto for producto in Producto.objects.exclude(imagen='').exclude(imagen__isnull=True).only('id', 'imagen', 'imagen_variantes')
+            if options['todos'] or (producto.imagen_variantes or {}).get('origen') != producto.imagen.name
+        ]
+        if not productos:
+            self.stdout.write("No hay imágenes pendientes.")
+            return
+
+        lote = []
+        errores = omitidos = 0
+        with ProcessPoolExecutor(max_workers=options['procesos']) as pool:
+            futuros = [(producto, pool.submit(generar_variantes, *argumentos_variantes(producto.imagen.name))) for producto in productos]
+            for producto, futuro in futuros:
+                try:
+                    variantes = futuro.result()
+                except Exception as e:
+                    errores += 1
+                    self.stderr.write(f"{producto.imagen.name}: {e}")
+                    continue
+                lote.append((producto.pk, producto.imagen.name, variantes))
+                if len(lote) >= options['batch_size']:
+                    omitidos += self.guardar(lote)
+                    lote = []
+        if lote:
+            omitidos += self.guardar(lote)
+
+        generados = len(productos) - errores - omitidos
+        self.stdout.write(self.style.SUCCESS(
+            f"Variantes generadas para {generados} productos ({errores} errores, {omitidos} con imagen cambiada)."
+        ))
+
+    def guardar(self, lote):
+        """
+        Guarda el lote como la ruta asíncrona (solo si la imagen no cambió, con
+        actualizado_en) y marca el catálogo una vez por lote. Devuelve los omitidos.
+        """
+        with transaction.atomic(), cambios_agrupados():
+            guardados = sum(guardar_variantes(*fila) for fila in lote)
+        return len(lote) - guardados
@@ -0,0 +1,51 @@
+import json
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from productos.importacion import IMPORTADORES, ImportadorProductos, leer_filas
+
+
+class Command(BaseCommand):
+    help = "Importa categorías, productos o reseñas desde CSV o NDJSON por lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=sorted(IMPORTADORES))
+        parser.add_argument('archivo')
+        parser.add_argument('--formato', choices=['csv', 'ndjson'], help="Por defecto, según la extensión del archivo.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--crear-categorias', action='store_true', help="Crea las categorías de productos que no existan.")
+        parser.add_argument('--rechazados', help="Guarda las filas rechazadas (NDJSON con línea y errores).")
+
+    def handle(self, *args, **options):
+        ruta = Path(options['archivo'])
+        if not ruta.exists():
+            raise CommandError(f"No existe el archivo {ruta}.")
+        formato = options['formato'] or ('csv' if ruta.suffix.lower() == '.csv' else 'ndjson')
+
+        clase = IMPORTADORES[options['tipo']]
+        if clase is ImportadorProductos:
+            importador = clase(options['batch_size'], crear_categorias=options['crear_categorias'])
+        else:
+            importador = clase(options['batch_size'])
+
+        with ExitStack() as pila:
+            archivo = pila.enter_context(ruta.open(encoding='utf-8-sig', newline=''))
+            al_rechazar = None
+            if options['rechazados']:
+                # Se escriben a medida que se procesa cada lote, sin acumularlos
+                salida = pila.enter_context(open(options['rechazados'], 'w', encoding='utf-8'))
+
+                def al_rechazar(linea, errores, fila):
+                    salida.write(json.dumps({'linea': linea, 'errores': errores, 'fila': fila}, ensure_ascii=False) + '\n')
+
+            resultado = importador.importar(leer_filas(archivo, formato), al_rechazar)
+
+        for linea, errores in resultado.primeros_rechazos:
+            self.stderr.write(f"Línea {linea}: " + '; '.join(f"{campo}: {' '.join(mensajes)}" for campo, mensajes in errores.items()))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.filas} filas en {resultado.segundos:.2f}s ({resultado.filas_por_segundo:.0f} filas/s): "
+            f"{resultado.creados} creadas, {resultado.actualizados} actualizadas, {resultado.rechazados} rechazadas."
+        ))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from productos.sincronizacion import purgar
+
+
+class Command(BaseCommand):
+    help = "Borra del registro de sincronización los cambios más antiguos que la retención."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=settings.PRODUCTOS_SINCRONIZACION_RETENCION_DIAS,
+            help="Días de cambios a conservar; los clientes con tokens más viejos resincronizan desde cero.",
+        )
+
+    def handle(self, *args, **options):
+        borrados = purgar(timezone.now() - timedelta(days=options['dias']))
+        self.stdout.write(f"Cambios purgados: {borrados}")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from productos.calificaciones import recalcular
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los agregados de calificación de los productos a partir de sus reseñas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('producto_ids', nargs='*', type=int, help="Productos a recalcular (por defecto, todos).")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = recalcular(options['producto_ids'] or None, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Agregados recalculados para {total} productos."))
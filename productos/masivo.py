@@ -0,0 +1,189 @@
+"""
+Operaciones masivas sobre una lista de objetos: `bulk/` en los ViewSets.
+
+    POST   bulk/  [{...}, ...]              crea con bulk_create
+    PATCH  bulk/  [{"id": 1, ...}, ...]     actualización parcial con bulk_update
+    DELETE bulk/  {"ids": [1, 2, ...]}      borra por ids
+
+Cada elemento se valida con el serializer de la vista. Los ids relacionados
+(`categoria`, `producto`) se cargan una vez para todo el lote, así que el
+número de consultas no depende del número de elementos. Los elementos inválidos
+se devuelven en `errores` con su índice y el resto se guarda, salvo con
+`?atomico=1`, que no escribe nada si alguno falla.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from . import catalogo
+
+
+class RelacionPrecargada(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField que resuelve los ids contra `{pk: objeto}` ya cargado."""
+
+    def __init__(self, objetos, **kwargs):
+        self.objetos = objetos
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in self.objetos:
+            self.fail('does_not_exist', pk_value=data)
+        return self.objetos[pk]
+
+
+def _pk(campo, valor):
+    """`valor` convertido al tipo de `campo`, o None si no es un id válido."""
+    if isinstance(valor, bool):
+        return None
+    try:
+        return campo.to_python(valor)
+    except DjangoValidationError:
+        return None
+
+
+class OperacionesMasivasMixin:
+    """
+    Acción `bulk/` (solo administradores). La vista puede declarar
+    `masivo_modelos_afectados` si las escrituras cambian otros modelos.
+    """
+    masivo_modelos_afectados = None
+
+    def modelos_afectados_masivo(self):
+        return self.masivo_modelos_afectados or (self.queryset.model,)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk', permission_classes=[IsAdminUser])
+    def masivo(self, request):
+        atomico = request.query_params.get('atomico') in ('1', 'true', 'True')
+        if request.method == 'DELETE':
+            return self.borrar_masivo(request.data, atomico)
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError('Se espera una lista no vacía de objetos.')
+        if len(items) > settings.PRODUCTOS_MASIVO_MAXIMO:
+            raise serializers.ValidationError(f'Como máximo {settings.PRODUCTOS_MASIVO_MAXIMO} elementos por petición.')
+        if request.method == 'POST':
+            return self.crear_masivo(items, atomico)
+        return self.actualizar_masivo(items, atomico)
+
+    def precargar_relaciones(self, items):
+        """`{nombre: (campo, {pk: objeto})}` con una consulta por relación del serializer."""
+        relaciones = {}
+        for nombre, campo in self.get_serializer().fields.items():
+            if campo.read_only or not isinstance(campo, serializers.PrimaryKeyRelatedField):
+                continue
+            queryset = campo.get_queryset()
+            pks = {_pk(queryset.model._meta.pk, item[nombre]) for item in items if isinstance(item, dict) and nombre in item}
+            pks.discard(None)
+            relaciones[nombre] = (campo, queryset.in_bulk(pks) if pks else {})
+        return relaciones
+
+    def validar_masivo(self, items, relaciones, instancias=None):
+        """Valida cada elemento; devuelve `([(indice, instancia, datos)], errores)`."""
+        validos, errores = [], []
+        for indice, item in enumerate(items):
+            instancia = None
+            if instancias is not None:
+                pk = _pk(self.queryset.model._meta.pk, item.get('id')) if isinstance(item, dict) else None
+                instancia = instancias.get(pk)
+                if instancia is None:
+                    errores.append({'indice': indice, 'errores': {'id': ['No existe un objeto con ese id.']}})
+                    continue
+            serializer = self.get_serializer(instancia, data=item, partial=instancias is not None)
+            for nombre, (campo, objetos) in relaciones.items():
+                if nombre in serializer.fields:
+                    serializer.fields[nombre] = RelacionPrecargada(objetos, **campo._kwargs)
+            if serializer.is_valid():
+                validos.append((indice, instancia, serializer.validated_data))
+            else:
+                error = {'indice': indice, 'errores': serializer.errors}
+                if instancia is not None:
+                    error['id'] = instancia.pk
+                errores.append(error)
+        return validos, errores
+
+    def respuesta_masiva(self, pks, errores, codigo=status.HTTP_200_OK):
+        # Recarga con el queryset de la vista: precargas y anotaciones en consultas fijas
+        objetos = self.get_queryset().in_bulk(pks)
+        datos = self.get_serializer([objetos[pk] for pk in pks if pk in objetos], many=True).data
+        if not pks and errores:
+            codigo = status.HTTP_400_BAD_REQUEST
+        return Response({'resultados': datos, 'errores': errores}, status=codigo)
+
+    def rechazar_masivo(self, errores):
+        return Response({'resultados': [], 'errores': errores}, status=status.HTTP_400_BAD_REQUEST)
+
+    def crear_masivo(self, items, atomico):
+        validos, errores = self.validar_masivo(items, self.precargar_relaciones(items))
+        if errores and atomico:
+            return self.rechazar_masivo(errores)
+
+        modelo = self.queryset.model
+        with transaction.atomic(), catalogo.cambios_agrupados():
+            creados = modelo.objects.bulk_create([modelo(**datos) for _, _, datos in validos])
+            if creados:
+                catalogo.marcar_cambio(*self.modelos_afectados_masivo())
+        return self.respuesta_masiva([objeto.pk for objeto in creados], errores, status.HTTP_201_CREATED)
+
+    def actualizar_masivo(self, items, atomico):
+        modelo = self.queryset.model
+        pks = {_pk(modelo._meta.pk, item.get('id')) for item in items if isinstance(item, dict)}
+        pks.discard(None)
+        instancias = modelo.objects.in_bulk(pks)
+        validos, errores = self.validar_masivo(items, self.precargar_relaciones(items), instancias)
+        if errores and atomico:
+            return self.rechazar_masivo(errores)
+
+        campos = set()
+        for _, instancia, datos in validos:
+            for nombre, valor in datos.items():
+                setattr(instancia, nombre, valor)
+            campos.update(datos)
+        # bulk_update no aplica auto_now
+        ahora = timezone.now()
+        for campo in modelo._meta.concrete_fields:
+            if getattr(campo, 'auto_now', False):
+                campos.add(campo.name)
+                for _, instancia, _ in validos:
+                    setattr(instancia, campo.attname, ahora)
+
+        actualizados = list({instancia.pk: instancia for _, instancia, _ in validos}.values())
+        with transaction.atomic(), catalogo.cambios_agrupados():
+            if actualizados and campos:
+                modelo.objects.bulk_update(actualizados, sorted(campos))
+                catalogo.marcar_cambio(*self.modelos_afectados_masivo())
+        return self.respuesta_masiva([instancia.pk for instancia in actualizados], errores)
+
+    def borrar_masivo(self, datos, atomico):
+        ids = datos.get('ids') if isinstance(datos, dict) else None
+        if not isinstance(ids, list) or not ids:
+            raise serializers.ValidationError({'ids': ['Se espera una lista no vacía de ids.']})
+        if len(ids) > settings.PRODUCTOS_MASIVO_MAXIMO:
+            raise serializers.ValidationError(f'Como máximo {settings.PRODUCTOS_MASIVO_MAXIMO} elementos por petición.')
+
+        modelo = self.queryset.model
+        pks = [_pk(modelo._meta.pk, valor) for valor in ids]
+        existentes = set(modelo.objects.filter(pk__in={pk for pk in pks if pk is not None}).values_list('pk', flat=True))
+        errores = [
+            {'indice': indice, 'id': valor, 'errores': {'id': ['No existe un objeto con ese id.']}}
+            for indice, (valor, pk) in enumerate(zip(ids, pks)) if pk not in existentes
+        ]
+        if errores and (atomico or not existentes):
+            return self.rechazar_masivo(errores)
+
+        # Las señales post_delete de cada fila marcan el catálogo una sola vez
+        with transaction.atomic(), catalogo.cambios_agrupados():
+            modelo.objects.filter(pk__in=existentes).delete()
+            catalogo.marcar_cambio(*self.modelos_afectados_masivo())
+        return Response({'borrados': sorted(existentes), 'errores': errores}, status=status.HTTP_200_OK)
@@ -0,0 +1,160 @@
+"""
+Servicio de archivos de MEDIA_ROOT con cabeceras amigables para cachés.
+
+- Las subidas se guardan con el hash de su contenido en el nombre
+  (`productos/torta.3f2a9c1b0d4e.jpg`), así que la URL cambia cuando cambia el
+  archivo y esas respuestas pueden marcarse `Cache-Control: immutable`.
+- `servir_media` emite ETags fuertes, responde 304 a `If-None-Match` y 206 a
+  peticiones `Range`, y puede delegar el envío de bytes al servidor web con
+  X-Accel-Redirect (nginx) o X-Sendfile (Apache/lighttpd).
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_http_methods
+
+# `.3f2a9c1b0d4e.jpg` o `.3f2a9c1b0d4e.640w.webp` al final del nombre
+NOMBRE_CON_HASH = re.compile(r'\.[0-9a-f]{12}(\.\d+w)?\.\w+$')
+RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+TAMANO_BLOQUE = 64 * 1024
+
+
+def hash_contenido(archivo):
+    digest = hashlib.sha256()
+    for bloque in archivo.chunks() if hasattr(archivo, 'chunks') else iter(lambda: archivo.read(TAMANO_BLOQUE), b''):
+        digest.update(bloque)
+    return digest.hexdigest()[:12]
+
+
+class ContenidoHashStorage(FileSystemStorage):
+    """FileSystemStorage que añade el hash del contenido al nombre de cada archivo subido."""
+
+    def _save(self, name, content):
+        base, extension = os.path.splitext(name)
+        content.seek(0)
+        name = f'{base}.{hash_contenido(content)}{extension}'
+        content.seek(0)
+        if self.exists(name):
+            # Mismo contenido, mismo nombre: no hace falta otra copia
+            return name
+        return super()._save(name, content)
+
+
+@lru_cache(maxsize=4096)
+def _etag(ruta, tamano, mtime_ns):
+    # La clave incluye tamaño y mtime: si el archivo cambia, se recalcula
+    with open(ruta, 'rb') as archivo:
+        return f'"{hash_contenido(archivo)}-{tamano:x}"'
+
+
+def _cache_control(ruta):
+    if NOMBRE_CON_HASH.search(ruta):
+        return 'public, max-age=31536000, immutable'
+    return f'public, max-age={settings.MEDIA_CACHE_SEGUNDOS}'
+
+
+def _rango(cabecera, tamano):
+    """Devuelve (inicio, fin) inclusivos para un único rango válido, None si no aplica o False si es insatisfacible."""
+    coincidencia = RANGO.match(cabecera.strip())
+    if not coincidencia or coincidencia.groups() == ('', ''):
+        return None
+    inicio, fin = coincidencia.groups()
+    if inicio == '':
+        # bytes=-N: los últimos N bytes
+        inicio, fin = max(tamano - int(fin), 0), tamano - 1
+    else:
+        inicio, fin = int(inicio), min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or inicio > fin:
+        return False
+    return inicio, fin
+
+
+def _leer(ruta, inicio, longitud):
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        while longitud > 0:
+            bloque = archivo.read(min(TAMANO_BLOQUE, longitud))
+            if not bloque:
+                break
+            longitud -= len(bloque)
+            yield bloque
+
+
+@require_http_methods(['GET', 'HEAD'])
+def servir_media(request, ruta):
+    try:
+        ruta_absoluta = safe_join(settings.MEDIA_ROOT, ruta)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        info = os.stat(ruta_absoluta)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(ruta_absoluta):
+        raise Http404
+
+    etag = _etag(ruta_absoluta, info.st_size, info.st_mtime_ns)
+    cabeceras = {
+        'ETag': etag,
+        'Last-Modified': http_date(info.st_mtime),
+        'Cache-Control': _cache_control(ruta),
+        'Accept-Ranges': 'bytes',
+    }
+
+    si_no_coincide = request.headers.get('If-None-Match')
+    if si_no_coincide and (si_no_coincide.strip() == '*' or etag in [e.strip() for e in si_no_coincide.split(',')]):
+        respuesta = HttpResponseNotModified()
+        for clave, valor in cabeceras.items():
+            respuesta[clave] = valor
+        return respuesta
+
+    tipo, codificacion = mimetypes.guess_type(ruta_absoluta)
+    tipo = tipo or 'application/octet-stream'
+
+    if settings.MEDIA_SENDFILE:
+        # El servidor web envía los bytes (y resuelve los Range) sin ocupar al worker
+        respuesta = HttpResponse(content_type=tipo)
+        if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+            respuesta['X-Accel-Redirect'] = settings.MEDIA_X_ACCEL_PREFIJO + ruta
+        else:
+            respuesta['X-Sendfile'] = ruta_absoluta
+        for clave, valor in cabeceras.items():
+            respuesta[clave] = valor
+        return respuesta
+
+    inicio, fin = 0, info.st_size - 1
+    estado = 200
+    cabecera_rango = request.headers.get('Range')
+    si_rango = request.headers.get('If-Range')
+    if cabecera_rango and (not si_rango or si_rango.strip() == etag):
+        rango = _rango(cabecera_rango, info.st_size)
+        if rango is False:
+            respuesta = HttpResponse(status=416)
+            respuesta['Content-Range'] = f'bytes */{info.st_size}'
+            return respuesta
+        if rango:
+            inicio, fin = rango
+            estado = 206
+
+    if estado == 206:
+        longitud = fin - inicio + 1
+        respuesta = StreamingHttpResponse(_leer(ruta_absoluta, inicio, longitud), status=206, content_type=tipo)
+        respuesta['Content-Length'] = str(longitud)
+        respuesta['Content-Range'] = f'bytes {inicio}-{fin}/{info.st_size}'
+        if codificacion:
+            respuesta['Content-Encoding'] = codificacion
+    else:
+        # FileResponse permite al servidor WSGI usar wsgi.file_wrapper (sendfile)
+        respuesta = FileResponse(open(ruta_absoluta, 'rb'), content_type=tipo)
+    for clave, valor in cabeceras.items():
+        respuesta[clave] = valor
+    return respuesta
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0003_reseña'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reseña',
+            index=models.Index(fields=['-creado_en', '-id'], name='resena_creado_id_idx'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:47
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def poblar_agregados(apps, schema_editor):
+    Producto = apps.get_model('productos', 'Producto')
+    productos = Producto.objects.annotate(
+        total=Count('resenas'),
+        suma=Sum('resenas__calificacion'),
+        **{f'e{i}': Count('resenas', filter=Q(resenas__calificacion=i)) for i in range(1, 6)},
+    )
+    lote = []
+    for producto in productos.iterator():
+        producto.resenas_count = producto.total
+        producto.calificacion_suma = producto.suma or 0
+        producto.calificacion_promedio = producto.calificacion_suma / producto.total if producto.total else 0.0
+        for i in range(1, 6):
+            setattr(producto, f'estrellas_{i}', getattr(producto, f'e{i}'))
+        lote.append(producto)
+    Producto.objects.bulk_update(lote, [
+        'resenas_count', 'calificacion_suma', 'calificacion_promedio',
+        'estrellas_1', 'estrellas_2', 'estrellas_3', 'estrellas_4', 'estrellas_5',
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0004_resena_indice_paginacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='calificacion_promedio',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='calificacion_suma',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='estrellas_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='estrellas_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='estrellas_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='estrellas_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='estrellas_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='resenas_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['-calificacion_promedio', 'id'], name='producto_promedio_idx'),
+        ),
+        migrations.RunPython(poblar_agregados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0005_producto_agregados_calificacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reserva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.PositiveIntegerField()),
+                ('estado', models.CharField(choices=[('activa', 'Activa'), ('convertida', 'Convertida en venta'), ('liberada', 'Liberada'), ('expirada', 'Expirada')], default='activa', max_length=10)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('expira_en', models.DateTimeField()),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservas', to='productos.producto')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('estado', 'activa')), fields=['producto', 'expira_en'], name='reserva_activa_idx'), models.Index(condition=models.Q(('estado', 'activa')), fields=['expira_en'], name='reserva_vencimiento_idx')],
+            },
+        ),
+    ]
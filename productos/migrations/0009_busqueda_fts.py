@@ -0,0 +1,73 @@
+# Índices de texto completo FTS5 para /api/productos/buscar/ (solo SQLite)
+
+from django.db import migrations
+
+# unicode61 con remove_diacritics 2: "crème" ~ "creme", "piñata" ~ "pinata".
+# prefix='2 3' acelera las búsquedas por prefijo (autocompletado).
+TOKENIZADOR = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+SQL_CREAR = [
+    f"""CREATE VIRTUAL TABLE productos_producto_fts USING fts5(
+        nombre, descripcion, content='productos_producto', content_rowid='id', {TOKENIZADOR}
+    )""",
+    """CREATE TRIGGER productos_producto_fts_ai AFTER INSERT ON productos_producto BEGIN
+        INSERT INTO productos_producto_fts(rowid, nombre, descripcion) VALUES (new.id, new.nombre, new.descripcion);
+    END""",
+    """CREATE TRIGGER productos_producto_fts_ad AFTER DELETE ON productos_producto BEGIN
+        INSERT INTO productos_producto_fts(productos_producto_fts, rowid, nombre, descripcion)
+        VALUES ('delete', old.id, old.nombre, old.descripcion);
+    END""",
+    """CREATE TRIGGER productos_producto_fts_au AFTER UPDATE OF nombre, descripcion ON productos_producto BEGIN
+        INSERT INTO productos_producto_fts(productos_producto_fts, rowid, nombre, descripcion)
+        VALUES ('delete', old.id, old.nombre, old.descripcion);
+        INSERT INTO productos_producto_fts(rowid, nombre, descripcion) VALUES (new.id, new.nombre, new.descripcion);
+    END""",
+    "INSERT INTO productos_producto_fts(productos_producto_fts) VALUES ('rebuild')",
+
+    f"""CREATE VIRTUAL TABLE productos_resena_fts USING fts5(
+        comentario, content='productos_reseña', content_rowid='id', {TOKENIZADOR}
+    )""",
+    """CREATE TRIGGER productos_resena_fts_ai AFTER INSERT ON "productos_reseña" BEGIN
+        INSERT INTO productos_resena_fts(rowid, comentario) VALUES (new.id, new.comentario);
+    END""",
+    """CREATE TRIGGER productos_resena_fts_ad AFTER DELETE ON "productos_reseña" BEGIN
+        INSERT INTO productos_resena_fts(productos_resena_fts, rowid, comentario) VALUES ('delete', old.id, old.comentario);
+    END""",
+    """CREATE TRIGGER productos_resena_fts_au AFTER UPDATE OF comentario ON "productos_reseña" BEGIN
+        INSERT INTO productos_resena_fts(productos_resena_fts, rowid, comentario) VALUES ('delete', old.id, old.comentario);
+        INSERT INTO productos_resena_fts(rowid, comentario) VALUES (new.id, new.comentario);
+    END""",
+    "INSERT INTO productos_resena_fts(productos_resena_fts) VALUES ('rebuild')",
+]
+
+SQL_BORRAR = [
+    "DROP TRIGGER IF EXISTS productos_producto_fts_ai",
+    "DROP TRIGGER IF EXISTS productos_producto_fts_ad",
+    "DROP TRIGGER IF EXISTS productos_producto_fts_au",
+    "DROP TABLE IF EXISTS productos_producto_fts",
+    "DROP TRIGGER IF EXISTS productos_resena_fts_ai",
+    "DROP TRIGGER IF EXISTS productos_resena_fts_ad",
+    "DROP TRIGGER IF EXISTS productos_resena_fts_au",
+    "DROP TABLE IF EXISTS productos_resena_fts",
+]
+
+
+def ejecutar(sentencias):
+    def operacion(apps, schema_editor):
+        # En otros motores la búsqueda usa icontains (ver productos/busqueda.py)
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0008_cambios_catalogo'),
+    ]
+
+    operations = [
+        migrations.RunPython(ejecutar(SQL_CREAR), ejecutar(SQL_BORRAR)),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0009_busqueda_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['categoria', 'disponible'], name='producto_cat_disp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reseña',
+            index=models.Index(fields=['producto', '-creado_en', '-id'], name='resena_producto_creado_idx'),
+        ),
+    ]
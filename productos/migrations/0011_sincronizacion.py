@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# Triggers que llenan productos_cambio (solo SQLite, como los de 0009_busqueda_fts)
+TABLAS = {'categoria': 'productos_categoria', 'producto': 'productos_producto', 'resena': 'productos_reseña'}
+EVENTOS = {'ai': ('INSERT', 'new'), 'au': ('UPDATE', 'new'), 'ad': ('DELETE', 'old')}
+
+SQL_CREAR = [
+    f"""CREATE TRIGGER productos_cambio_{modelo}_{sufijo} AFTER {evento} ON "{tabla}" BEGIN
+        INSERT INTO productos_cambio(modelo, objeto_id, creado_en)
+        VALUES ('{modelo}', {fila}.id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END"""
+    for modelo, tabla in TABLAS.items()
+    for sufijo, (evento, fila) in EVENTOS.items()
+]
+
+SQL_BORRAR = [
+    f"DROP TRIGGER IF EXISTS productos_cambio_{modelo}_{sufijo}"
+    for modelo in TABLAS
+    for sufijo in EVENTOS
+]
+
+
+def ejecutar(sentencias):
+    def operacion(apps, schema_editor):
+        # En otros motores no hay registro: /api/sincronizar/ pide siempre resincronizar
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0010_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cambio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=20)),
+                ('objeto_id', models.BigIntegerField()),
+                ('creado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='versioncatalogo',
+            name='cambios_purgados_hasta',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(ejecutar(SQL_CREAR), ejecutar(SQL_BORRAR)),
+    ]
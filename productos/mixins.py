@@ -0,0 +1,196 @@
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from . import cache, catalogo
+
+
+def vigencia(vencimiento):
+    """Marca del próximo vencimiento para ETags y claves de caché (microsegundos)."""
+    return int(vencimiento.timestamp() * 1_000_000) if vencimiento else 0
+
+
+class GetCondicionalMixin:
+    """
+    GET condicional para las vistas de lectura del catálogo: el ETag y el
+    Last-Modified salen de la versión global del catálogo, así que una lista o
+    un detalle sin cambios responde 304 sin consultar ni serializar filas.
+
+    Las vistas con `vence_con_reservas` (stock disponible) añaden al ETag el
+    próximo vencimiento de una reserva activa: al pasar esa hora la respuesta
+    cambia aunque nadie haya escrito.
+    """
+    vence_con_reservas = False
+
+    def list(self, request, *args, **kwargs):
+        return self._condicional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._condicional(super().retrieve, request, *args, **kwargs)
+
+    def etiqueta_condicional(self, request):
+        """`(etag, ultima_modificacion)` de la respuesta (una consulta)."""
+        if self.vence_con_reservas:
+            version, modificado, self.proximo_vencimiento = catalogo.version_con_reservas()
+            version = f'{version}-{vigencia(self.proximo_vencimiento)}'
+        else:
+            version, modificado = catalogo.version_actual()
+        # El formato negociado (json, api navegable...) forma parte del ETag
+        return f'W/"catalogo-{version}-{request.accepted_renderer.format}"', int(modificado.timestamp())
+
+    def _condicional(self, vista, request, *args, **kwargs):
+        etag, ultima_modificacion = self.etiqueta_condicional(request)
+        response = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+        if response is None:
+            response = vista(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(ultima_modificacion)
+        return response
+
+
+class CacheRespuestaMixin:
+    """
+    Cachea las respuestas de `list` y `retrieve`. La vista declara en
+    `cache_depende_de` los modelos cuyos cambios invalidan sus respuestas; con
+    `vence_con_reservas` la clave lleva además el próximo vencimiento de una
+    reserva activa (el que ya leyó GetCondicionalMixin, si está delante).
+    """
+    cache_depende_de = ()
+    vence_con_reservas = False
+
+    def list(self, request, *args, **kwargs):
+        return self._cacheada(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cacheada(super().retrieve, request, *args, **kwargs)
+
+    def clave_cache(self, request):
+        extra = ()
+        if self.vence_con_reservas:
+            if not hasattr(self, 'proximo_vencimiento'):
+                self.proximo_vencimiento = catalogo.version_con_reservas()[2]
+            extra = (vigencia(self.proximo_vencimiento),)
+        return cache.clave_respuesta(request, self.cache_depende_de, extra)
+
+    def _cacheada(self, vista, request, *args, **kwargs):
+        almacen = cache.obtener_cache()
+        clave = self.clave_cache(request)
+        datos = almacen.get(clave)
+        if datos is not None:
+            cache.registrar(acierto=True)
+            response = Response(datos)
+            response['X-Cache'] = 'HIT'
+            # CompresionMiddleware guarda los bytes comprimidos junto a la respuesta
+            response.clave_cache = clave
+            return response
+
+        cache.registrar(acierto=False)
+        response = vista(request, *args, **kwargs)
+        if response.status_code == 200:
+            almacen.set(clave, response.data, settings.PRODUCTOS_CACHE_TIMEOUT)
+            response.clave_cache = clave
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class PorIdsMixin:
+    """
+    `?ids=1,2,3` en `list`: los objetos pedidos en ese orden, completos como en
+    el detalle, con una sola consulta `IN` (más sus precargas), y en
+    `faltantes` los ids que no existen. Sin `?ids=` el listado no cambia.
+    """
+
+    def ids_pedidos(self):
+        valor = self.request.query_params.get('ids')
+        if valor is None:
+            return None
+        try:
+            ids = [int(pk) for pk in valor.split(',') if pk.strip()]
+        except ValueError:
+            raise serializers.ValidationError({'ids': ['Se esperan ids enteros separados por comas.']})
+        if not ids or len(ids) > settings.PRODUCTOS_IDS_MAXIMO:
+            raise serializers.ValidationError({'ids': [f'Entre 1 y {settings.PRODUCTOS_IDS_MAXIMO} ids.']})
+        # Sin repetidos, en el orden pedido
+        return list(dict.fromkeys(ids))
+
+    def list(self, request, *args, **kwargs):
+        ids = self.ids_pedidos()
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        objetos = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([objetos[pk] for pk in ids if pk in objetos], many=True)
+        return Response({'results': serializer.data, 'faltantes': [pk for pk in ids if pk not in objetos]})
+
+
+class ListadoRapidoMixin:
+    """
+    `list` con la serialización rápida de productos/rapido.py: la página se lee
+    con `.values()` y se arma sin instancias de modelo ni ModelSerializer.
+    El resto de acciones usa `serializer_class` como siempre.
+    """
+    lista_rapida_class = None
+
+    def get_lista_rapida(self):
+        return self.lista_rapida_class(self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        if self.lista_rapida_class is None:
+            return super().list(request, *args, **kwargs)
+
+        rapida = self.get_lista_rapida()
+        queryset = self.filter_queryset(self.get_queryset())
+        # La paginación por cursor lee de cada fila las columnas por las que ordena
+        orden = self.paginator.get_ordering(request, queryset, self) if hasattr(self.paginator, 'get_ordering') else ()
+        # Las precargas son para instancias; la lista rápida carga lo relacionado en preparar()
+        queryset = queryset.prefetch_related(None).values(*rapida.columnas(campo.lstrip('-') for campo in orden))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rapida.representar(page))
+        return Response(rapida.representar(queryset))
+
+
+def opciones_campos(query_params, expandir_por_defecto=(), validos=None):
+    """
+    Lee `?fields=a,b` y `?expand=x,y` y devuelve `{'campos': [...] o None, 'expandir': set}`.
+    Lo expandido por defecto se suma a lo pedido. Con `validos`, un campo
+    desconocido es un error de validación (400) que lista los válidos.
+    """
+    campos = [campo for campo in query_params.get('fields', '').split(',') if campo]
+    desconocidos = [campo for campo in campos if validos is not None and campo not in validos]
+    if desconocidos:
+        raise serializers.ValidationError({'fields': [
+            f'Campos desconocidos: {", ".join(desconocidos)}. Válidos: {", ".join(validos)}.'
+        ]})
+    expandir = {campo for campo in query_params.get('expand', '').split(',') if campo}
+    return {'campos': campos or None, 'expandir': set(expandir_por_defecto) | expandir}
+
+
+class CamposSelectivosMixin:
+    """
+    Respuestas con `?fields=` (columnas a devolver, y a leer de la base de datos)
+    y `?expand=` (anidados opcionales) en las lecturas. Los listados no expanden
+    nada por defecto; el resto de acciones expande `expandir_por_defecto`.
+    """
+    acciones_lista = ('list',)
+    expandir_por_defecto = ()
+
+    def opciones_campos(self):
+        if self.request.method not in SAFE_METHODS:
+            return {'campos': None, 'expandir': set(self.expandir_por_defecto)}
+        # ?ids= devuelve objetos completos, como el detalle (ver PorIdsMixin)
+        listado = self.action in self.acciones_lista and 'ids' not in self.request.query_params
+        por_defecto = () if listado else self.expandir_por_defecto
+        validos = self.get_serializer_class().campos_disponibles()
+        return opciones_campos(self.request.query_params, por_defecto, validos)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.opciones_campos())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_lista_rapida(self):
+        return self.lista_rapida_class(self.get_serializer_context(), **self.opciones_campos())
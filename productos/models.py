@@ -1,20 +1,116 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Prefetch, Q, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-class Categoria(models.Model):
+class BorradoAgrupadoQuerySet(models.QuerySet):
+    """
+    delete() marca el catálogo una sola vez aunque la señal post_delete llegue
+    por cada fila borrada, también las de las cascadas.
+    """
+
+    def delete(self):
+        from .catalogo import cambios_agrupados
+
+        with transaction.atomic(using=self.db, savepoint=False), cambios_agrupados():
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+class BorradoAgrupadoMixin:
+    """Igual que BorradoAgrupadoQuerySet para el borrado de una instancia y sus cascadas."""
+
+    def delete(self, *args, **kwargs):
+        from .catalogo import cambios_agrupados
+
+        with transaction.atomic(using=kwargs.get('using')), cambios_agrupados():
+            return super().delete(*args, **kwargs)
+
+class Categoria(BorradoAgrupadoMixin, models.Model):
     nombre = models.CharField(max_length=100)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    objects = BorradoAgrupadoQuerySet.as_manager()
 
     def __str__(self):
         return self.nombre
 
-class Producto(models.Model):
+class ProductoQuerySet(BorradoAgrupadoQuerySet):
+    def con_resenas_recientes(self, limite=None):
+        """
+        Precarga solo las `limite` reseñas más recientes de cada producto en una
+        única consulta (ROW_NUMBER() particionado por producto).
+        """
+        return self.prefetch_related(
+            Prefetch('resenas', queryset=Reseña.objects.recientes_por_producto(limite), to_attr='resenas_recientes')
+        )
+
+    def con_stock_disponible(self, ahora=None):
+        """Anota `stock_disponible`: stock menos las reservas activas no vencidas."""
+        reservado = Reserva.objects.activas(ahora).filter(producto=OuterRef('pk')).order_by().values(
+            'producto'
+        ).annotate(total=Sum('cantidad')).values('total')
+        return self.annotate(stock_disponible=F('stock') - Coalesce(
+            Subquery(reservado), Value(0), output_field=models.IntegerField()
+        ))
+
+    def para_campos(self, campos=None, expandir=()):
+        """
+        Carga solo lo que necesita una respuesta con `?fields=` / `?expand=`:
+        reseñas, stock disponible y categoría solo si se piden, y `.only()` con
+        las columnas de los campos elegidos.
+        """
+        def pedido(campo):
+            return campos is None or campo in campos
+
+        queryset = self
+        if 'resenas' in expandir and pedido('resenas'):
+            queryset = queryset.con_resenas_recientes()
+        if pedido('stock_disponible'):
+            queryset = queryset.con_stock_disponible()
+        if 'categoria' in expandir and pedido('categoria'):
+            queryset = queryset.select_related('categoria')
+        if campos is not None:
+            columnas = {'imagen_srcset': ('imagen', 'imagen_variantes')}
+            concretos = {campo.name for campo in self.model._meta.concrete_fields}
+            queryset = queryset.only(*(
+                columna for campo in campos for columna in columnas.get(campo, (campo,)) if columna in concretos
+            ))
+        return queryset
+
+class Producto(BorradoAgrupadoMixin, models.Model):
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField()
     precio = models.DecimalField(max_digits=8, decimal_places=2)
     imagen = models.ImageField(upload_to='productos/', blank=True, null=True)
+    # Variantes responsive de la imagen (ver productos/imagenes.py)
+    imagen_variantes = models.JSONField(default=dict, blank=True, editable=False)
     categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='productos')
     disponible = models.BooleanField(default=True)
     stock = models.PositiveIntegerField(default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    # Agregados de reseñas desnormalizados (ver productos/calificaciones.py)
+    resenas_count = models.PositiveIntegerField(default=0)
+    calificacion_suma = models.PositiveIntegerField(default=0)
+    calificacion_promedio = models.FloatField(default=0)
+    estrellas_1 = models.PositiveIntegerField(default=0)
+    estrellas_2 = models.PositiveIntegerField(default=0)
+    estrellas_3 = models.PositiveIntegerField(default=0)
+    estrellas_4 = models.PositiveIntegerField(default=0)
+    estrellas_5 = models.PositiveIntegerField(default=0)
+
+    objects = ProductoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-calificacion_promedio', 'id'], name='producto_promedio_idx'),
+            # Filtro habitual del listado: ?categoria=&disponible=
+            models.Index(fields=['categoria', 'disponible'], name='producto_cat_disp_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -23,12 +119,158 @@ class Producto(models.Model):
         if self.precio is not None and self.precio < 0:
             raise ValidationError({'precio': 'El precio no puede ser negativo.'})
 
-class Reseña(models.Model):
+class ReseñaQuerySet(BorradoAgrupadoQuerySet):
+    """
+    Las operaciones masivas no disparan señales por fila, así que recalculan los
+    agregados de los productos afectados en la misma transacción.
+    """
+
+    def recientes_por_producto(self, limite=None):
+        """Las `limite` reseñas más recientes de cada producto (ROW_NUMBER() particionado por producto)."""
+        if limite is None:
+            limite = settings.PRODUCTOS_RESENAS_EMBEBIDAS
+        return self.annotate(
+            fila=Window(
+                RowNumber(),
+                partition_by=[F('producto_id')],
+                order_by=[F('creado_en').desc(), F('id').desc()],
+            )
+        ).filter(fila__lte=limite).order_by('-creado_en', '-id')
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .calificaciones import recalcular
+        from .catalogo import marcar_cambio
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            creadas = super().bulk_create(objs, *args, **kwargs)
+            recalcular({resena.producto_id for resena in creadas})
+            marcar_cambio(Reseña, Producto)
+        return creadas
+
+    def update(self, **kwargs):
+        from .calificaciones import recalcular
+        from .catalogo import marcar_cambio
+
+        kwargs.setdefault('actualizado_en', timezone.now())
+        with transaction.atomic(using=self.db, savepoint=False):
+            if 'calificacion' not in kwargs and 'producto' not in kwargs and 'producto_id' not in kwargs:
+                filas = super().update(**kwargs)
+            else:
+                antes = dict(self.values_list('pk', 'producto_id'))
+                filas = super().update(**kwargs)
+                despues = Reseña.objects.using(self.db).filter(pk__in=antes).values_list('producto_id', flat=True)
+                recalcular(set(antes.values()) | set(despues))
+            if filas:
+                marcar_cambio(Reseña, Producto)
+        return filas
+
+    def delete(self):
+        from .calificaciones import recalcular
+        from .catalogo import cambios_agrupados, marcar_cambio
+
+        with transaction.atomic(using=self.db, savepoint=False), cambios_agrupados():
+            producto_ids = set(self.values_list('producto_id', flat=True))
+            resultado = super().delete()
+            recalcular(producto_ids)
+            if resultado[0]:
+                marcar_cambio(Reseña, Producto)
+        return resultado
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+class Reseña(BorradoAgrupadoMixin, models.Model):
     producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='resenas')
     nombre = models.CharField(max_length=100)
     comentario = models.TextField()
     calificacion = models.PositiveIntegerField(choices=[(i, i) for i in range(1, 6)])
     creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    objects = ReseñaQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Orden estable de la paginación por cursor de /api/resenas/
+            models.Index(fields=['-creado_en', '-id'], name='resena_creado_id_idx'),
+            # Reseñas más recientes de cada producto (prefetch con ROW_NUMBER())
+            models.Index(fields=['producto', '-creado_en', '-id'], name='resena_producto_creado_idx'),
+        ]
 
     def __str__(self):
         return f'{self.nombre} - {self.calificacion}★'
+
+    def save(self, *args, **kwargs):
+        # La reseña y los agregados de su producto (señales) se confirman juntos
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Valores persistidos, para aplicar el delta correcto al guardar cambios
+        instancia._original = (instancia.__dict__.get('producto_id'), instancia.__dict__.get('calificacion'))
+        return instancia
+
+
+class VersionCatalogo(models.Model):
+    """
+    Fila única con un contador que se incrementa con cada escritura en el
+    catálogo (ver productos/catalogo.py); sirve de ETag para los GET condicionales.
+    """
+    version = models.BigIntegerField(default=0)
+    actualizado_en = models.DateTimeField(default=timezone.now)
+    # Último Cambio purgado: los tokens de sincronización anteriores ya no sirven
+    cambios_purgados_hasta = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'v{self.version}'
+
+class Cambio(models.Model):
+    """
+    Registro de cambios para /api/sincronizar/: una fila por cada INSERT, UPDATE
+    o DELETE de categorías, productos y reseñas, escrita por triggers de la base
+    de datos (migración 0011), así que también cubre las escrituras masivas y el
+    SQL directo. El id es el token de sincronización.
+    """
+    modelo = models.CharField(max_length=20)
+    objeto_id = models.BigIntegerField()
+    creado_en = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.modelo} {self.objeto_id}'
+
+class ReservaQuerySet(models.QuerySet):
+    def activas(self, ahora=None):
+        return self.filter(estado=Reserva.ACTIVA, expira_en__gt=ahora or timezone.now())
+
+class Reserva(models.Model):
+    """Unidades apartadas para un carrito durante un tiempo limitado."""
+    ACTIVA = 'activa'
+    CONVERTIDA = 'convertida'
+    LIBERADA = 'liberada'
+    EXPIRADA = 'expirada'
+    ESTADOS = [
+        (ACTIVA, 'Activa'),
+        (CONVERTIDA, 'Convertida en venta'),
+        (LIBERADA, 'Liberada'),
+        (EXPIRADA, 'Expirada'),
+    ]
+
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='reservas')
+    cantidad = models.PositiveIntegerField()
+    estado = models.CharField(max_length=10, choices=ESTADOS, default=ACTIVA)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    expira_en = models.DateTimeField()
+
+    objects = ReservaQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Índices parciales: solo las reservas activas cuentan para el stock disponible
+            models.Index(fields=['producto', 'expira_en'], condition=Q(estado='activa'), name='reserva_activa_idx'),
+            models.Index(fields=['expira_en'], condition=Q(estado='activa'), name='reserva_vencimiento_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.producto_id} x{self.cantidad} ({self.estado})'
@@ -0,0 +1,49 @@
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+# 🔹 Paginación por cursor (keyset): sin COUNT(*) y con latencia estable en tablas grandes
+class CursorPorId(CursorPagination):
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() con el ORM asíncrono para productos/vistas_async.py:
+        mismos cursores, orden y enlaces `next`/`previous` que la vista síncrona.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, posicion = self.cursor or (0, False, None)
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if posicion is not None:
+            orden = self.ordering[0]
+            # Cursor invertido XOR orden descendente
+            comparacion = 'lt' if reverse != orden.startswith('-') else 'gt'
+            queryset = queryset.filter(**{f'{orden.lstrip("-")}__{comparacion}': posicion})
+
+        # Un elemento de más para saber si hay página siguiente
+        limite = self.page_size + 1
+        resultados = [obj async for obj in queryset[offset:offset + limite].aiterator(chunk_size=limite)]
+        self.page = resultados[:self.page_size]
+        hay_mas = len(resultados) > len(self.page)
+        siguiente = self._get_position_from_instance(resultados[-1], self.ordering) if hay_mas else None
+
+        hay_anterior = posicion is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = hay_anterior, posicion
+            self.has_previous, self.previous_position = hay_mas, siguiente
+        else:
+            self.has_next, self.next_position = hay_mas, siguiente
+            self.has_previous, self.previous_position = hay_anterior, posicion
+        return self.page
+
+
+class CursorResenas(CursorPorId):
+    # El id desempata reseñas creadas en el mismo instante
+    ordering = ('-creado_en', '-id')
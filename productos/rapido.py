@@ -0,0 +1,142 @@
+"""
+Serialización rápida de solo lectura para los listados.
+
+Lee filas con `.values()` y arma los diccionarios directamente, con el mismo
+esquema (y orden de claves) que el ModelSerializer correspondiente: no crea
+instancias de modelo ni recorre `to_representation` campo a campo salvo en los
+tipos que lo necesitan (Decimal, fechas, archivos, choices). Las escrituras y
+el detalle siguen usando los serializers normales.
+"""
+from collections import defaultdict
+
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+
+from .imagenes import urls_de_variantes
+from .models import Categoria, Reseña
+from .serializers import CategoriaSerializer, ProductoSerializer, ReseñaSerializer
+
+# Campos cuyo valor de la base de datos ya es la representación JSON
+SIN_CONVERSION = (
+    serializers.IntegerField, serializers.FloatField, serializers.BooleanField,
+    serializers.CharField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class ListaRapida:
+    """
+    Representa filas de `.values()` como lo haría `serializer_class(many=True)`.
+
+    Los SerializerMethodField y los serializers anidados se resuelven con
+    `get_<campo>(fila)` de la subclase; `requiere` indica qué columnas necesita
+    cada uno y `preparar(filas)` permite cargar datos relacionados para toda la
+    página de una vez. Las opciones extra (p. ej. `campos`/`expandir`) se pasan
+    al serializer, así que el esquema es siempre el mismo.
+    """
+    serializer_class = None
+    requiere = {}
+
+    def __init__(self, context=None, **opciones):
+        self.context = context or {}
+        serializer = self.serializer_class(context=self.context, **opciones)
+        modelo = self.serializer_class.Meta.model
+        self.campos = []
+        # Campos resueltos con get_<campo>(fila)
+        self.calculados = set()
+        for nombre, campo in serializer.fields.items():
+            if campo.write_only:
+                continue
+            if isinstance(campo, (serializers.SerializerMethodField, serializers.BaseSerializer)):
+                self.campos.append((nombre, None, getattr(self, f'get_{nombre}')))
+                self.calculados.add(nombre)
+            elif isinstance(campo, serializers.FileField):
+                self.campos.append((nombre, campo.source, self._convertir_archivo(campo, modelo._meta.get_field(campo.source))))
+            elif isinstance(campo, SIN_CONVERSION) and not isinstance(campo, serializers.ChoiceField):
+                self.campos.append((nombre, campo.source, None))
+            else:
+                self.campos.append((nombre, campo.source, campo.to_representation))
+
+    @staticmethod
+    def _convertir_archivo(campo, campo_modelo):
+        def convertir(nombre):
+            return campo.to_representation(FieldFile(None, campo_modelo, nombre))
+        return convertir
+
+    def columnas(self, extra=()):
+        """Columnas para `.values()`: las de los campos pedidos más `extra` (p. ej. las del orden)."""
+        columnas = {}
+        for nombre, columna, _ in self.campos:
+            for requerida in ((columna,) if columna else self.requiere.get(nombre, ())):
+                columnas[requerida] = None
+        columnas.update(dict.fromkeys(extra))
+        return list(columnas)
+
+    def preparar(self, filas):
+        pass
+
+    def representar(self, filas):
+        filas = list(filas)
+        self.preparar(filas)
+        datos = []
+        for fila in filas:
+            item = {}
+            for nombre, columna, convertir in self.campos:
+                if columna is None:
+                    item[nombre] = convertir(fila)
+                    continue
+                valor = fila[columna]
+                item[nombre] = valor if convertir is None or valor is None else convertir(valor)
+            datos.append(item)
+        return datos
+
+
+class CategoriasRapidas(ListaRapida):
+    serializer_class = CategoriaSerializer
+
+
+class ReseñasRapidas(ListaRapida):
+    serializer_class = ReseñaSerializer
+
+
+class ProductosRapidos(ListaRapida):
+    serializer_class = ProductoSerializer
+    requiere = {
+        'resenas': ('id',),
+        # Anotado por ProductoQuerySet.con_stock_disponible()
+        'stock_disponible': ('stock_disponible',),
+        'imagen_srcset': ('imagen', 'imagen_variantes'),
+        # Con ?expand=categoria
+        'categoria': ('categoria',),
+    }
+
+    def preparar(self, filas):
+        # Lo anidado de toda la página en una consulta por relación, como con las precargas
+        self.resenas = defaultdict(list)
+        self.categorias = {}
+        if not filas:
+            return
+        if 'resenas' in self.calculados:
+            resenas = ReseñasRapidas(self.context)
+            recientes = Reseña.objects.recientes_por_producto().filter(
+                producto_id__in=[fila['id'] for fila in filas]
+            ).values(*resenas.columnas())
+            for item in resenas.representar(recientes):
+                self.resenas[item['producto']].append(item)
+        if 'categoria' in self.calculados:
+            categorias = CategoriasRapidas(self.context)
+            filas_categorias = Categoria.objects.filter(
+                pk__in={fila['categoria'] for fila in filas}
+            ).values(*categorias.columnas())
+            self.categorias = {item['id']: item for item in categorias.representar(filas_categorias)}
+
+    def get_resenas(self, fila):
+        return self.resenas.get(fila['id'], [])
+
+    def get_stock_disponible(self, fila):
+        return fila['stock_disponible']
+
+    def get_imagen_srcset(self, fila):
+        return urls_de_variantes(fila['imagen'], fila['imagen_variantes'], self.context.get('request'))
+
+    def get_categoria(self, fila):
+        return self.categorias.get(fila['categoria'])
@@ -0,0 +1,67 @@
+"""
+Renderer y parser JSON basados en orjson.
+
+Producen exactamente los mismos bytes que `rest_framework.renderers.JSONRenderer`
+(salida compacta, UTF-8 sin escapar, U+2028/U+2029 escapados) y delegan en las
+clases de DRF cuando orjson no está instalado o cuando la salida podría diferir:
+con sangría (API navegable), con ensure_ascii o si orjson no sabe serializar un
+valor. Diferencias conocidas, fuera de los valores que devuelve esta API: los
+floats con |x| < 1e-4 o >= 1e16 se escriben sin exponente con signo (1e16 en
+lugar de 1e+16) y NaN/Infinity como null en lugar de lanzar ValueError.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+if orjson is not None:
+    # Fechas, horas y dataclasses pasan por el encoder de DRF (mismo formato que hoy);
+    # Decimal, Promise, querysets, etc. llegan a `default` porque orjson no los soporta
+    OPCIONES = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=OPCIONES)
+        except (TypeError, ValueError):
+            # Claves no str, enteros de más de 64 bits...
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        contenido = stream.read() if stream is not None else b''
+        try:
+            return orjson.loads(contenido)
+        except orjson.JSONDecodeError:
+            pass
+        # orjson rechaza lo que json admite (NaN sin modo estricto, enteros enormes);
+        # json decide y da el mismo mensaje de error que JSONParser
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(contenido.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
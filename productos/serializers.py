@@ -1,5 +1,9 @@
+import functools
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import Categoria, Producto, Reseña
+from .imagenes import urls_variantes
+from .models import Categoria, Producto, Reseña, Reserva
 
 class CategoriaSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,8 +16,73 @@ class ReseñaSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class ProductoSerializer(serializers.ModelSerializer):
-    resenas = ReseñaSerializer(many=True, read_only=True)  # 👈 relaciones
+    # 👈 solo las reseñas más recientes; el resto se pagina en /api/resenas/
+    resenas = serializers.SerializerMethodField()
+    stock_disponible = serializers.SerializerMethodField()
+    imagen_srcset = serializers.SerializerMethodField()
+
+    # Anidados opcionales de ?expand=
+    expansiones = ('resenas', 'categoria')
+
+    def __init__(self, *args, campos=None, expandir=('resenas',), **kwargs):
+        # ?fields= y ?expand= (ver CamposSelectivosMixin)
+        super().__init__(*args, **kwargs)
+        if 'categoria' in expandir:
+            self.fields['categoria'] = CategoriaSerializer(read_only=True)
+        if 'resenas' not in expandir:
+            self.fields.pop('resenas')
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+    @classmethod
+    @functools.cache
+    def campos_disponibles(cls):
+        """Nombres válidos en ?fields=: todos los campos con todo expandido."""
+        return tuple(cls(expandir=cls.expansiones).fields)
 
     class Meta:
         model = Producto
-        fields = '__all__'
+        exclude = ['imagen_variantes']
+        read_only_fields = [
+            'resenas_count', 'calificacion_suma', 'calificacion_promedio',
+            'estrellas_1', 'estrellas_2', 'estrellas_3', 'estrellas_4', 'estrellas_5',
+        ]
+
+    def get_resenas(self, obj):
+        # Usa la precarga de ProductoQuerySet.con_resenas_recientes() si existe
+        resenas = getattr(obj, 'resenas_recientes', None)
+        if resenas is None:
+            resenas = obj.resenas.order_by('-creado_en', '-id')[:settings.PRODUCTOS_RESENAS_EMBEBIDAS]
+        return ReseñaSerializer(resenas, many=True, context=self.context).data
+
+    def get_imagen_srcset(self, obj):
+        # {ancho: url} de las variantes WebP, para construir el srcset en el cliente
+        return urls_variantes(obj, self.context.get('request'))
+
+    def get_stock_disponible(self, obj):
+        # Stock menos reservas activas; anotado por ProductoQuerySet.con_stock_disponible()
+        disponible = getattr(obj, 'stock_disponible', None)
+        if disponible is None:
+            disponible = Producto.objects.con_stock_disponible().filter(pk=obj.pk).values_list(
+                'stock_disponible', flat=True
+            ).first()
+        return disponible
+
+class LineaCheckoutSerializer(serializers.Serializer):
+    # Ids simples: validar con PrimaryKeyRelatedField haría una consulta por línea
+    producto = serializers.IntegerField(min_value=1)
+    cantidad = serializers.IntegerField(min_value=1)
+
+class CheckoutSerializer(serializers.Serializer):
+    lineas = LineaCheckoutSerializer(many=True, allow_empty=False)
+
+class ReservaSerializer(serializers.ModelSerializer):
+    # Duración opcional de la reserva en segundos (por defecto PRODUCTOS_RESERVA_TTL)
+    ttl = serializers.IntegerField(min_value=1, max_value=24 * 60 * 60, required=False, write_only=True)
+    cantidad = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Reserva
+        fields = ['id', 'producto', 'cantidad', 'ttl', 'estado', 'creado_en', 'expira_en']
+        read_only_fields = ['estado', 'creado_en', 'expira_en']
@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .calificaciones import aplicar_resena
+from .catalogo import marcar_cambio
+from .imagenes import programar_variantes
+from .models import Categoria, Producto, Reseña, Reserva
+
+
+# 🔹 Agregados de calificación: cada reseña guardada o borrada ajusta su producto
+@receiver(pre_save, sender=Reseña)
+def recordar_resena_original(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or None not in getattr(instance, '_original', (None,)):
+        return
+    # Instancia construida a mano con pk: leemos los valores persistidos
+    instance._original = tuple(
+        Reseña.objects.filter(pk=instance.pk).values_list('producto_id', 'calificacion').first() or (None, None)
+    )
+
+
+@receiver(post_save, sender=Reseña)
+def actualizar_agregados_al_guardar(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    original = getattr(instance, '_original', (None, None))
+    actual = (instance.producto_id, instance.calificacion)
+    if not created and original != actual:
+        if None not in original:
+            aplicar_resena(*original, signo=-1)
+        aplicar_resena(*actual)
+    elif created:
+        aplicar_resena(*actual)
+    instance._original = actual
+
+
+@receiver(post_delete, sender=Reseña)
+def actualizar_agregados_al_borrar(sender, instance, origin=None, **kwargs):
+    # Los borrados masivos (ReseñaQuerySet.delete) recalculan al final, y en las
+    # cascadas desde Producto o Categoria el producto desaparece igualmente.
+    if isinstance(origin, Reseña):
+        aplicar_resena(instance.producto_id, instance.calificacion, signo=-1)
+
+
+# 🔹 Variantes de imagen: se regeneran en segundo plano cuando cambia Producto.imagen
+@receiver(post_save, sender=Producto)
+def programar_variantes_imagen(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    nombre = instance.imagen.name if instance.imagen else None
+    if (instance.imagen_variantes or {}).get('origen') == nombre:
+        return
+    if nombre is None:
+        Producto.objects.filter(pk=instance.pk).update(imagen_variantes={})
+        return
+    transaction.on_commit(lambda: programar_variantes(instance.pk, nombre))
+
+
+# 🔹 Versión del catálogo: cualquier escritura invalida los ETag de las vistas de lectura
+def marcar_cambio_catalogo(sender, raw=False, **kwargs):
+    if not raw:
+        marcar_cambio(sender)
+
+
+for modelo in (Categoria, Producto, Reseña, Reserva):
+    post_save.connect(marcar_cambio_catalogo, sender=modelo, dispatch_uid=f'catalogo_guardar_{modelo.__name__}')
+    post_delete.connect(marcar_cambio_catalogo, sender=modelo, dispatch_uid=f'catalogo_borrar_{modelo.__name__}')
@@ -0,0 +1,98 @@
+"""
+Sincronización incremental del catálogo para clientes offline.
+
+El token es el id del último `Cambio` que vio el cliente. Con él se devuelven
+las categorías, productos y reseñas escritos desde entonces (con el mismo
+esquema que los listados) y los ids borrados. Sin token se entrega el token
+actual: el cliente lo guarda antes de descargar el catálogo completo (listados
+o exportar_catalogo) y lo usa en la siguiente sincronización; lo que cambie
+mientras tanto se vuelve a enviar, y aplicar dos veces un cambio no tiene efecto.
+
+Un token purgado (ver `purgar`) o desconocido obliga a resincronizar desde cero.
+El stock disponible viaja como instantánea: las reservas no generan cambios.
+"""
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import Cambio, Categoria, Producto, Reseña, VersionCatalogo
+from .rapido import CategoriasRapidas, ProductosRapidos, ReseñasRapidas
+
+# modelo del registro -> (clave en la respuesta, queryset, lista rápida)
+MODELOS = {
+    'categoria': ('categorias', lambda: Categoria.objects.all(), CategoriasRapidas),
+    'producto': ('productos', lambda: Producto.objects.para_campos(), ProductosRapidos),
+    'resena': ('resenas', lambda: Reseña.objects.all(), ReseñasRapidas),
+}
+
+
+class TokenCaducado(Exception):
+    """El token no sirve para sincronizar: hay que descargar el catálogo completo."""
+
+
+def disponible():
+    # Los triggers que llenan el registro solo existen en SQLite (migración 0011)
+    return connection.vendor == 'sqlite'
+
+
+def purgados_hasta():
+    return VersionCatalogo.objects.filter(pk=1).values_list('cambios_purgados_hasta', flat=True).first() or 0
+
+
+def token_actual():
+    return str(max(Cambio.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0, purgados_hasta()))
+
+
+def leer_token(token):
+    try:
+        desde = int(token)
+    except (TypeError, ValueError):
+        raise TokenCaducado('Token de sincronización no válido.')
+    if not disponible() or desde < purgados_hasta() or desde > int(token_actual()):
+        raise TokenCaducado('El token de sincronización caducó; descargue el catálogo completo.')
+    return desde
+
+
+def cambios_desde(token, limite, context=None):
+    """
+    Hasta `limite` cambios posteriores a `token`: filas actuales de lo creado o
+    modificado y `borrados` con los ids que ya no existen. `hay_mas` indica que
+    quedan cambios por pedir con el token devuelto.
+    """
+    desde = leer_token(token)
+    registro = list(Cambio.objects.filter(id__gt=desde).order_by('id').values_list('id', 'modelo', 'objeto_id')[:limite + 1])
+    hay_mas = len(registro) > limite
+    registro = registro[:limite]
+
+    pendientes = {modelo: [] for modelo in MODELOS}
+    for _, modelo, objeto_id in registro:
+        pendientes[modelo].append(objeto_id)
+
+    respuesta = {'token': str(registro[-1][0] if registro else desde), 'hay_mas': hay_mas}
+    borrados = {}
+    for modelo, (clave, queryset, lista_rapida) in MODELOS.items():
+        ids = list(dict.fromkeys(pendientes[modelo]))
+        filas = []
+        if ids:
+            opciones = {'expandir': ()} if lista_rapida is ProductosRapidos else {}
+            rapida = lista_rapida(context, **opciones)
+            filas = rapida.representar(list(queryset().filter(pk__in=ids).order_by('pk').values(*rapida.columnas())))
+        respuesta[clave] = filas
+        existentes = {fila['id'] for fila in filas}
+        borrados[clave] = [pk for pk in ids if pk not in existentes]
+    respuesta['borrados'] = borrados
+    return respuesta
+
+
+def purgar(antes_de):
+    """
+    Borra los cambios anteriores a `antes_de`; los tokens previos pasan a
+    requerir una resincronización completa. Devuelve cuántos se borraron.
+    """
+    horizonte = Cambio.objects.filter(creado_en__lt=antes_de).order_by('-id').values_list('id', flat=True).first()
+    if horizonte is None:
+        return 0
+    with transaction.atomic():
+        VersionCatalogo.objects.get_or_create(pk=1)
+        VersionCatalogo.objects.filter(pk=1, cambios_purgados_hasta__lt=horizonte).update(cambios_purgados_hasta=horizonte)
+        borrados, _ = Cambio.objects.filter(id__lte=horizonte).delete()
+    return borrados
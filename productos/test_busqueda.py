@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import busqueda
+from .models import Categoria, Producto, Reseña
+
+
+class BusquedaTests(TestCase):
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Postres")
+        self.crema = self.crear("Crème brûlée", "Postre francés con azúcar quemada")
+        self.pinata = self.crear("Torta piñata", "Sorpresa de caramelos")
+        self.cheesecake = self.crear("Cheesecake", "Con crema de maracuyá")
+
+    def crear(self, nombre, descripcion):
+        return Producto.objects.create(
+            nombre=nombre, descripcion=descripcion, precio=Decimal("10.00"), categoria=self.categoria
+        )
+
+    # 🧪 Prueba 1: Búsqueda sin tildes ni eñes
+    def test_insensible_a_acentos(self):
+        self.assertEqual(busqueda.buscar_ids("creme brulee"), [self.crema.id])
+        self.assertEqual(busqueda.buscar_ids("PINATA"), [self.pinata.id])
+
+    # 🧪 Prueba 2: Prefijos para autocompletado y ranking BM25 (nombre pesa más)
+    def test_prefijo_y_ranking(self):
+        self.assertEqual(busqueda.buscar_ids("cre"), [self.crema.id, self.cheesecake.id])
+        self.assertEqual(busqueda.buscar_ids("maracu"), [self.cheesecake.id])
+
+    # 🧪 Prueba 3: Los triggers mantienen el índice al editar, borrar y en operaciones masivas
+    def test_indice_sincronizado(self):
+        Producto.objects.filter(pk=self.pinata.pk).update(nombre="Torta arcoíris")
+        self.assertEqual(busqueda.buscar_ids("piñata"), [])
+        self.assertEqual(busqueda.buscar_ids("arcoiris"), [self.pinata.id])
+
+        self.crema.delete()
+        self.assertEqual(busqueda.buscar_ids("creme"), [])
+
+        nuevo, = Producto.objects.bulk_create([
+            Producto(nombre="Macarrones", descripcion="Franceses", precio=Decimal("3.00"), categoria=self.categoria)
+        ])
+        self.assertEqual(busqueda.buscar_ids("macarron"), [nuevo.id])
+
+    # 🧪 Prueba 4: Opcionalmente también en los comentarios de las reseñas
+    def test_buscar_en_resenas(self):
+        Reseña.objects.create(producto=self.pinata, nombre="Ana", comentario="Ideal para cumpleaños", calificacion=5)
+        self.assertEqual(busqueda.buscar_ids("cumpleanos"), [])
+        self.assertEqual(busqueda.buscar_ids("cumpleanos", incluir_resenas=True), [self.pinata.id])
+
+    # 🧪 Prueba 5: Texto con sintaxis FTS5 no rompe la consulta
+    def test_texto_con_simbolos(self):
+        self.assertEqual(busqueda.buscar_ids('"torta" OR (NEAR'), [])
+        self.assertEqual(busqueda.buscar_ids("   "), [])
+
+    # 🧪 Prueba 6: Endpoint /api/productos/buscar/
+    def test_endpoint_buscar(self):
+        response = APIClient().get(reverse('producto-buscar'), {"q": "cre", "limite": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.crema.id])
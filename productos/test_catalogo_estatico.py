@@ -0,0 +1,76 @@
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .catalogo_estatico import MANIFEST, exportar
+from .models import Categoria, Producto, Reseña
+
+
+class ExportarCatalogoTests(TestCase):
+
+    def setUp(self):
+        self.destino = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.destino, ignore_errors=True)
+        self.tortas = Categoria.objects.create(nombre="Tortas")
+        self.galletas = Categoria.objects.create(nombre="Galletas")
+        self.torta = Producto.objects.create(nombre="Torta", descripcion="Rica", precio=Decimal("20.00"),
+                                             categoria=self.tortas, stock=3)
+        Producto.objects.create(nombre="Oculta", descripcion="", precio=Decimal("1.00"), categoria=self.tortas,
+                                disponible=False)
+        Producto.objects.create(nombre="Galleta", descripcion="Crujiente", precio=Decimal("2.50"),
+                                categoria=self.galletas, stock=9)
+
+    def manifest(self):
+        return json.loads((self.destino / MANIFEST).read_text())
+
+    def categoria(self, categoria):
+        return json.loads((self.destino / self.manifest()['categorias'][str(categoria.pk)]['archivo']).read_text())
+
+    def test_exporta_categorias_y_manifest(self):
+        salida = StringIO()
+        call_command('exportar_catalogo', '--destino', str(self.destino), stdout=salida)
+        self.assertIn("2 de 2 categorías regeneradas", salida.getvalue())
+
+        datos = self.categoria(self.tortas)
+        self.assertEqual(datos['categoria'], {'id': self.tortas.pk, 'nombre': "Tortas"})
+        self.assertEqual([p['nombre'] for p in datos['productos']], ["Torta"])
+        producto = datos['productos'][0]
+        self.assertEqual(producto['precio'], "20.00")
+        self.assertEqual(producto['imagen_srcset'], {})
+        self.assertNotIn('stock', producto)
+        self.assertEqual(self.manifest()['categorias'][str(self.tortas.pk)]['productos'], 1)
+
+    def test_solo_regenera_lo_que_cambio(self):
+        exportar(self.destino)
+        antes = self.manifest()['categorias']
+        self.assertEqual(exportar(self.destino), (0, 2))
+
+        # Una reseña cambia el resumen de calificaciones de la torta
+        Reseña.objects.create(producto=self.torta, nombre="Ana", comentario="Rica", calificacion=4)
+        with self.assertNumQueries(3):
+            self.assertEqual(exportar(self.destino), (1, 2))
+        despues = self.manifest()['categorias']
+        self.assertNotEqual(despues[str(self.tortas.pk)]['archivo'], antes[str(self.tortas.pk)]['archivo'])
+        self.assertEqual(despues[str(self.galletas.pk)], antes[str(self.galletas.pk)])
+        self.assertEqual(self.categoria(self.tortas)['productos'][0]['calificacion_promedio'], 4.0)
+        # La versión anterior se purga
+        self.assertFalse((self.destino / antes[str(self.tortas.pk)]['archivo']).exists())
+
+    def test_cambios_de_categoria_y_borrados(self):
+        exportar(self.destino)
+        self.torta.categoria = self.galletas
+        self.torta.save()
+        self.assertEqual(exportar(self.destino), (2, 2))
+        self.assertEqual(self.categoria(self.tortas)['productos'], [])
+        self.assertEqual(len(self.categoria(self.galletas)['productos']), 2)
+
+        self.galletas.delete()
+        exportar(self.destino)
+        self.assertEqual(list(self.manifest()['categorias']), [str(self.tortas.pk)])
+        self.assertEqual(len(list(self.destino.glob('categoria-*.json'))), 1)
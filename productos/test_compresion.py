@@ -0,0 +1,87 @@
+import gzip
+import re
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import compresion
+from .compresion import elegir_codificacion
+from .models import Categoria, Producto
+
+
+class NegociacionTests(SimpleTestCase):
+
+    def test_elegir_codificacion(self):
+        self.assertEqual(elegir_codificacion('gzip, deflate'), 'gzip')
+        self.assertEqual(elegir_codificacion('deflate'), None)
+        self.assertEqual(elegir_codificacion(''), None)
+        self.assertEqual(elegir_codificacion('gzip;q=0, *'), 'br')
+        self.assertEqual(elegir_codificacion('*;q=0.5'), 'br')
+
+    def test_prefiere_brotli(self):
+        self.assertEqual(elegir_codificacion('gzip, br'), 'br')
+        self.assertEqual(elegir_codificacion('gzip, br;q=0.5'), 'gzip')
+
+
+class CompresionTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        self.categoria = Categoria.objects.create(nombre="Tortas")
+        Producto.objects.bulk_create([
+            Producto(nombre=f"Torta {i}", descripcion="Torta de chocolate con crema " * 4,
+                     precio=Decimal("10.00"), categoria=self.categoria, stock=5)
+            for i in range(20)
+        ])
+        self.url = reverse('producto-list')
+
+    def test_comprime_con_gzip(self):
+        plano = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plano)
+        self.assertIn('Accept-Encoding', plano['Vary'])
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plano.content))
+        self.assertEqual(gzip.decompress(response.content), plano.content)
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+    def test_respuestas_pequenas_sin_comprimir(self):
+        response = self.client.get(reverse('categoria-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_reutiliza_los_bytes_comprimidos(self):
+        with mock.patch.object(compresion, 'comprimir', wraps=compresion.comprimir) as espia:
+            primera = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            segunda = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(segunda['X-Cache'], 'HIT')
+            self.assertEqual(segunda.content, primera.content)
+            self.assertEqual(espia.call_count, 1)
+
+            # Un cambio en el catálogo invalida también los bytes comprimidos
+            Producto.objects.filter(pk=Producto.objects.first().pk).update(nombre="Otra")
+            Producto.objects.first().save()
+            tercera = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(espia.call_count, 2)
+        self.assertIn(b'Otra', gzip.decompress(tercera.content))
+
+    def test_api_navegable_no_comparte_bytes_comprimidos(self):
+        # El HTML lleva el token CSRF de cada cliente: no puede servirse a otro
+        paginas = []
+        for secreto in ("a" * 32, "b" * 32):
+            cliente = Client()
+            cliente.cookies['csrftoken'] = secreto
+            response = cliente.get(self.url, {"format": "api"}, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            paginas.append((response['X-Cache'], gzip.decompress(response.content).decode()))
+
+        self.assertEqual([cache for cache, _ in paginas], ['MISS', 'HIT'])
+        tokens = [re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html)[1] for _, html in paginas]
+        self.assertNotEqual(tokens[0], tokens[1])
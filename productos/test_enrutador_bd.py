@@ -0,0 +1,90 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import enrutador_bd
+from .enrutador_bd import COOKIE, EnrutadorReplica
+from .models import Categoria
+
+class EnrutadorReplicaTests(SimpleTestCase):
+
+    def setUp(self):
+        self.enrutador = EnrutadorReplica()
+
+    def lectura_en_replica(self, escribio=False):
+        t1 = enrutador_bd._leer_de_replica.set(True)
+        t2 = enrutador_bd._escribio.set(escribio)
+        try:
+            return self.enrutador.db_for_read(Categoria)
+        finally:
+            enrutador_bd._leer_de_replica.reset(t1)
+            enrutador_bd._escribio.reset(t2)
+
+    @mock.patch.object(enrutador_bd, 'replica_configurada', return_value=True)
+    def test_lectura_marcada_va_a_la_replica(self, _):
+        self.assertEqual(self.lectura_en_replica(), 'replica')
+        self.assertEqual(self.enrutador.db_for_read(Categoria), 'default')
+
+    @mock.patch.object(enrutador_bd, 'replica_configurada', return_value=True)
+    def test_tras_escribir_se_lee_del_primario(self, _):
+        self.assertEqual(self.lectura_en_replica(escribio=True), 'default')
+
+    @mock.patch.object(enrutador_bd, 'replica_configurada', return_value=False)
+    def test_sin_replica_configurada_todo_va_al_primario(self, _):
+        self.assertEqual(self.lectura_en_replica(), 'default')
+
+
+class PrimarioTrasEscrituraTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        self.url = reverse('categoria-list')
+        Categoria.objects.create(nombre="Tortas")
+
+    def lecturas_a_replica(self, *peticiones):
+        """Cuenta las lecturas que se habrían enviado a la réplica."""
+        with mock.patch.object(enrutador_bd, 'replica_configurada', return_value=False) as espia:
+            for peticion in peticiones:
+                peticion()
+        return espia.call_count
+
+    def test_list_lee_de_replica_y_no_fija_cookie(self):
+        response = None
+
+        def listar():
+            nonlocal response
+            response = self.client.get(self.url)
+
+        self.assertGreater(self.lecturas_a_replica(listar), 0)
+        self.assertNotIn(COOKIE, response.cookies)
+
+    def test_escritura_fija_cookie_y_pega_al_primario(self):
+        response = self.client.post(self.url, {"nombre": "Galletas"})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(COOKIE, response.cookies)
+        self.assertEqual(response.cookies[COOKIE]['max-age'], settings.REPLICA_STICKY_SEGUNDOS)
+
+        # El cliente conserva la cookie: sus lecturas siguientes van al primario
+        self.assertEqual(self.lecturas_a_replica(lambda: self.client.get(self.url)), 0)
+
+    def test_cookie_vencida_vuelve_a_la_replica(self):
+        self.client.cookies[COOKIE] = str(time.time() - settings.REPLICA_STICKY_SEGUNDOS - 1)
+        self.assertGreater(self.lecturas_a_replica(lambda: self.client.get(self.url)), 0)
+
+
+    def test_escrituras_seguidas_renuevan_la_cookie(self):
+        primera = self.client.post(self.url, {"nombre": "Galletas"})
+        # Simula que la ventana está a punto de vencer cuando llega la segunda escritura
+        self.client.cookies[COOKIE] = str(time.time() - settings.REPLICA_STICKY_SEGUNDOS + 0.5)
+        segunda = self.client.post(self.url, {"nombre": "Alfajores"})
+        self.assertIn(COOKIE, segunda.cookies)
+        self.assertGreaterEqual(float(segunda.cookies[COOKIE].value), float(primera.cookies[COOKIE].value))
+
+        # Una lectura dentro de la ventana no la renueva
+        self.assertNotIn(COOKIE, self.client.get(self.url).cookies)
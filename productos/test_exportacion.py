@@ -0,0 +1,103 @@
+import csv
+import datetime
+import io
+import json
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Categoria, Producto, Reseña
+
+
+class ExportacionTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "clave")
+        self.client.force_authenticate(self.admin)
+        self.tortas = Categoria.objects.create(nombre="Tortas")
+        self.galletas = Categoria.objects.create(nombre="Galletas")
+        self.torta = Producto.objects.create(nombre="Torta", descripcion="Rica, \"casera\"", precio=Decimal("10.00"),
+                                             categoria=self.tortas)
+        self.galleta = Producto.objects.create(nombre="Galleta", descripcion="Crujiente", precio=Decimal("1.50"),
+                                               categoria=self.galletas)
+        self.resenas = [
+            Reseña.objects.create(producto=producto, nombre=f"Cliente {i}", comentario="Bien", calificacion=4)
+            for i, producto in enumerate([self.torta, self.torta, self.galleta])
+        ]
+        # Fechas fijas para el filtro por rango
+        for i, reseña in enumerate(self.resenas):
+            Reseña.objects.filter(pk=reseña.pk).update(
+                creado_en=timezone.make_aware(datetime.datetime(2024, 1, 10 + i, 12)))
+
+    def exportar(self, url, **parametros):
+        response = self.client.get(url, parametros)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    # 🧪 Prueba 1: NDJSON con el mismo esquema que el listado
+    def test_resenas_ndjson(self):
+        contenido = self.exportar("/api/resenas/exportar/")
+        filas = [json.loads(linea) for linea in contenido.splitlines()]
+        self.assertEqual([fila["id"] for fila in filas], [r.id for r in self.resenas])
+        listado = self.client.get("/api/resenas/").json()["results"]
+        self.assertEqual(set(filas[0]), set(listado[0]))
+
+    # 🧪 Prueba 2: filtros por categoría y rango de fechas (hasta inclusivo)
+    def test_resenas_filtros(self):
+        contenido = self.exportar("/api/resenas/exportar/", categoria=self.tortas.id)
+        self.assertEqual(len(contenido.splitlines()), 2)
+        contenido = self.exportar("/api/resenas/exportar/", desde="2024-01-11", hasta="2024-01-12")
+        self.assertEqual([json.loads(l)["id"] for l in contenido.splitlines()], [r.id for r in self.resenas[1:]])
+        response = self.client.get("/api/resenas/exportar/", {"desde": "ayer"})
+        self.assertEqual(response.status_code, 400)
+
+    # 🧪 Prueba 3: CSV de productos con ?fields= y cabecera
+    def test_productos_csv(self):
+        contenido = self.exportar("/api/productos/exportar/", formato="csv", fields="id,nombre,descripcion")
+        filas = list(csv.reader(io.StringIO(contenido)))
+        self.assertEqual(filas[0], ["id", "nombre", "descripcion"])
+        self.assertEqual(filas[1], [str(self.torta.id), "Torta", "Rica, \"casera\""])
+        self.assertEqual(len(filas), 3)
+
+    # 🧪 Prueba 4: consultas por trozo, no por fila
+    @override_settings(PRODUCTOS_EXPORTACION_CHUNK=2)
+    def test_consultas_por_trozo(self):
+        for i in range(4):
+            Producto.objects.create(nombre=f"Extra {i}", descripcion="d", precio=Decimal("1.00"), categoria=self.tortas)
+        with CaptureQueriesContext(connection) as capturadas:
+            contenido = self.exportar("/api/productos/exportar/", expand="categoria")
+        self.assertEqual(len(contenido.splitlines()), 6)
+        self.assertEqual(json.loads(contenido.splitlines()[0])["categoria"]["nombre"], "Tortas")
+        # Cursor de productos y una consulta de categorías por cada trozo de 2 filas
+        self.assertLessEqual(len([c for c in capturadas if 'SAVEPOINT' not in c['sql']]), 1 + 3)
+
+    # 🧪 Prueba 5: solo administradores y formatos conocidos
+    def test_permisos_y_formato(self):
+        self.assertEqual(self.client.get("/api/productos/exportar/", {"formato": "xml"}).status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get("/api/resenas/exportar/").status_code, (401, 403))
+
+    # 🧪 Prueba 6: bajo ASGI el contenido es asíncrono (Django no lo acumula) e igual al de WSGI
+    @override_settings(PRODUCTOS_EXPORTACION_CHUNK=2)
+    async def test_exportacion_asgi(self):
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        cliente = AsyncClient()
+        for formato in ("ndjson", "csv"):
+            response = await cliente.get("/api/resenas/exportar/", {"formato": formato},
+                                         headers={"Authorization": f"Bearer {token}"})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            contenido = b"".join([trozo async for trozo in response.streaming_content]).decode()
+            sincrono = await sync_to_async(self.exportar)("/api/resenas/exportar/", formato=formato)
+            self.assertEqual(contenido, sincrono)
+            self.assertIn(str(self.resenas[2].id), contenido)
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .catalogo import version_actual
+from .imagenes import argumentos_variantes, generar_variantes
+from .management.commands.generar_variantes import Command
+from .models import Categoria, Producto
+from .serializers import ProductoSerializer
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+def imagen_jpeg(ancho=1200, alto=800):
+    buffer = BytesIO()
+    Image.new('RGB', (ancho, alto), (200, 30, 60)).save(buffer, 'JPEG')
+    return SimpleUploadedFile('torta.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL, PRODUCTOS_VARIANTES_SINCRONAS=True, PRODUCTOS_VARIANTES_ANCHOS=(320, 640, 2048))
+class VariantesImagenTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Tortas")
+
+    def crear_producto(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Producto.objects.create(
+                nombre="Torta", descripcion="Rica", precio=Decimal("10.00"), categoria=self.categoria, **kwargs
+            )
+
+    # 🧪 Prueba 1: Al subir una imagen se generan las variantes WebP con hash en el nombre
+    def test_variantes_al_subir_imagen(self):
+        producto = self.crear_producto(imagen=imagen_jpeg())
+        producto.refresh_from_db()
+
+        variantes = producto.imagen_variantes['variantes']
+        self.assertEqual(producto.imagen_variantes['origen'], producto.imagen.name)
+        # 2048 > 1200: no se amplía, la mayor variante conserva el ancho original
+        self.assertEqual(sorted(variantes, key=int), ['320', '640', '1200'])
+        for ancho, nombre in variantes.items():
+            self.assertRegex(nombre, r'^productos/torta[^/]*\.[0-9a-f]{12}\.%sw\.webp$' % ancho)
+            with Image.open(os.path.join(MEDIA_TEMPORAL, nombre)) as variante:
+                self.assertEqual((variante.format, variante.width), ('WEBP', int(ancho)))
+
+    # 🧪 Prueba 2: El hash del nombre es el de los bytes WebP: otra calidad genera otros archivos
+    def test_hash_de_la_variante(self):
+        producto = self.crear_producto(imagen=imagen_jpeg(640, 480))
+        producto.refresh_from_db()
+        variantes = producto.imagen_variantes['variantes']
+        for nombre in variantes.values():
+            with open(os.path.join(MEDIA_TEMPORAL, nombre), 'rb') as archivo:
+                self.assertIn(hashlib.sha256(archivo.read()).hexdigest()[:12], nombre)
+
+        with self.settings(PRODUCTOS_VARIANTES_CALIDAD=30):
+            otras = generar_variantes(*argumentos_variantes(producto.imagen.name))
+        self.assertEqual(set(otras), set(variantes))
+        for ancho, nombre in otras.items():
+            self.assertNotEqual(nombre, variantes[ancho])
+            self.assertTrue(os.path.exists(os.path.join(MEDIA_TEMPORAL, nombre)))
+
+    # 🧪 Prueba 3: El serializer expone el mapa de variantes
+    def test_serializer_srcset(self):
+        producto = self.crear_producto(imagen=imagen_jpeg())
+        producto.refresh_from_db()
+        srcset = ProductoSerializer(instance=producto).data['imagen_srcset']
+        self.assertEqual(set(srcset), {'320', '640', '1200'})
+        self.assertTrue(srcset['640'].startswith('/media/productos/'))
+
+    # 🧪 Prueba 4: Sin imagen no hay variantes
+    def test_producto_sin_imagen(self):
+        producto = self.crear_producto()
+        self.assertEqual(ProductoSerializer(instance=producto).data['imagen_srcset'], {})
+
+    # 🧪 Prueba 5: El comando rellena las variantes de productos existentes
+    def test_comando_generar_variantes(self):
+        producto = self.crear_producto(imagen=imagen_jpeg(400, 300))
+        Producto.objects.filter(pk=producto.pk).update(imagen_variantes={})
+        antes = Producto.objects.values_list('actualizado_en', flat=True).get(pk=producto.pk)
+        version = version_actual()[0]
+        call_command('generar_variantes', procesos=1, stdout=StringIO())
+        producto.refresh_from_db()
+        self.assertEqual(sorted(producto.imagen_variantes['variantes'], key=int), ['320', '400'])
+        # Como la ruta asíncrona: invalida cachés, ETags y firmas de la exportación
+        self.assertGreater(producto.actualizado_en, antes)
+        self.assertEqual(version_actual()[0], version + 1)
+
+        # Si la imagen cambió mientras se generaban, las variantes viejas no se guardan
+        self.assertEqual(Command().guardar([(producto.pk, 'productos/otra.jpg', {'320': 'x.webp'})]), 1)
+        producto.refresh_from_db()
+        self.assertEqual(sorted(producto.imagen_variantes['variantes'], key=int), ['320', '400'])
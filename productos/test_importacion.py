@@ -0,0 +1,138 @@
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .importacion import ImportadorProductos, leer_filas
+from .models import Categoria, Producto, Reseña
+
+
+class ImportarCatalogoTests(TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = Path(directorio.name)
+        self.tortas = Categoria.objects.create(nombre="Tortas")
+
+    def archivo(self, nombre, contenido):
+        ruta = self.directorio / nombre
+        ruta.write_text(contenido, encoding='utf-8')
+        return str(ruta)
+
+    def importar(self, *args):
+        salida, errores = StringIO(), StringIO()
+        call_command('importar_catalogo', *args, stdout=salida, stderr=errores)
+        return salida.getvalue(), errores.getvalue()
+
+    def test_productos_csv_inserta_actualiza_y_rechaza(self):
+        existente = Producto.objects.create(nombre="Torta", descripcion="Vieja", precio=Decimal("5.00"),
+                                            categoria=self.tortas, stock=1)
+        rechazados = self.directorio / 'rechazados.ndjson'
+        ruta = self.archivo('productos.csv', (
+            "nombre,descripcion,precio,categoria,disponible,stock\n"
+            "Torta,Nueva receta,12.50,Tortas,si,7\n"
+            "Alfajor,Dulce de leche,3.00,Tortas,true,40\n"
+            "Negativo,Mal,-1,Tortas,true,1\n"
+            "Huérfano,Sin categoría,2.00,Inexistente,true,1\n"
+            "Raro,Booleano,2.00,Tortas,quizás,1\n"
+            "Caro,Demasiados dígitos,1234567.00,Tortas,true,1\n"
+        ))
+        salida, errores = self.importar('productos', ruta, '--batch-size', '2', '--rechazados', str(rechazados))
+
+        self.assertIn("6 filas", salida)
+        self.assertIn("1 creadas, 1 actualizadas, 4 rechazadas", salida)
+        self.assertIn("filas/s", salida)
+        self.assertIn("Línea 4: precio", errores)
+
+        existente.refresh_from_db()
+        self.assertEqual((existente.descripcion, existente.precio, existente.stock), ("Nueva receta", Decimal("12.50"), 7))
+        self.assertTrue(Producto.objects.filter(nombre="Alfajor", stock=40, categoria=self.tortas).exists())
+
+        lineas = [json.loads(linea) for linea in rechazados.read_text().splitlines()]
+        self.assertEqual([linea['linea'] for linea in lineas], [4, 5, 6, 7])
+        self.assertIn('categoria', lineas[1]['errores'])
+        self.assertEqual(lineas[1]['fila']['nombre'], "Huérfano")
+
+    def test_productos_ndjson_por_id_y_categorias_nuevas(self):
+        producto = Producto.objects.create(nombre="Torta", descripcion="Rica", precio=Decimal("5.00"),
+                                           categoria=self.tortas, stock=1)
+        otro = Producto.objects.create(nombre="Alfajor", descripcion="Dulce", precio=Decimal("2.00"),
+                                       categoria=self.tortas, stock=1)
+        ruta = self.archivo('productos.ndjson', "\n".join([
+            json.dumps({"id": producto.id, "stock": 99}),
+            # Otro grupo de columnas: se actualiza por separado, categoría incluida
+            json.dumps({"id": otro.id, "precio": "2.50", "categoria": "Galletas"}),
+            json.dumps({"id": 99999, "stock": 1}),
+            json.dumps({"nombre": "Galleta", "descripcion": "Crujiente", "precio": 1.5, "categoria": "Galletas"}),
+            "{no es json",
+        ]))
+        salida, _ = self.importar('productos', ruta, '--crear-categorias')
+        self.assertIn("1 creadas, 2 actualizadas, 2 rechazadas", salida)
+
+        producto.refresh_from_db()
+        self.assertEqual((producto.stock, producto.descripcion), (99, "Rica"))
+        otro.refresh_from_db()
+        self.assertEqual((otro.precio, otro.stock, otro.categoria.nombre), (Decimal("2.50"), 1, "Galletas"))
+        self.assertEqual(Producto.objects.get(nombre="Galleta").categoria.nombre, "Galletas")
+
+    def test_consultas_constantes_por_lote(self):
+        def filas(n):
+            return [(i + 2, {"nombre": f"P{n}-{i}", "descripcion": "d", "precio": "1.00", "categoria": "Tortas"}) for i in range(n)]
+
+        def consultas(n):
+            with CaptureQueriesContext(connection) as capturadas:
+                ImportadorProductos(tamano_lote=500).importar(filas(n))
+            return [c['sql'] for c in capturadas if 'SAVEPOINT' not in c['sql']]
+
+        # Mapa de categorías, existentes por clave, INSERT y versión del catálogo
+        # (hasta el máximo de filas por INSERT que admite SQLite)
+        self.assertEqual(len(consultas(10)), 4)
+        self.assertEqual(len(consultas(50)), 4)
+
+    def test_rechazos_en_streaming(self):
+        entregados = []
+
+        def filas():
+            for i in range(25):
+                # Al empezar cada lote ya se entregaron los rechazos de los anteriores
+                self.assertEqual(len(entregados), i - i % 5)
+                yield i + 2, {"nombre": "", "descripcion": "d", "precio": "1.00", "categoria": "Tortas"}
+
+        resultado = ImportadorProductos(tamano_lote=5).importar(filas(), lambda *rechazo: entregados.append(rechazo))
+        self.assertEqual((resultado.rechazados, len(entregados)), (25, 25))
+        # El resumen solo guarda los primeros, sin las filas
+        self.assertEqual([linea for linea, _ in resultado.primeros_rechazos], list(range(2, 12)))
+
+    def test_resenas_recalculan_agregados(self):
+        producto = Producto.objects.create(nombre="Torta", descripcion="Rica", precio=Decimal("5.00"),
+                                           categoria=self.tortas)
+        ruta = self.archivo('resenas.csv', (
+            "producto,nombre,comentario,calificacion\n"
+            f"{producto.id},Ana,Rica,5\n"
+            f"{producto.id},Luis,Buena,3\n"
+            f"{producto.id},Eva,Fuera de rango,7\n"
+            "99999,Sin producto,Nada,4\n"
+        ))
+        salida, _ = self.importar('resenas', ruta)
+        self.assertIn("2 creadas, 0 actualizadas, 2 rechazadas", salida)
+        producto.refresh_from_db()
+        self.assertEqual((producto.resenas_count, producto.calificacion_promedio), (2, 4.0))
+        self.assertEqual(Reseña.objects.count(), 2)
+
+    def test_categorias(self):
+        ruta = self.archivo('categorias.csv', "nombre\nTortas\nGalletas\n\n")
+        salida, _ = self.importar('categorias', ruta)
+        self.assertIn("1 creadas", salida)
+        self.assertEqual(sorted(Categoria.objects.values_list('nombre', flat=True)), ["Galletas", "Tortas"])
+
+    def test_leer_filas_en_streaming(self):
+        filas = leer_filas(StringIO('{"a": 1}\n\n{"a": 2}\n'), 'ndjson')
+        self.assertEqual(next(filas), (1, {"a": 1}))
+        self.assertEqual(next(filas), (3, {"a": 2}))
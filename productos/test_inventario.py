@@ -0,0 +1,241 @@
+import threading
+from unittest import mock
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import inventario
+from .models import Categoria, Producto, Reserva
+
+
+def sentencias(capturadas):
+    """(verbo, tabla) de cada consulta capturada, sin los SAVEPOINT que añade TestCase."""
+    resultado = []
+    for consulta in capturadas:
+        palabras = consulta['sql'].replace('"', '').split()
+        if 'SAVEPOINT' in palabras:
+            continue
+        if palabras[0] == 'UPDATE':
+            resultado.append(('UPDATE', palabras[1]))
+            continue
+        # El FROM de la consulta principal, no el de sus subconsultas
+        nivel = 0
+        for i, palabra in enumerate(palabras):
+            if palabra == 'FROM' and nivel == 0:
+                resultado.append((palabras[0], palabras[i + 1]))
+                break
+            nivel += palabra.count('(') - palabra.count(')')
+    return resultado
+
+
+class DecrementarStockTests(TestCase):
+    def setUp(self):
+        categoria = Categoria.objects.create(nombre="Tortas")
+        self.producto = Producto.objects.create(
+            nombre="Torta Red Velvet", descripcion="Suave", precio=Decimal("20.00"), categoria=categoria, stock=5
+        )
+
+    # 🧪 Prueba 1: Descuenta y devuelve el stock restante en una sola consulta
+    def test_decremento_una_consulta(self):
+        with CaptureQueriesContext(connection) as capturadas:
+            nombre, stock = inventario.decrementar_stock(self.producto.id, 3)
+        # Un UPDATE ... RETURNING del producto y el incremento de la versión del catálogo
+        self.assertEqual(sentencias(capturadas), [
+            ('UPDATE', 'productos_producto'), ('UPDATE', 'productos_versioncatalogo')
+        ])
+        self.assertEqual((nombre, stock), ("Torta Red Velvet", 2))
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 2)
+
+    # 🧪 Prueba 2: Sin UPDATE ... RETURNING (p. ej. MariaDB) se relee la fila
+    def test_decremento_sin_returning(self):
+        self.assertTrue(inventario._update_returning())
+        with mock.patch.object(inventario, '_update_returning', return_value=False):
+            with CaptureQueriesContext(connection) as capturadas:
+                self.assertEqual(inventario.decrementar_stock(self.producto.id, 2), ("Torta Red Velvet", 3))
+        self.assertFalse(any('RETURNING' in consulta['sql'] for consulta in capturadas))
+        self.assertEqual(sentencias(capturadas), [
+            ('UPDATE', 'productos_producto'), ('SELECT', 'productos_producto'), ('UPDATE', 'productos_versioncatalogo')
+        ])
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            self.assertFalse(inventario._update_returning())
+
+    # 🧪 Prueba 3: Sin stock suficiente no se toca la fila
+    def test_stock_insuficiente(self):
+        with self.assertRaises(inventario.StockInsuficiente) as ctx:
+            inventario.decrementar_stock(self.producto.id, 6)
+        self.assertEqual(ctx.exception.stock, 5)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 5)
+
+    # 🧪 Prueba 4: Producto inexistente
+    def test_producto_inexistente(self):
+        with self.assertRaises(Producto.DoesNotExist):
+            inventario.decrementar_stock(self.producto.id + 100, 1)
+
+
+class DecrementarStockConcurrenteTests(TransactionTestCase):
+    HILOS = 8
+    INTENTOS_POR_HILO = 25
+    STOCK_INICIAL = 100
+
+    def setUp(self):
+        categoria = Categoria.objects.create(nombre="Bebidas")
+        self.producto = Producto.objects.create(
+            nombre="Frapuccino", descripcion="Oreo", precio=Decimal("12.00"), categoria=categoria,
+            stock=self.STOCK_INICIAL
+        )
+
+    # 🧪 Prueba 5: Muchos hilos compitiendo por el mismo producto nunca venden de más
+    def test_sin_sobreventa(self):
+        vendidas = []
+        rechazadas = []
+        barrera = threading.Barrier(self.HILOS)
+
+        def comprar():
+            barrera.wait()
+            try:
+                for _ in range(self.INTENTOS_POR_HILO):
+                    while True:
+                        try:
+                            inventario.decrementar_stock(self.producto.id, 1)
+                            vendidas.append(1)
+                        except inventario.StockInsuficiente:
+                            rechazadas.append(1)
+                        except OperationalError:
+                            # Base bloqueada por otro escritor: se reintenta
+                            continue
+                        break
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=comprar) for _ in range(self.HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.producto.refresh_from_db()
+        self.assertEqual(len(vendidas), self.STOCK_INICIAL)
+        self.assertEqual(len(rechazadas), self.HILOS * self.INTENTOS_POR_HILO - self.STOCK_INICIAL)
+        self.assertEqual(self.producto.stock, 0)
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        categoria = Categoria.objects.create(nombre="Postres")
+        self.productos = [
+            Producto.objects.create(
+                nombre=f"Postre {i}", descripcion="Dulce", precio=Decimal("5.00"), categoria=categoria, stock=10
+            )
+            for i in range(20)
+        ]
+
+    def stocks(self):
+        return list(Producto.objects.order_by('id').values_list('stock', flat=True))
+
+    # 🧪 Prueba 6: El carrito completo se procesa con un número constante de consultas
+    def test_checkout_consultas_constantes(self):
+        consultas = []
+        for tamano in (2, 20):
+            lineas = [(p.id, 1) for p in self.productos[:tamano]]
+            with CaptureQueriesContext(connection) as capturadas:
+                ok, resultados = inventario.procesar_checkout(lineas)
+            self.assertTrue(ok)
+            self.assertEqual(len(resultados), tamano)
+            consultas.append(sentencias(capturadas))
+        # Un SELECT ... FOR UPDATE, un UPDATE y el incremento de la versión del catálogo
+        esperadas = [
+            ('SELECT', 'productos_producto'), ('UPDATE', 'productos_producto'), ('UPDATE', 'productos_versioncatalogo')
+        ]
+        self.assertEqual(consultas, [esperadas, esperadas])
+
+    # 🧪 Prueba 7: Todo o nada
+    def test_checkout_todo_o_nada(self):
+        antes = self.stocks()
+        ok, resultados = inventario.procesar_checkout([
+            (self.productos[0].id, 3), (self.productos[1].id, 11), (9999, 1)
+        ])
+        self.assertFalse(ok)
+        self.assertNotIn("error", resultados[0])
+        self.assertIn("Stock insuficiente", resultados[1]["error"])
+        self.assertEqual(resultados[2]["error"], "Producto no encontrado.")
+        self.assertEqual(self.stocks(), antes)
+
+    # 🧪 Prueba 8: Las líneas repetidas del mismo producto se acumulan
+    def test_checkout_lineas_repetidas(self):
+        producto = self.productos[0]
+        ok, resultados = inventario.procesar_checkout([(producto.id, 6), (producto.id, 4)])
+        self.assertTrue(ok)
+        self.assertEqual(resultados[1]["stock_restante"], 0)
+        ok, _ = inventario.procesar_checkout([(producto.id, 1)])
+        self.assertFalse(ok)
+
+
+class ReservaTests(TestCase):
+    def setUp(self):
+        categoria = Categoria.objects.create(nombre="Galletas")
+        self.producto = Producto.objects.create(
+            nombre="Galletas de Pascua", descripcion="Decoradas", precio=Decimal("8.00"), categoria=categoria, stock=10
+        )
+
+    def disponible(self):
+        return Producto.objects.con_stock_disponible().get(pk=self.producto.pk).stock_disponible
+
+    # 🧪 Prueba 9: Las reservas activas descuentan del stock disponible, no del stock
+    def test_reserva_aparta_unidades(self):
+        inventario.reservar(self.producto.id, 7)
+        self.assertEqual(self.disponible(), 3)
+        with self.assertRaises(inventario.StockInsuficiente):
+            inventario.reservar(self.producto.id, 4)
+        with self.assertRaises(inventario.StockInsuficiente):
+            inventario.decrementar_stock(self.producto.id, 4)
+        ok, _ = inventario.procesar_checkout([(self.producto.id, 4)])
+        self.assertFalse(ok)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 10)
+
+    # 🧪 Prueba 10: Convertir descuenta el stock y liberar lo devuelve
+    def test_convertir_y_liberar(self):
+        venta = inventario.reservar(self.producto.id, 4)
+        carrito_abandonado = inventario.reservar(self.producto.id, 3)
+
+        self.assertEqual(inventario.convertir_reserva(venta.id).estado, Reserva.CONVERTIDA)
+        self.assertIsNone(inventario.convertir_reserva(venta.id))
+        self.assertTrue(inventario.liberar_reserva(carrito_abandonado.id))
+        self.assertFalse(inventario.liberar_reserva(carrito_abandonado.id))
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 6)
+        self.assertEqual(self.disponible(), 6)
+
+    # 🧪 Prueba 11: Convertir con el stock editado por debajo de la reserva no rompe el CHECK
+    def test_convertir_con_stock_editado(self):
+        reserva = inventario.reservar(self.producto.id, 5)
+        Producto.objects.filter(pk=self.producto.id).update(stock=2)
+
+        with self.assertRaises(inventario.StockInsuficiente):
+            inventario.convertir_reserva(reserva.id)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 2)
+        self.assertEqual(Reserva.objects.get(pk=reserva.id).estado, Reserva.ACTIVA)
+
+    # 🧪 Prueba 12: Las reservas vencidas dejan de contar y se expiran en bloque
+    def test_expirar_reservas(self):
+        vencida = inventario.reservar(self.producto.id, 5)
+        vigente = inventario.reservar(self.producto.id, 2)
+        Reserva.objects.filter(pk=vencida.pk).update(expira_en=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.disponible(), 8)
+
+        with CaptureQueriesContext(connection) as capturadas:
+            self.assertEqual(inventario.expirar_reservas(), 1)
+        self.assertEqual(sentencias(capturadas), [
+            ('UPDATE', 'productos_reserva'), ('UPDATE', 'productos_versioncatalogo')
+        ])
+        self.assertEqual(Reserva.objects.get(pk=vencida.pk).estado, Reserva.EXPIRADA)
+        self.assertEqual(Reserva.objects.get(pk=vigente.pk).estado, Reserva.ACTIVA)
+        self.assertIsNone(inventario.convertir_reserva(vencida.id))
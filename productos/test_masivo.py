@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .catalogo import version_actual
+from .models import Categoria, Producto, Reseña
+
+
+class OperacionesMasivasTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "admin@example.com", "clave"))
+        self.tortas = Categoria.objects.create(nombre="Tortas")
+        self.productos = [
+            Producto.objects.create(nombre=f"Torta {i}", descripcion="Rica", precio=Decimal("10.00"), categoria=self.tortas)
+            for i in range(3)
+        ]
+
+    def consultas(self, metodo, url, datos):
+        with CaptureQueriesContext(connection) as capturadas:
+            response = getattr(self.client, metodo)(url, datos, format="json")
+        return response, [c['sql'] for c in capturadas if 'SAVEPOINT' not in c['sql']]
+
+    def nuevos(self, n, **extra):
+        return [{"nombre": f"Nuevo {i}", "descripcion": "d", "precio": "2.00", "categoria": self.tortas.id, **extra}
+                for i in range(n)]
+
+    # 🧪 Prueba 1: alta masiva con errores por elemento
+    def test_crear_con_errores(self):
+        items = self.nuevos(2) + [{"nombre": "Sin categoría", "descripcion": "d", "precio": "1.00", "categoria": 999}]
+        response = self.client.post("/api/productos/bulk/", items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([p["nombre"] for p in response.json()["resultados"]], ["Nuevo 0", "Nuevo 1"])
+        self.assertEqual(response.json()["errores"][0]["indice"], 2)
+        self.assertIn("categoria", response.json()["errores"][0]["errores"])
+        self.assertEqual(Producto.objects.count(), 5)
+
+    # 🧪 Prueba 2: con ?atomico=1 un error rechaza todo el lote
+    def test_atomico(self):
+        items = self.nuevos(2) + [{"nombre": "Caro", "descripcion": "d", "precio": "abc", "categoria": self.tortas.id}]
+        response = self.client.post("/api/productos/bulk/?atomico=1", items, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Producto.objects.count(), 3)
+
+    # 🧪 Prueba 3: el número de consultas no depende del tamaño del lote
+    def test_consultas_constantes(self):
+        _, pocas = self.consultas("post", "/api/productos/bulk/", self.nuevos(2))
+        _, muchas = self.consultas("post", "/api/productos/bulk/", self.nuevos(20))
+        self.assertEqual(len(pocas), len(muchas))
+
+        cambios = [{"id": p.id, "precio": "9.99", "disponible": False} for p in Producto.objects.all()]
+        response, consultas = self.consultas("patch", "/api/productos/bulk/", cambios[:2])
+        self.assertEqual(response.status_code, 200)
+        _, mas = self.consultas("patch", "/api/productos/bulk/", cambios)
+        self.assertEqual(len(consultas), len(mas))
+
+    # 🧪 Prueba 4: actualización parcial y ids inexistentes
+    def test_actualizar(self):
+        antes = version_actual()[0]
+        torta = self.productos[0]
+        actualizado_en = torta.actualizado_en
+        response = self.client.patch("/api/productos/bulk/", [
+            {"id": torta.id, "precio": "12.50"},
+            {"id": 999, "precio": "1.00"},
+            {"id": self.productos[1].id, "precio": "-"},
+        ], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e["indice"] for e in response.json()["errores"]], [1, 2])
+        torta.refresh_from_db()
+        self.assertEqual(torta.precio, Decimal("12.50"))
+        self.assertGreater(torta.actualizado_en, actualizado_en)
+        self.assertEqual(version_actual()[0], antes + 1)
+
+    # 🧪 Prueba 5: reseñas masivas mantienen los agregados del producto
+    def test_resenas_agregados(self):
+        torta = self.productos[0]
+        response = self.client.post("/api/resenas/bulk/", [
+            {"producto": torta.id, "nombre": "Ana", "comentario": "Rica", "calificacion": 5},
+            {"producto": torta.id, "nombre": "Luis", "comentario": "Bien", "calificacion": 3},
+        ], format="json")
+        self.assertEqual(response.status_code, 201)
+        ids = [r["id"] for r in response.json()["resultados"]]
+        self.client.patch("/api/resenas/bulk/", [{"id": ids[1], "calificacion": 1}], format="json")
+        torta.refresh_from_db()
+        self.assertEqual((torta.resenas_count, torta.calificacion_promedio), (2, 3.0))
+
+        response = self.client.delete("/api/resenas/bulk/", {"ids": [ids[0], 999]}, format="json")
+        self.assertEqual(response.json()["borrados"], [ids[0]])
+        torta.refresh_from_db()
+        self.assertEqual((torta.resenas_count, torta.estrellas_1), (1, 1))
+
+    # 🧪 Prueba 6: borrado masivo con una sola marca del catálogo
+    def test_borrar(self):
+        antes = version_actual()[0]
+        ids = [p.id for p in self.productos]
+        response = self.client.delete("/api/productos/bulk/?atomico=1", {"ids": ids + [999]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete("/api/productos/bulk/", {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Producto.objects.exists())
+        self.assertEqual(version_actual()[0], antes + 1)
+
+    # 🧪 Prueba 7: solo administradores
+    def test_permisos(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.post("/api/productos/bulk/", self.nuevos(1), format="json").status_code, (401, 403))
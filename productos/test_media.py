@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .media import servir_media
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+CONTENIDO = bytes(range(256)) * 40
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL, MEDIA_SENDFILE=None)
+class ServirMediaTests(SimpleTestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.nombre = default_storage.save('productos/torta.jpg', ContentFile(CONTENIDO))
+
+    def get(self, ruta, **cabeceras):
+        return servir_media(self.factory.get('/media/' + ruta, headers=cabeceras), ruta)
+
+    # 🧪 Prueba 1: Las subidas llevan el hash del contenido y son inmutables
+    def test_nombre_con_hash_e_inmutable(self):
+        self.assertRegex(self.nombre, r'^productos/torta\.[0-9a-f]{12}\.jpg$')
+        self.assertEqual(default_storage.save('productos/torta.jpg', ContentFile(CONTENIDO)), self.nombre)
+
+        response = self.get(self.nombre)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENIDO)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    # 🧪 Prueba 2: If-None-Match con el mismo ETag responde 304 sin cuerpo
+    def test_if_none_match(self):
+        etag = self.get(self.nombre)['ETag']
+        response = self.get(self.nombre, If_None_Match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    # 🧪 Prueba 3: Range devuelve solo el fragmento pedido
+    def test_range(self):
+        response = self.get(self.nombre, Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENIDO[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(CONTENIDO)}')
+
+        response = self.get(self.nombre, Range='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), CONTENIDO[-5:])
+
+        response = self.get(self.nombre, Range=f'bytes={len(CONTENIDO)}-')
+        self.assertEqual(response.status_code, 416)
+
+        # If-Range con un ETag antiguo: se ignora el rango y se envía el archivo completo
+        response = self.get(self.nombre, Range='bytes=0-9', If_Range='"viejo"')
+        self.assertEqual(response.status_code, 200)
+
+    # 🧪 Prueba 4: Archivos sin hash se cachean un tiempo limitado
+    def test_archivo_sin_hash(self):
+        os.makedirs(os.path.join(MEDIA_TEMPORAL, 'productos'), exist_ok=True)
+        with open(os.path.join(MEDIA_TEMPORAL, 'productos', 'antiguo.jpg'), 'wb') as archivo:
+            archivo.write(b'abc')
+        with self.settings(MEDIA_CACHE_SEGUNDOS=60):
+            response = self.get('productos/antiguo.jpg')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+    # 🧪 Prueba 5: X-Accel-Redirect delega el envío en nginx
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect', MEDIA_X_ACCEL_PREFIJO='/interna/')
+    def test_x_accel_redirect(self):
+        response = self.get(self.nombre)
+        self.assertEqual(response['X-Accel-Redirect'], '/interna/' + self.nombre)
+        self.assertEqual(response.content, b'')
+
+    # 🧪 Prueba 6: No se sale de MEDIA_ROOT ni se sirven archivos inexistentes
+    def test_rutas_invalidas(self):
+        for ruta in ('../settings.py', 'productos/no-existe.jpg', 'productos'):
+            with self.assertRaises(Http404):
+                self.get(ruta)
@@ -1,7 +1,10 @@
 from django.test import TestCase
+from .catalogo import version_actual
 from .models import Categoria, Producto, Reseña
 from decimal import Decimal
 from django.core.exceptions import ValidationError 
+from django.core.management import call_command
+from io import StringIO
 
 # 🔹 Pruebas para el modelo Categoria
 class CategoriaModelTest(TestCase):
@@ -181,4 +184,87 @@ class ReseñaModelTest(TestCase):
             calificacion=3
         )
         with self.assertRaises(ValidationError):
-            reseña.full_clean()
\ No newline at end of file
+            reseña.full_clean()
+
+# 🔹 Pruebas de los agregados de calificación desnormalizados
+class AgregadosCalificacionTest(TestCase):
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre="Postres")
+        self.producto = Producto.objects.create(
+            nombre="Brownie", descripcion="Con nueces", precio=Decimal("4.00"), categoria=self.categoria
+        )
+        self.otro = Producto.objects.create(
+            nombre="Muffin", descripcion="De chía", precio=Decimal("3.00"), categoria=self.categoria
+        )
+
+    def assertAgregados(self, producto, total, suma, histograma):
+        producto.refresh_from_db()
+        self.assertEqual(producto.resenas_count, total)
+        self.assertEqual(producto.calificacion_suma, suma)
+        self.assertAlmostEqual(producto.calificacion_promedio, suma / total if total else 0.0)
+        self.assertEqual([getattr(producto, f'estrellas_{i}') for i in range(1, 6)], histograma)
+
+    def test_crear_y_borrar_resena(self):
+        resena = Reseña.objects.create(producto=self.producto, nombre="Ana", comentario="Rico", calificacion=5)
+        Reseña.objects.create(producto=self.producto, nombre="Luis", comentario="Bien", calificacion=2)
+        self.assertAgregados(self.producto, 2, 7, [0, 1, 0, 0, 1])
+
+        resena.delete()
+        self.assertAgregados(self.producto, 1, 2, [0, 1, 0, 0, 0])
+
+    def test_editar_calificacion_y_producto(self):
+        resena = Reseña.objects.create(producto=self.producto, nombre="Ana", comentario="Rico", calificacion=5)
+        resena.calificacion = 3
+        resena.save()
+        self.assertAgregados(self.producto, 1, 3, [0, 0, 1, 0, 0])
+
+        resena = Reseña.objects.get(pk=resena.pk)
+        resena.producto = self.otro
+        resena.save()
+        self.assertAgregados(self.producto, 0, 0, [0, 0, 0, 0, 0])
+        self.assertAgregados(self.otro, 1, 3, [0, 0, 1, 0, 0])
+
+    def test_operaciones_masivas(self):
+        Reseña.objects.bulk_create([
+            Reseña(producto=self.producto, nombre="A", comentario="x", calificacion=4),
+            Reseña(producto=self.producto, nombre="B", comentario="x", calificacion=2),
+            Reseña(producto=self.otro, nombre="C", comentario="x", calificacion=1),
+        ])
+        self.assertAgregados(self.producto, 2, 6, [0, 1, 0, 1, 0])
+        self.assertAgregados(self.otro, 1, 1, [1, 0, 0, 0, 0])
+
+        Reseña.objects.filter(calificacion=2).update(calificacion=5)
+        self.assertAgregados(self.producto, 2, 9, [0, 0, 0, 1, 1])
+
+        Reseña.objects.filter(producto=self.producto, calificacion=5).delete()
+        self.assertAgregados(self.producto, 1, 4, [0, 0, 0, 1, 0])
+
+    def test_borrado_en_cascada(self):
+        Reseña.objects.create(producto=self.producto, nombre="Ana", comentario="Rico", calificacion=5)
+        Reseña.objects.create(producto=self.otro, nombre="Luis", comentario="Bien", calificacion=4)
+        self.producto.delete()
+        self.assertFalse(Reseña.objects.filter(producto_id=self.producto.id).exists())
+        self.assertAgregados(self.otro, 1, 4, [0, 0, 0, 1, 0])
+
+    def test_borrados_marcan_el_catalogo_una_vez(self):
+        for i in range(3):
+            Reseña.objects.create(producto=self.producto, nombre=f"R{i}", comentario="x", calificacion=4)
+            Reseña.objects.create(producto=self.otro, nombre=f"S{i}", comentario="x", calificacion=3)
+
+        version = version_actual()[0]
+        Reseña.objects.filter(producto=self.otro).delete()
+        self.assertEqual(version_actual()[0], version + 1)
+
+        self.producto.delete()
+        self.assertEqual(version_actual()[0], version + 2)
+
+        Categoria.objects.filter(pk=self.categoria.pk).delete()
+        self.assertEqual(version_actual()[0], version + 3)
+        self.assertFalse(Producto.objects.exists())
+
+    def test_comando_recalcular(self):
+        Reseña.objects.create(producto=self.producto, nombre="Ana", comentario="Rico", calificacion=5)
+        Producto.objects.filter(pk=self.producto.pk).update(resenas_count=0, calificacion_suma=0, estrellas_5=0)
+        call_command('recalcular_calificaciones', stdout=StringIO())
+        self.assertAgregados(self.producto, 1, 5, [0, 0, 0, 0, 1])
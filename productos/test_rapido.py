@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import Categoria, Producto, Reseña, Reserva
+from .rapido import ProductosRapidos, ReseñasRapidas
+from .serializers import ProductoSerializer, ReseñaSerializer
+from .test_imagenes import imagen_jpeg
+
+MEDIA_TEMPORAL = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TEMPORAL, PRODUCTOS_VARIANTES_SINCRONAS=True, PRODUCTOS_RESENAS_EMBEBIDAS=2)
+class ListaRapidaTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TEMPORAL, ignore_errors=True)
+
+    def setUp(self):
+        caches['default'].clear()
+        categoria = Categoria.objects.create(nombre="Tortas")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.con_imagen = Producto.objects.create(
+                nombre="Torta ñandú", descripcion="Rica", precio=Decimal("19.5"), categoria=categoria,
+                stock=10, imagen=imagen_jpeg(),
+            )
+        self.sin_imagen = Producto.objects.create(nombre="Galleta", descripcion="", precio=Decimal("2.00"),
+                                                  categoria=categoria, stock=0, disponible=False)
+        for i in range(3):
+            Reseña.objects.create(producto=self.con_imagen, nombre=f"Cliente {i}", comentario="Buena", calificacion=i + 3)
+        Reserva.objects.create(producto=self.con_imagen, cantidad=4, expira_en=timezone.now() + timedelta(minutes=5))
+        self.request = RequestFactory().get('/api/productos/')
+
+    def test_mismo_resultado_que_los_serializers(self):
+        context = {'request': self.request}
+        productos = Producto.objects.con_resenas_recientes().con_stock_disponible().order_by('id')
+        esperado = ProductoSerializer(productos, many=True, context=context).data
+
+        rapida = ProductosRapidos(context)
+        obtenido = rapida.representar(productos.prefetch_related(None).values(*rapida.columnas()))
+
+        # Mismos bytes: mismas claves, en el mismo orden y con la misma representación
+        self.assertEqual(JSONRenderer().render(obtenido), JSONRenderer().render(esperado))
+        self.assertTrue(obtenido[0]["imagen"].startswith("http://testserver/media/"))
+        self.assertEqual(len(obtenido[0]["imagen_srcset"]), 3)
+        self.assertEqual(obtenido[0]["stock_disponible"], 6)
+        self.assertEqual(len(obtenido[0]["resenas"]), 2)
+
+        resenas = Reseña.objects.order_by('id')
+        rapida = ReseñasRapidas(context)
+        self.assertEqual(
+            JSONRenderer().render(rapida.representar(resenas.values(*rapida.columnas()))),
+            JSONRenderer().render(ReseñaSerializer(resenas, many=True, context=context).data),
+        )
+
+    def test_listado_usa_la_ruta_rapida_y_el_detalle_no(self):
+        client = APIClient()
+        with self.assertNumQueries(3):
+            lista = client.get(reverse('producto-list'), {"ordering": "-precio", "expand": "resenas"})
+        self.assertEqual([p["id"] for p in lista.data["results"]], [self.con_imagen.id, self.sin_imagen.id])
+
+        detalle = client.get(reverse('producto-detail', args=[self.con_imagen.id]))
+        self.assertEqual(lista.data["results"][0], detalle.data)
@@ -0,0 +1,87 @@
+import datetime
+import io
+import json
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .models import Categoria, Producto, Reseña
+from .renderers import ORJSONParser, ORJSONRenderer
+from .serializers import ProductoSerializer
+
+
+class CompatibilidadRendererTests(SimpleTestCase):
+
+    def assertMismosBytes(self, datos, **kwargs):
+        esperado = JSONRenderer().render(datos, **kwargs)
+        self.assertEqual(ORJSONRenderer().render(datos, **kwargs), esperado)
+
+    def test_tipos_especiales(self):
+        ahora = datetime.datetime(2025, 3, 1, 12, 30, 45, 123456, tzinfo=datetime.timezone.utc)
+        self.assertMismosBytes({
+            "precio": Decimal("12.50"),
+            "creado_en": ahora,
+            "sin_zona": ahora.replace(tzinfo=None),
+            "fecha": ahora.date(),
+            "hora": ahora.time(),
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "texto": "Ñandú con acentos, emoji 🍰 y separadores   ",
+            "perezoso": gettext_lazy("Torta"),
+            "promedio": 4.333333333333333,
+            "nada": None,
+            "lista": [1, 2.5, True, False, (3, 4)],
+        })
+
+    def test_floats(self):
+        for valor in (0.0, 1.0, 0.1 + 0.2, 4.5, 123456789012345.6, 0.0001):
+            self.assertMismosBytes({"valor": valor})
+        # Con exponente cambia la notación, no el valor
+        for valor in (1e16, 1e-5, -2.5e300):
+            salida = ORJSONRenderer().render({"valor": valor})
+            self.assertEqual(json.loads(salida), {"valor": valor})
+
+    def test_casos_que_delegan_en_drf(self):
+        self.assertMismosBytes({1: "clave entera", "grande": 2 ** 70})
+        self.assertMismosBytes({"a": 1}, renderer_context={"indent": 4})
+        self.assertMismosBytes({"a": 1}, accepted_media_type="application/json; indent=2")
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class CompatibilidadRespuestasTests(TestCase):
+
+    def test_producto_serializado(self):
+        categoria = Categoria.objects.create(nombre="Tortas")
+        producto = Producto.objects.create(nombre="Torta de chocolate", descripcion="Húmeda",
+                                           precio=Decimal("19.90"), categoria=categoria, stock=3)
+        Reseña.objects.create(producto=producto, nombre="Ana", comentario="¡Deliciosa!", calificacion=4)
+        Reseña.objects.create(producto=producto, nombre="Luis", comentario="Buena", calificacion=5)
+
+        productos = Producto.objects.con_resenas_recientes().con_stock_disponible()
+        datos = ProductoSerializer(productos, many=True).data
+        self.assertEqual(ORJSONRenderer().render(datos), JSONRenderer().render(datos))
+
+        response = APIClient().get(reverse('producto-list'))
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class ParserTests(SimpleTestCase):
+
+    def parse(self, parser, contenido):
+        return parser.parse(io.BytesIO(contenido), parser_context={})
+
+    def test_mismo_resultado_que_json_parser(self):
+        contenido = '{"nombre":"Ñandú","precio":"9.90","cantidad":3,"grande":%d,"lista":[1.5,null]}'.encode() % 2 ** 70
+        self.assertEqual(self.parse(ORJSONParser(), contenido), self.parse(JSONParser(), contenido))
+
+    def test_errores(self):
+        for contenido in (b'{"a": ', b'{"a": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(ORJSONParser(), contenido)
@@ -0,0 +1,190 @@
+"""
+Arnés de presupuesto de consultas y planes de ejecución para los endpoints.
+
+Para cada endpoint del router (y algunos filtros y acciones) comprueba que:
+- el número de consultas no supera su presupuesto y no crece con el volumen de datos;
+- ningún SELECT recorre entera una tabla grande (`SCAN` en EXPLAIN QUERY PLAN),
+  salvo las lecturas sin filtro acotadas por LIMIT en el orden de un índice o
+  del rowid (la primera página de un listado); las consultas filtradas tienen
+  que buscar por índice (`SEARCH ... USING [COVERING] INDEX` o clave primaria).
+
+Los datos se siembran en cantidad y con ANALYZE, para que el planificador elija
+como lo haría con una tabla real y no con una de pocas filas.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import sincronizacion
+from .models import Categoria, Producto, Reseña, Reserva
+from .urls import router
+
+TABLAS_GRANDES = ('productos_producto', 'productos_reseña', 'productos_reserva', 'productos_cambio')
+
+# Endpoints que recorren la tabla entera a propósito: solo se mide su presupuesto
+RECORRIDOS_COMPLETOS = {'producto-exportar', 'reseña-exportar'}
+
+# Presupuesto por nombre de ruta. Las lecturas del catálogo incluyen la consulta
+# de la versión global (GET condicional).
+PRESUPUESTOS = {
+    'categoria-list': 2,
+    'categoria-detail': 2,
+    # Sin reseñas embebidas salvo ?expand=resenas
+    'producto-list': 2,
+    # django-filter valida que la categoría exista
+    'producto-list:categoria': 3,
+    # Una consulta más por cada relación expandida
+    'producto-list:expand': 4,
+    'producto-detail': 3,
+    'producto-buscar': 2,
+    # ?ids=: una consulta IN y la precarga de reseñas
+    'producto-list:ids': 3,
+    'categoria-list:ids': 2,
+    # Un cursor para toda la exportación, sea cual sea el tamaño de la tabla
+    'producto-exportar': 1,
+    'reseña-exportar': 1,
+    # Horizonte de purga, último cambio, registro y una consulta por modelo con cambios
+    'sincronizar': 6,
+    'reseña-list': 2,
+    'reseña-detail': 2,
+    'reserva-detail': 1,
+}
+
+
+class ArnesRendimiento:
+    """Mezcla para TestCase: mide consultas y planes de un GET."""
+
+    def medir(self, url, params=None):
+        with CaptureQueriesContext(connection) as capturadas:
+            response = self.client.get(url, params or {})
+            if response.streaming:
+                # Las exportaciones consultan mientras se consume la respuesta
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, f"{url} respondió {response.status_code}")
+        consultas = [q['sql'] for q in capturadas if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        return consultas
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [fila[-1] for fila in cursor.fetchall()]
+
+    def assertSinScans(self, url, consultas):
+        for sql in consultas:
+            if not sql.startswith('SELECT'):
+                continue
+            plan = self.plan(sql)
+            # Primera página sin filtro: el LIMIT corta el recorrido en el orden del índice
+            acotada = ' LIMIT ' in sql and not filtrada(sql) and not any('TEMP B-TREE' in paso for paso in plan)
+            for paso in plan:
+                palabras = paso.replace('"', '').split()
+                if palabras[:1] not in (['SCAN'], ['SEARCH']) or palabras[1] not in TABLAS_GRANDES:
+                    continue
+                if palabras[0] == 'SEARCH':
+                    # Por índice o por rowid (incluido el atajo de MIN/MAX de la clave primaria)
+                    continue
+                por_indice = len(palabras) == 2 or 'USING INDEX' in paso or 'USING COVERING INDEX' in paso
+                if palabras[0] == 'SCAN' and acotada and por_indice:
+                    continue
+                self.fail(f"{url}: {paso}\n{sql}\n" + '\n'.join(plan))
+
+
+def filtrada(sql):
+    """True si la consulta principal (no sus subconsultas) tiene WHERE."""
+    nivel = 0
+    for palabra in sql.replace('(', ' ( ').replace(')', ' ) ').split():
+        if palabra == '(':
+            nivel += 1
+        elif palabra == ')':
+            nivel -= 1
+        elif palabra == 'WHERE' and nivel == 0:
+            return True
+    return False
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class PresupuestoConsultasTests(ArnesRendimiento, TestCase):
+    PRODUCTOS_POR_LOTE = 500
+    RESENAS_POR_PRODUCTO = 5
+
+    def setUp(self):
+        self.client = APIClient()
+        # Las exportaciones son solo para administradores
+        self.client.force_authenticate(User.objects.create_superuser("admin", "admin@example.com", "clave"))
+        self.categorias = Categoria.objects.bulk_create([Categoria(nombre=f"Categoría {i}") for i in range(5)])
+        self.sembrar()
+
+    def sembrar(self):
+        productos = Producto.objects.bulk_create([
+            Producto(
+                nombre=f"Torta {i}", descripcion="Torta de chocolate y crema", precio=Decimal("12.50"),
+                categoria=self.categorias[i % len(self.categorias)], disponible=i % 3 != 0, stock=20
+            )
+            for i in range(self.PRODUCTOS_POR_LOTE)
+        ])
+        Reseña.objects.bulk_create([
+            # Promedios distintos por producto (de 1 a 5), como en un catálogo real
+            Reseña(producto=producto, nombre="Cliente", comentario="Muy rica", calificacion=min(5, i % 5 + 1 + j % 2))
+            for i, producto in enumerate(productos)
+            for j in range(self.RESENAS_POR_PRODUCTO)
+        ])
+        Reserva.objects.bulk_create([
+            Reserva(producto=producto, cantidad=1, expira_en=timezone.now() + timedelta(minutes=10))
+            for producto in productos[::4]
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def endpoints(self):
+        """(nombre de ruta, url, parámetros) de todos los endpoints de lectura."""
+        for prefijo, viewset, basename in router.registry:
+            modelo = viewset.queryset.model
+            if hasattr(viewset, 'list'):
+                yield f'{basename}-list', reverse(f'{basename}-list'), None
+            yield f'{basename}-detail', reverse(f'{basename}-detail', args=[modelo.objects.order_by('-id').first().pk]), None
+        productos = reverse('producto-list')
+        yield 'producto-list:categoria', productos, {'categoria': self.categorias[0].id, 'disponible': 'true'}
+        yield 'producto-list', productos, {'ordering': '-calificacion_promedio'}
+        # Rango sobre el promedio: se resuelve con producto_promedio_idx, no recorriendo por id
+        yield 'producto-list', productos, {'calificacion_min': '3'}
+        yield 'producto-buscar', reverse('producto-buscar'), {'q': 'choco'}
+        yield 'producto-list:expand', productos, {'expand': 'resenas,categoria'}
+        yield 'producto-list', productos, {'fields': 'id,nombre,precio,imagen_srcset'}
+        yield 'producto-detail', reverse('producto-detail', args=[Producto.objects.first().pk]), {'expand': 'categoria'}
+        ids = ','.join(str(pk) for pk in Producto.objects.order_by('id').values_list('id', flat=True)[:10])
+        yield 'producto-list:ids', productos, {'ids': ids}
+        yield 'categoria-list:ids', reverse('categoria-list'), {'ids': ','.join(str(c.id) for c in self.categorias)}
+        yield 'producto-exportar', reverse('producto-exportar'), {'categoria': self.categorias[0].id}
+        yield 'reseña-exportar', reverse('reseña-exportar'), {'formato': 'csv'}
+        # Los 50 últimos cambios del registro
+        yield 'sincronizar', reverse('sincronizar'), {'token': int(sincronizacion.token_actual()) - 50}
+
+    def medir_todo(self):
+        return [(nombre, url, params, self.medir(url, params)) for nombre, url, params in self.endpoints()]
+
+    # 🧪 Prueba 1: Presupuesto de consultas constante al triplicar los datos
+    def test_presupuesto_no_crece_con_los_datos(self):
+        antes = self.medir_todo()
+        self.sembrar()
+        self.sembrar()
+        despues = self.medir_todo()
+
+        for (nombre, url, params, consultas), (_, _, _, consultas_despues) in zip(antes, despues):
+            with self.subTest(endpoint=nombre, params=params):
+                self.assertLessEqual(len(consultas), PRESUPUESTOS[nombre], '\n'.join(consultas))
+                self.assertEqual(len(consultas_despues), len(consultas), '\n'.join(consultas_despues))
+
+    # 🧪 Prueba 2: Ningún endpoint recorre tablas grandes completas
+    def test_planes_sin_scans(self):
+        for nombre, url, params, consultas in self.medir_todo():
+            if nombre in RECORRIDOS_COMPLETOS:
+                continue
+            with self.subTest(endpoint=nombre, params=params):
+                self.assertSinScans(url, consultas)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Cambio, Categoria, Producto, Reseña
+
+
+class SincronizacionTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tortas = Categoria.objects.create(nombre="Tortas")
+        self.torta = Producto.objects.create(nombre="Torta", descripcion="Rica", precio=Decimal("10.00"),
+                                             categoria=self.tortas)
+        self.galleta = Producto.objects.create(nombre="Galleta", descripcion="Crujiente", precio=Decimal("1.50"),
+                                               categoria=self.tortas)
+        self.token = self.sincronizar().data["token"]
+
+    def sincronizar(self, **parametros):
+        return self.client.get(reverse('sincronizar'), parametros)
+
+    # 🧪 Prueba 1: sin cambios la respuesta es mínima
+    def test_sin_cambios(self):
+        response = self.sincronizar(token=self.token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["token"], self.token)
+        self.assertEqual(response.data["productos"], [])
+        self.assertLess(len(response.content), 300)
+
+    # 🧪 Prueba 2: solo lo escrito desde el token, más los borrados
+    def test_cambios_y_borrados(self):
+        Producto.objects.filter(pk=self.torta.pk).update(precio=Decimal("12.00"))
+        Reseña.objects.create(producto=self.galleta, nombre="Ana", comentario="Rica", calificacion=5)
+        galleta_id = self.galleta.id
+        self.galleta.delete()
+
+        response = self.sincronizar(token=self.token)
+        self.assertEqual([p["id"] for p in response.data["productos"]], [self.torta.id])
+        self.assertEqual(response.data["productos"][0]["precio"], "12.00")
+        self.assertNotIn("resenas", response.data["productos"][0])
+        self.assertEqual(response.data["borrados"]["productos"], [galleta_id])
+        self.assertEqual(len(response.data["borrados"]["resenas"]), 1)
+
+        # Con el token nuevo ya no queda nada pendiente
+        response = self.sincronizar(token=response.data["token"])
+        self.assertEqual(response.data["borrados"]["productos"], [])
+
+    # 🧪 Prueba 3: paginación con hay_mas y consultas constantes
+    def test_paginacion(self):
+        Producto.objects.bulk_create([
+            Producto(nombre=f"P{i}", descripcion="d", precio=Decimal("1.00"), categoria=self.tortas) for i in range(30)
+        ])
+        response = self.sincronizar(token=self.token, limite=20)
+        self.assertTrue(response.data["hay_mas"])
+        self.assertEqual(len(response.data["productos"]), 20)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.sincronizar(token=response.data["token"], limite=20)
+        self.assertFalse(response.data["hay_mas"])
+        self.assertEqual(len(response.data["productos"]), 10)
+        self.assertLessEqual(len(consultas), 5)
+
+    # 🧪 Prueba 4: tokens purgados o inválidos piden resincronizar (410)
+    def test_token_caducado(self):
+        Producto.objects.filter(pk=self.torta.pk).update(stock=3)
+        Cambio.objects.update(creado_en=timezone.now() - timedelta(days=40))
+        salida = StringIO()
+        call_command('purgar_cambios', stdout=salida)
+        self.assertIn("Cambios purgados:", salida.getvalue())
+
+        response = self.sincronizar(token=self.token)
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.sincronizar(token=response.data["token"]).status_code, 200)
+        self.assertEqual(self.sincronizar(token="abc").status_code, 410)
+        self.assertEqual(self.sincronizar(token="999999").status_code, 410)
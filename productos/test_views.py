@@ -1,11 +1,19 @@
 # productos/tests/test_views.py
 
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
+from .models import Categoria, Producto, Reseña, Reserva
 
 class ViewTests(TestCase):
     def setUp(self):
@@ -80,3 +88,312 @@ class ViewTests(TestCase):
         self.assertIn("error", response.data)
 
 
+
+
+class ProductoViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        caches['default'].clear()
+        self.categoria = Categoria.objects.create(nombre="Tortas")
+        self.productos = [
+            Producto.objects.create(
+                nombre=f"Torta {i}",
+                descripcion="Rica",
+                precio=Decimal("10.00"),
+                categoria=self.categoria,
+                stock=10
+            )
+            for i in range(3)
+        ]
+        for producto in self.productos:
+            for i in range(8):
+                Reseña.objects.create(producto=producto, nombre=f"Cliente {i}", comentario="Bien", calificacion=4)
+
+    # 🧪 Prueba 1: El listado no hace una consulta por producto
+    def test_listado_productos_consultas_constantes(self):
+        # Versión del catálogo y productos; las reseñas solo con ?expand=resenas (una consulta más)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('producto-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("resenas", response.data["results"][0])
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('producto-list'), {"expand": "resenas"})
+        self.assertEqual(len(response.data["results"][0]["resenas"]), 5)
+
+    # 🧪 Prueba 2: Solo se embeben las reseñas más recientes
+    @override_settings(PRODUCTOS_RESENAS_EMBEBIDAS=3)
+    def test_resenas_embebidas_limitadas(self):
+        producto = self.productos[0]
+        response = self.client.get(reverse('producto-detail', args=[producto.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["resenas"]), 3)
+        self.assertEqual(response.data["resenas_count"], 8)
+        recientes = list(producto.resenas.order_by('-creado_en', '-id').values_list('id', flat=True)[:3])
+        self.assertEqual([r["id"] for r in response.data["resenas"]], recientes)
+
+    # 🧪 Prueba 3: El listado se pagina por cursor sin COUNT(*)
+    def test_listado_productos_paginado_por_cursor(self):
+        response = self.client.get(reverse('producto-list'), {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual([p["id"] for p in response.data["results"]], [p.id for p in self.productos[:2]])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.productos[2].id])
+        self.assertIsNone(response.data["next"])
+
+    # 🧪 Prueba 4: Las reseñas se paginan de la más reciente a la más antigua
+    def test_listado_resenas_paginado_por_cursor(self):
+        response = self.client.get(reverse('reseña-list'), {"page_size": 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        esperados = list(Reseña.objects.order_by('-creado_en', '-id').values_list('id', flat=True)[:5])
+        self.assertEqual([r["id"] for r in response.data["results"]], esperados)
+        self.assertIsNotNone(response.data["next"])
+
+    # 🧪 Prueba 5: Ordenar y filtrar por calificación promedio
+    def test_orden_y_filtro_por_calificacion(self):
+        mejor = self.productos[1]
+        Reseña.objects.create(producto=mejor, nombre="Ana", comentario="Excelente", calificacion=5)
+        Reseña.objects.bulk_create([
+            Reseña(producto=self.productos[2], nombre="Luis", comentario="Flojo", calificacion=1)
+        ])
+        response = self.client.get(reverse('producto-list'), {"ordering": "-calificacion_promedio"})
+        self.assertEqual([p["id"] for p in response.data["results"]][0], mejor.id)
+
+        response = self.client.get(reverse('producto-list'), {"calificacion_min": "4"})
+        self.assertEqual({p["id"] for p in response.data["results"]}, {self.productos[0].id, mejor.id})
+        # Sin ?ordering=, el filtro lista de mejor a peor valorado (orden de su índice)
+        promedios = [p["calificacion_promedio"] for p in response.data["results"]]
+        self.assertEqual(promedios, sorted(promedios, reverse=True))
+
+    # 🧪 Prueba 6: decrementar_stock conserva sus respuestas 200/400/404
+    def test_decrementar_stock(self):
+        producto = self.productos[0]
+        url = reverse('producto-decrementar-stock', args=[producto.id])
+
+        response = self.client.post(url, {"cantidad": 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Stock actual: 6", response.data["mensaje"])
+
+        response = self.client.post(url, {"cantidad": 7})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Stock actual: 6", response.data["error"])
+
+        for cantidad in ("", "-1", "dos"):
+            response = self.client.post(url, {"cantidad": cantidad})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url_inexistente = reverse('producto-decrementar-stock', args=[producto.id + 100])
+        self.assertEqual(self.client.post(url_inexistente, {"cantidad": 1}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.post(url_inexistente, {}).status_code, status.HTTP_404_NOT_FOUND)
+
+    # 🧪 Prueba 7: Checkout de varias líneas en una sola llamada
+    def test_checkout(self):
+        url = reverse('producto-checkout')
+        lineas = [{"producto": p.id, "cantidad": 2} for p in self.productos]
+        response = self.client.post(url, {"lineas": lineas}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["stock_restante"] for r in response.data["resultados"]], [8, 8, 8])
+
+        response = self.client.post(url, {"lineas": [{"producto": self.productos[0].id, "cantidad": 9}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data["resultados"][0])
+
+        response = self.client.post(url, {"lineas": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # 🧪 Prueba 8: Reservar, convertir y liberar desde la API
+    def test_reservas(self):
+        producto = self.productos[0]
+        response = self.client.post(reverse('reserva-list'), {"producto": producto.id, "cantidad": 6, "ttl": 60})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        reserva_id = response.data["id"]
+
+        detalle = self.client.get(reverse('producto-detail', args=[producto.id]))
+        self.assertEqual((detalle.data["stock"], detalle.data["stock_disponible"]), (10, 4))
+
+        response = self.client.post(reverse('reserva-list'), {"producto": producto.id, "cantidad": 5})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('reserva-convertir', args=[reserva_id]))
+        self.assertEqual(response.data["estado"], "convertida")
+        response = self.client.post(reverse('reserva-liberar', args=[reserva_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Stock editado por debajo de lo reservado: 400, no un error del CHECK
+        reserva_id = self.client.post(reverse('reserva-list'), {"producto": producto.id, "cantidad": 3}).data["id"]
+        self.client.patch(reverse('producto-detail', args=[producto.id]), {"stock": 1}, format='json')
+        response = self.client.post(reverse('reserva-convertir', args=[reserva_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Stock insuficiente", response.data["error"])
+
+    # 🧪 Prueba 9: GET condicional con ETag y Last-Modified
+    def test_get_condicional(self):
+        url = reverse('producto-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        detalle = reverse('categoria-detail', args=[self.categoria.id])
+        etag_detalle = self.client.get(detalle)['ETag']
+        self.assertEqual(self.client.get(detalle, HTTP_IF_NONE_MATCH=etag_detalle).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Cualquier escritura en el catálogo (incluido el stock) cambia la versión
+        self.client.post(reverse('producto-decrementar-stock', args=[self.productos[0].id]), {"cantidad": 1})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        Reseña.objects.filter(producto=self.productos[0]).update(comentario="Editado")
+        self.assertEqual(self.client.get(detalle, HTTP_IF_NONE_MATCH=etag_detalle).status_code, status.HTTP_200_OK)
+
+    # 🧪 Prueba 10: ?fields= reduce la respuesta y el SELECT
+    def test_fields_selecciona_columnas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('producto-list'), {"fields": "id,nombre,precio"})
+        self.assertEqual(list(response.data["results"][0]), ["id", "nombre", "precio"])
+        sql = next(c["sql"] for c in consultas if 'FROM "productos_producto"' in c["sql"])
+        self.assertNotIn('"descripcion"', sql)
+        self.assertNotIn('productos_reserva', sql)
+
+        response = self.client.get(reverse('producto-detail', args=[self.productos[0].id]), {"fields": "nombre,stock"})
+        self.assertEqual(response.data, {"nombre": "Torta 0", "stock": 10})
+
+        # Un campo desconocido es un 400 que lista los válidos, como ?ids=abc
+        response = self.client.get(reverse('producto-list'), {"fields": "id,nombrr"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("nombrr", response.data["fields"][0])
+        self.assertIn("stock_disponible", response.data["fields"][0])
+        response = self.client.get(reverse('producto-detail', args=[self.productos[0].id]), {"fields": "resenas,foo"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # 🧪 Prueba 11: ?expand= embebe reseñas y categoría solo si se piden
+    def test_expand_anida_relaciones(self):
+        response = self.client.get(reverse('producto-list'), {"expand": "categoria"})
+        producto = response.data["results"][0]
+        self.assertNotIn("resenas", producto)
+        self.assertEqual(producto["categoria"]["nombre"], self.categoria.nombre)
+
+        # El detalle sigue embebiendo las reseñas por defecto
+        response = self.client.get(reverse('producto-detail', args=[self.productos[0].id]), {"expand": "categoria"})
+        self.assertEqual(response.data["categoria"]["id"], self.categoria.id)
+        self.assertEqual(len(response.data["resenas"]), 5)
+
+        # Las escrituras no se ven afectadas: categoria sigue siendo un id
+        response = self.client.patch(reverse('producto-detail', args=[self.productos[0].id]) + "?expand=categoria&fields=id",
+                                     {"nombre": "Torta nueva"}, format="json")
+        self.assertEqual(response.data["categoria"], self.categoria.id)
+        self.assertEqual(response.data["nombre"], "Torta nueva")
+
+    # 🧪 Prueba 12: ?ids= trae varios productos en una llamada, en el orden pedido
+    def test_ids_en_una_llamada(self):
+        ids = [self.productos[2].id, 999, self.productos[0].id, self.productos[2].id]
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('producto-list'), {"ids": ",".join(map(str, ids))})
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.productos[2].id, self.productos[0].id])
+        self.assertEqual(response.data["faltantes"], [999])
+        # Completos como el detalle: con sus reseñas, precargadas en una consulta
+        self.assertEqual(len(response.data["results"][0]["resenas"]), 5)
+        self.assertEqual(len([c for c in consultas if 'productos_producto' in c["sql"] or 'productos_reseña' in c["sql"]]), 2)
+
+        response = self.client.get(reverse('categoria-list'), {"ids": f"{self.categoria.id},7"})
+        self.assertEqual([c["nombre"] for c in response.data["results"]], ["Tortas"])
+        self.assertEqual(response.data["faltantes"], [7])
+        self.assertEqual(self.client.get(reverse('producto-list'), {"ids": "1,a"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+
+class CacheRespuestasTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        caches['default'].clear()
+        self.categoria = Categoria.objects.create(nombre="Bebidas")
+        self.producto = Producto.objects.create(
+            nombre="Latte", descripcion="Vainilla", precio=Decimal("9.00"), categoria=self.categoria, stock=5
+        )
+        Reseña.objects.create(producto=self.producto, nombre="Ana", comentario="Rico", calificacion=5)
+
+    # 🧪 Prueba 1: La segunda lectura sale de la caché sin consultar productos ni reseñas
+    def test_acierto_de_cache(self):
+        url = reverse('producto-list')
+        primera = self.client.get(url, {"disponible": "true"})
+        self.assertEqual(primera['X-Cache'], 'MISS')
+        # Solo la consulta de la versión del catálogo (GET condicional)
+        with self.assertNumQueries(1):
+            segunda = self.client.get(url, {"disponible": "true"})
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.json(), primera.json())
+        # Otros filtros son otra entrada
+        self.assertEqual(self.client.get(url, {"disponible": "false"})['X-Cache'], 'MISS')
+
+    # 🧪 Prueba 2: decrementar_stock invalida los productos
+    def test_invalidacion_por_decrementar_stock(self):
+        url = reverse('producto-detail', args=[self.producto.id])
+        self.client.get(url)
+        self.client.post(reverse('producto-decrementar-stock', args=[self.producto.id]), {"cantidad": 2})
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['stock'], 3)
+
+    # 🧪 Prueba 3: La invalidación es precisa por modelo
+    def test_invalidacion_precisa(self):
+        url_resenas = reverse('reseña-list')
+        url_productos = reverse('producto-list')
+        self.client.get(url_resenas)
+        self.client.get(url_productos)
+
+        Categoria.objects.create(nombre="Nueva")
+        self.assertEqual(self.client.get(url_resenas)['X-Cache'], 'HIT')
+        # Los productos dependen de las categorías por ?expand=categoria
+        self.assertEqual(self.client.get(url_productos)['X-Cache'], 'MISS')
+
+        Reseña.objects.create(producto=self.producto, nombre="Luis", comentario="Bien", calificacion=4)
+        self.assertEqual(self.client.get(url_resenas)['X-Cache'], 'MISS')
+        response = self.client.get(url_productos)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['resenas_count'], 2)
+
+    # 🧪 Prueba 4: Renombrar una categoría invalida los productos que la expanden
+    def test_invalidacion_por_categoria_expandida(self):
+        url = reverse('producto-list')
+        primera = self.client.get(url, {"expand": "categoria"})
+        self.assertEqual(primera['X-Cache'], 'MISS')
+        self.assertEqual(primera.data['results'][0]['categoria']['nombre'], "Bebidas")
+
+        response = self.client.patch(reverse('categoria-detail', args=[self.categoria.id]), {"nombre": "Cafés"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        segunda = self.client.get(url, {"expand": "categoria"})
+        self.assertEqual(segunda['X-Cache'], 'MISS')
+        self.assertEqual(segunda.data['results'][0]['categoria']['nombre'], "Cafés")
+
+    # 🧪 Prueba 5: Contadores de aciertos y fallos para administradores
+    def test_estadisticas(self):
+        url = reverse('categoria-list')
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get(url)
+        admin = User.objects.create_superuser(username="admin", password="123456")
+        self.assertEqual(self.client.get(reverse('cache-estadisticas')).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('cache-estadisticas'))
+        self.assertEqual((response.data['aciertos'], response.data['fallos']), (2, 1))
+
+    # 🧪 Prueba 6: Una reserva que vence cambia el ETag y la caché sin esperar a expirar_reservas
+    def test_vencimiento_de_reserva(self):
+        url = reverse('producto-detail', args=[self.producto.id])
+        ahora = timezone.now()
+        Reserva.objects.create(producto=self.producto, cantidad=2, expira_en=ahora + timedelta(minutes=5))
+        primera = self.client.get(url)
+        self.assertEqual(primera.data['stock_disponible'], 3)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=primera['ETag']).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with mock.patch('django.utils.timezone.now', return_value=ahora + timedelta(minutes=6)):
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=primera['Last-Modified']).status_code, status.HTTP_200_OK)
+            segunda = self.client.get(url, HTTP_IF_NONE_MATCH=primera['ETag'])
+        self.assertEqual(segunda.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(segunda['ETag'], primera['ETag'])
+        self.assertEqual(segunda.data['stock_disponible'], 5)
+        self.assertEqual(Reserva.objects.get().estado, Reserva.ACTIVA)
@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+
+from .models import Categoria, Producto, Reseña
+
+
+class VistasAsyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nombre="Tortas")
+        cls.productos = [
+            Producto.objects.create(nombre=f"Torta {i}", descripcion="Rica", precio=Decimal("10.00"),
+                                    categoria=cls.categoria, stock=5)
+            for i in range(5)
+        ]
+        for i in range(3):
+            Reseña.objects.create(producto=cls.productos[0], nombre=f"Cliente {i}", comentario="Buena", calificacion=5)
+
+    def setUp(self):
+        self.client = AsyncClient()
+        caches['default'].clear()
+
+    async def test_lista_paginada_por_keyset(self):
+        url = reverse('async-producto-list')
+        response = await self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        datos = response.json()
+        self.assertEqual([p["id"] for p in datos["results"]], [p.id for p in self.productos[:2]])
+
+        vistos = [p["id"] for p in datos["results"]]
+        while datos["next"]:
+            datos = (await self.client.get(datos["next"])).json()
+            vistos += [p["id"] for p in datos["results"]]
+        self.assertEqual(vistos, [p.id for p in self.productos])
+
+    async def test_lista_igual_que_la_vista_sincrona(self):
+        for params in ({}, {"expand": "resenas,categoria"}, {"fields": "id,nombre,precio,imagen_srcset"}):
+            asincrona = (await self.client.get(reverse('async-producto-list'), params)).json()["results"]
+            sincrona = (await self.client.get(reverse('producto-list'), params)).json()["results"]
+            self.assertEqual(asincrona, sincrona)
+        self.assertEqual(len(asincrona[0]), 4)
+        self.assertNotIn("resenas", sincrona[0])
+
+    async def test_campo_desconocido(self):
+        response = await self.client.get(reverse('async-producto-list'), {"fields": "id,nombrr"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), (await self.client.get(reverse('producto-list'), {"fields": "id,nombrr"})).json())
+
+    async def test_detalle_y_no_encontrado(self):
+        response = await self.client.get(reverse('async-producto-detail', args=[self.productos[0].id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["stock_disponible"], 5)
+
+        response = await self.client.get(reverse('async-categoria-detail', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_resenas_y_categorias(self):
+        response = await self.client.get(reverse('async-resena-list'))
+        self.assertEqual(len(response.json()["results"]), 3)
+        response = await self.client.get(reverse('async-categoria-list'))
+        self.assertEqual(response.json()["results"][0]["nombre"], "Tortas")
+
+    async def test_misma_api_que_la_vista_sincrona(self):
+        # Filtros, ?ordering=, ?ids= y el orden de las reseñas por fecha
+        casos = [
+            ('producto-list', {"disponible": "true", "ordering": "-id", "page_size": 2}),
+            ('producto-list', {"calificacion_min": "4"}),
+            ('producto-list', {"ids": f"{self.productos[1].id},999"}),
+            ('reseña-list', {"page_size": 2}),
+            ('categoria-list', {}),
+        ]
+        for nombre, params in casos:
+            asincrona = (await self.client.get(reverse(f'async-{nombre.replace("ñ", "n")}'), params)).json()
+            sincrona = (await self.client.get(reverse(nombre), params)).json()
+            self.assertEqual(asincrona.pop("results"), sincrona.pop("results"), nombre)
+            # Mismos cursores: solo cambia la ruta de los enlaces
+            self.assertEqual(
+                {clave: valor.replace('/api/async/', '/api/') if isinstance(valor, str) else valor
+                 for clave, valor in asincrona.items()}, sincrona
+            )
+        response = await self.client.get(reverse('async-producto-list'), {"categoria": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_cursor_de_la_vista_sincrona(self):
+        # Un cursor de la API síncrona sirve en la asíncrona y al revés
+        sincrona = (await self.client.get(reverse('producto-list'), {"page_size": 2})).json()
+        cursor = sincrona["next"].split("cursor=")[1].split("&")[0]
+        datos = (await self.client.get(reverse('async-producto-list'), {"page_size": 2, "cursor": cursor})).json()
+        self.assertEqual([p["id"] for p in datos["results"]], [p.id for p in self.productos[2:4]])
+        anterior = (await self.client.get(datos["previous"].replace('/api/async/', '/api/'))).json()
+        self.assertEqual([p["id"] for p in anterior["results"]], [p.id for p in self.productos[:2]])
+
+    async def test_get_condicional_y_cache(self):
+        url = reverse('async-producto-detail', args=[self.productos[0].id])
+        primera = await self.client.get(url)
+        self.assertEqual(primera["X-Cache"], "MISS")
+        self.assertEqual(primera["ETag"], (await self.client.get(reverse('producto-detail', args=[self.productos[0].id])))["ETag"])
+        self.assertEqual((await self.client.get(url))["X-Cache"], "HIT")
+        response = await self.client.get(url, headers={"If-None-Match": primera["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_solo_lectura(self):
+        response = await self.client.post(reverse('async-categoria-list'), {"nombre": "Galletas"})
+        self.assertEqual(response.status_code, 405)
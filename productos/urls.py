@@ -1,12 +1,23 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoriaViewSet, ProductoViewSet, ReseñaViewSet  # 👈 incluimos ReseñaViewSet
+from . import vistas_async
+from .views import CategoriaViewSet, EstadisticasCacheView, ProductoViewSet, ReseñaViewSet, ReservaViewSet, SincronizacionView  # 👈 incluimos ReseñaViewSet
 
 router = DefaultRouter()
 router.register(r'categorias', CategoriaViewSet)
 router.register(r'productos', ProductoViewSet)
 router.register(r'resenas', ReseñaViewSet)  # 👈 nueva ruta para reseñas
+router.register(r'reservas', ReservaViewSet)
 
 urlpatterns = [
+    path('cache/estadisticas/', EstadisticasCacheView.as_view(), name='cache-estadisticas'),
+    path('sincronizar/', SincronizacionView.as_view(), name='sincronizar'),
+    # Lecturas asíncronas del catálogo (ASGI)
+    path('async/categorias/', vistas_async.categorias, name='async-categoria-list'),
+    path('async/categorias/<int:pk>/', vistas_async.categoria, name='async-categoria-detail'),
+    path('async/productos/', vistas_async.productos, name='async-producto-list'),
+    path('async/productos/<int:pk>/', vistas_async.producto, name='async-producto-detail'),
+    path('async/resenas/', vistas_async.resenas, name='async-resena-list'),
+    path('async/resenas/<int:pk>/', vistas_async.resena, name='async-resena-detail'),
     path('', include(router.urls)),
 ]
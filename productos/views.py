@@ -1,25 +1,57 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.contrib.auth.models import User
-from .models import Categoria, Producto, Reseña
-from .serializers import CategoriaSerializer, ProductoSerializer, ReseñaSerializer
+from .models import Categoria, Producto, Reseña, Reserva
+from .serializers import CategoriaSerializer, CheckoutSerializer, ProductoSerializer, ReseñaSerializer, ReservaSerializer
+from .pagination import CursorResenas
+from .filters import OrdenConDesempate, ProductoFilter
+from .mixins import CacheRespuestaMixin, CamposSelectivosMixin, GetCondicionalMixin, ListadoRapidoMixin, PorIdsMixin
+from .rapido import ProductosRapidos, ReseñasRapidas
+from .enrutador_bd import LecturaReplicaMixin
+from .exportacion import ExportacionMixin
+from .masivo import OperacionesMasivasMixin
+from . import cache
+from rest_framework.permissions import IsAdminUser
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .token_serializers import CustomTokenObtainPairSerializer
 from rest_framework.decorators import action # Importar action
-from django.db import transaction # Importar transaction para asegurar atomicidad
+from django.http import Http404
 from django.shortcuts import get_object_or_404 
+from django.conf import settings
+from . import busqueda, inventario, sincronizacion
 
 # 🔹 ViewSet para Categorías
-class CategoriaViewSet(viewsets.ModelViewSet):
+class CategoriaViewSet(LecturaReplicaMixin, GetCondicionalMixin, CacheRespuestaMixin, PorIdsMixin, viewsets.ModelViewSet):
     queryset = Categoria.objects.all()
     serializer_class = CategoriaSerializer
+    cache_depende_de = (Categoria,)
 
 # 🔹 ViewSet para Productos
-class ProductoViewSet(viewsets.ModelViewSet):
+class ProductoViewSet(LecturaReplicaMixin, GetCondicionalMixin, CacheRespuestaMixin, PorIdsMixin, CamposSelectivosMixin, ListadoRapidoMixin, ExportacionMixin, OperacionesMasivasMixin, viewsets.ModelViewSet):
     queryset = Producto.objects.all()
     serializer_class = ProductoSerializer
-    filterset_fields = ['categoria', 'disponible']
+    lista_rapida_class = ProductosRapidos
+    # ?fields=nombre,precio,imagen y ?expand=resenas,categoria; los listados no embeben reseñas por defecto
+    acciones_lista = ('list', 'buscar', 'exportar')
+    expandir_por_defecto = ('resenas',)
+    # Producto no guarda fecha de alta: el rango de fechas filtra por última modificación
+    exportacion_campo_fecha = 'actualizado_en'
+    exportacion_campo_categoria = 'categoria'
+    # Reseñas embebidas y agregados, stock disponible según las reservas y ?expand=categoria
+    cache_depende_de = (Producto, Reseña, Reserva, Categoria)
+    # stock_disponible cambia cuando vence una reserva, sin escritura de por medio
+    vence_con_reservas = True
+    filter_backends = [DjangoFilterBackend, OrdenConDesempate]
+    filterset_class = ProductoFilter
+    ordering_fields = ['id', 'precio', 'calificacion_promedio', 'resenas_count']
+    # ?calificacion_min= lista de mejor a peor valorado, por producto_promedio_idx
+    orden_por_filtro = {'calificacion_min': ('-calificacion_promedio', 'id')}
+
+    def get_queryset(self):
+        # Solo lo que pide la respuesta; las reseñas se precargan en una sola consulta para evitar el N+1
+        return super().get_queryset().para_campos(**self.opciones_campos())
 
     @action(detail=True, methods=['post'])
     def decrementar_stock(self, request, pk=None):
@@ -27,35 +59,143 @@ class ProductoViewSet(viewsets.ModelViewSet):
         Decrementa el stock de un producto específico.
         Requiere un 'cantidad' en el cuerpo de la solicitud.
         """
-        producto = get_object_or_404(Producto, pk=pk)
+        try:
+            producto_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
         cantidad_a_decrementar = request.data.get('cantidad')
+        error = None
 
         if not cantidad_a_decrementar:
-            return Response({"error": "La cantidad a decrementar es requerida."}, status=status.HTTP_400_BAD_REQUEST)
+            error = "La cantidad a decrementar es requerida."
+        else:
+            try:
+                cantidad_a_decrementar = int(cantidad_a_decrementar)
+                if cantidad_a_decrementar <= 0:
+                    error = "La cantidad debe ser un número positivo."
+            except ValueError:
+                error = "La cantidad debe ser un número entero."
 
+        if error:
+            # Un producto inexistente sigue respondiendo 404 antes que cualquier 400
+            get_object_or_404(Producto, pk=producto_id)
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Un único UPDATE condicional: sin lecturas previas ni condiciones de carrera
+        try:
+            nombre, stock = inventario.decrementar_stock(producto_id, cantidad_a_decrementar)
+        except Producto.DoesNotExist:
+            raise Http404
+        except inventario.StockInsuficiente as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"mensaje": f"Stock de {nombre} decremented en {cantidad_a_decrementar}. Stock actual: {stock}"}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def buscar(self, request):
+        """
+        Búsqueda de texto completo por nombre y descripción, ordenada por relevancia.
+        Parámetros: q (admite prefijos), limite (máx. 100) y resenas=1 para buscar
+        también en los comentarios de las reseñas.
+        """
         try:
-            cantidad_a_decrementar = int(cantidad_a_decrementar)
-            if cantidad_a_decrementar <= 0:
-                return Response({"error": "La cantidad debe ser un número positivo."}, status=status.HTTP_400_BAD_REQUEST)
+            limite = min(max(int(request.query_params.get('limite', 20)), 1), 100)
         except ValueError:
-            return Response({"error": "La cantidad debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
-
-        with transaction.atomic():
-            # Volvemos a cargar el producto dentro de la transacción para asegurar que tenemos el stock más reciente.
-            # Esto es importante para evitar condiciones de carrera en entornos concurrentes.
-            producto.refresh_from_db()
-            
-            if producto.stock >= cantidad_a_decrementar:
-                producto.stock -= cantidad_a_decrementar
-                producto.save()
-                return Response({"mensaje": f"Stock de {producto.nombre} decremented en {cantidad_a_decrementar}. Stock actual: {producto.stock}"}, status=status.HTTP_200_OK)
-            else:
-                return Response({"error": f"Stock insuficiente para {producto.nombre}. Stock actual: {producto.stock}"}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"error": "El límite debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+        incluir_resenas = request.query_params.get('resenas') in ('1', 'true', 'True')
+
+        ids = busqueda.buscar_ids(request.query_params.get('q', ''), limite, incluir_resenas)
+        productos = self.get_queryset().in_bulk(ids)
+        encontrados = [productos[producto_id] for producto_id in ids if producto_id in productos]
+        serializer = self.get_serializer(encontrados, many=True)
+        return Response({"results": serializer.data})
+
+    @action(detail=False, methods=['post'])
+    def checkout(self, request):
+        """
+        Descuenta el stock de todo el carrito en una sola transacción (todo o nada).
+        Cuerpo: {"lineas": [{"producto": id, "cantidad": n}, ...]}
+        """
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lineas = [(linea['producto'], linea['cantidad']) for linea in serializer.validated_data['lineas']]
+
+        ok, resultados = inventario.procesar_checkout(lineas)
+        if not ok:
+            return Response({"error": "No se pudo completar la compra.", "resultados": resultados}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"resultados": resultados}, status=status.HTTP_200_OK)
 
 # 🔹 ViewSet para Reseñas
-class ReseñaViewSet(viewsets.ModelViewSet):
+class ReseñaViewSet(LecturaReplicaMixin, GetCondicionalMixin, CacheRespuestaMixin, ListadoRapidoMixin, ExportacionMixin, OperacionesMasivasMixin, viewsets.ModelViewSet):
     queryset = Reseña.objects.all()
     serializer_class = ReseñaSerializer
+    lista_rapida_class = ReseñasRapidas
+    exportacion_campo_fecha = 'creado_en'
+    exportacion_campo_categoria = 'producto__categoria'
+    # Las reseñas cambian los agregados de su producto
+    masivo_modelos_afectados = (Reseña, Producto)
+    cache_depende_de = (Reseña,)
+    pagination_class = CursorResenas
+
+# 🔹 ViewSet para Reservas de stock (carritos)
+class ReservaViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    queryset = Reserva.objects.all()
+    serializer_class = ReservaSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+        try:
+            reserva = inventario.reservar(datos['producto'].pk, datos['cantidad'], datos.get('ttl'))
+        except inventario.StockInsuficiente as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(reserva).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def convertir(self, request, pk=None):
+        """Convierte la reserva en venta: descuenta su cantidad del stock."""
+        reserva = self.get_object()
+        try:
+            convertida = inventario.convertir_reserva(reserva.pk)
+        except inventario.StockInsuficiente as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if convertida is None:
+            return Response({"error": "La reserva no está activa."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(convertida).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def liberar(self, request, pk=None):
+        """Libera la reserva y devuelve sus unidades al stock disponible."""
+        reserva = self.get_object()
+        if not inventario.liberar_reserva(reserva.pk):
+            return Response({"error": "La reserva no está activa."}, status=status.HTTP_400_BAD_REQUEST)
+        reserva.refresh_from_db()
+        return Response(self.get_serializer(reserva).data, status=status.HTTP_200_OK)
+
+# 🔹 Aciertos y fallos de la caché de respuestas del catálogo
+class EstadisticasCacheView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache.estadisticas())
+
+# 🔹 Sincronización incremental para la app offline (ver productos/sincronizacion.py)
+class SincronizacionView(APIView):
+    def get(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return Response({"token": sincronizacion.token_actual()}, status=status.HTTP_200_OK)
+        maximo = settings.PRODUCTOS_SINCRONIZACION_LIMITE
+        try:
+            limite = min(max(int(request.query_params.get('limite', maximo)), 1), maximo)
+        except ValueError:
+            return Response({"error": "El límite debe ser un número entero."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            datos = sincronizacion.cambios_desde(token, limite, {'request': request})
+        except sincronizacion.TokenCaducado as e:
+            # El cliente descarga el catálogo completo y continúa con el token nuevo
+            return Response({"error": str(e), "token": sincronizacion.token_actual()}, status=status.HTTP_410_GONE)
+        return Response(datos, status=status.HTTP_200_OK)
 
 # ✅ Vista personalizada para registrar usuarios
 class RegistroView(APIView):
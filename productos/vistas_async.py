@@ -0,0 +1,141 @@
+"""
+Vistas asíncronas de solo lectura del catálogo para despliegues ASGI.
+
+Responden lo mismo que `list` y `retrieve` de los ViewSets: toman de la vista
+síncrona el queryset (`?fields=`/`?expand=` en productos), los filtros, el
+`?ordering=`, la paginación por cursor (mismo parámetro `cursor` y mismos
+enlaces `next`/`previous`), el ETag y la caché de respuestas. La diferencia es
+cómo se hace el trabajo: la página se lee con el ORM asíncrono (`aiterator`,
+`aget`) y se serializa en el propio bucle de eventos; lo que solo valida o
+consulta una fila suelta (filtros, versión del catálogo) pasa por
+`sync_to_async`. La API navegable solo existe en la API síncrona.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from . import cache
+from .enrutador_bd import leyendo_de_replica
+from .renderers import ORJSONRenderer
+from .views import CategoriaViewSet, ProductoViewSet, ReseñaViewSet
+
+def _json(datos, status=200):
+    return HttpResponse(ORJSONRenderer().render(datos), status=status, content_type=ORJSONRenderer.media_type)
+
+
+def _vista(request, viewset, accion, **kwargs):
+    """Instancia del ViewSet síncrono para la petición, como la crearía `as_view()`."""
+    drf = Request(request)
+    # Las respuestas son siempre JSON: mismo ETag y misma clave de caché que ?format=json
+    drf.accepted_renderer = ORJSONRenderer()
+    drf.accepted_media_type = ORJSONRenderer.media_type
+    return viewset(request=drf, format_kwarg=None, action=accion, args=(), kwargs=kwargs)
+
+
+def _filtrado(vista):
+    # Los filtros pueden validar contra la base de datos (p. ej. ?categoria=)
+    return vista.filter_queryset(vista.get_queryset())
+
+
+async def _responder(vista, generar):
+    """GetCondicionalMixin y CacheRespuestaMixin con `generar()` en lugar de la vista."""
+    request = vista.request
+    etag, ultima_modificacion = await sync_to_async(vista.etiqueta_condicional)(request)
+    response = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+    if response is None:
+        response = await _cacheada(vista, generar)
+        if response.status_code != 200:
+            return response
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(ultima_modificacion)
+    return response
+
+
+async def _cacheada(vista, generar):
+    almacen = cache.obtener_cache()
+    clave = await sync_to_async(vista.clave_cache)(vista.request)
+    datos = await almacen.aget(clave)
+    await sync_to_async(cache.registrar)(acierto=datos is not None)
+    if datos is not None:
+        response = _json(datos)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    try:
+        with leyendo_de_replica():
+            datos = await generar()
+    except ValidationError as error:
+        return _json(error.detail, status=400)
+    except vista.queryset.model.DoesNotExist:
+        return _json({'detail': 'No encontrado.'}, status=404)
+    await almacen.aset(clave, datos, settings.PRODUCTOS_CACHE_TIMEOUT)
+    response = _json(datos)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+async def _listar(request, viewset):
+    vista = _vista(request, viewset, 'list')
+
+    async def generar():
+        # ?ids= como PorIdsMixin: objetos completos en el orden pedido y los que faltan
+        ids = vista.ids_pedidos() if hasattr(vista, 'ids_pedidos') else None
+        if ids is not None:
+            objetos = await vista.get_queryset().ain_bulk(ids)
+            return {
+                'results': vista.get_serializer([objetos[pk] for pk in ids if pk in objetos], many=True).data,
+                'faltantes': [pk for pk in ids if pk not in objetos],
+            }
+        queryset = await sync_to_async(_filtrado)(vista)
+        paginador = vista.paginator
+        objetos = await paginador.apaginate_queryset(queryset, vista.request, vista)
+        return {
+            'next': paginador.get_next_link(),
+            'previous': paginador.get_previous_link(),
+            'results': vista.get_serializer(objetos, many=True).data,
+        }
+    return await _responder(vista, generar)
+
+
+async def _detalle(request, viewset, pk):
+    vista = _vista(request, viewset, 'retrieve', pk=pk)
+
+    async def generar():
+        queryset = await sync_to_async(_filtrado)(vista)
+        return vista.get_serializer(await queryset.aget(pk=pk)).data
+    return await _responder(vista, generar)
+
+
+@require_safe
+async def categorias(request):
+    return await _listar(request, CategoriaViewSet)
+
+
+@require_safe
+async def categoria(request, pk):
+    return await _detalle(request, CategoriaViewSet, pk)
+
+
+@require_safe
+async def productos(request):
+    return await _listar(request, ProductoViewSet)
+
+
+@require_safe
+async def producto(request, pk):
+    return await _detalle(request, ProductoViewSet, pk)
+
+
+@require_safe
+async def resenas(request):
+    return await _listar(request, ReseñaViewSet)
+
+
+@require_safe
+async def resena(request, pk):
+    return await _detalle(request, ReseñaViewSet, pk)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,7 +47,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # debe ir arriba
+    'productos.enrutador_bd.PrimarioTrasEscrituraMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'productos.compresion.CompresionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,13 +81,50 @@ WSGI_APPLICATION = 'sweetify.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# PRAGMAs que se ejecutan al abrir cada conexión SQLite (configurables por entorno):
+# WAL permite leer mientras se escribe, busy_timeout espera al bloqueo en lugar de
+# fallar con "database is locked" y synchronous=NORMAL es seguro con WAL.
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    # Negativo = tamaño en KiB (64 MiB)
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Conexiones persistentes entre peticiones
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}={valor}' for pragma, valor in SQLITE_PRAGMAS.items()),
+            # BEGIN IMMEDIATE: las transacciones de escritura toman el bloqueo al empezar
+            # y esperan el busy_timeout, en lugar de fallar al pasar de lectura a escritura
+            'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
     }
 }
 
+# Réplica de solo lectura opcional. En local sirve otro archivo SQLite como sustituto:
+#   sqlite3 db.sqlite3 ".backup replica.sqlite3" && DATABASE_REPLICA=replica.sqlite3 python manage.py runserver
+REPLICA_ALIAS = 'replica'
+if os.environ.get('DATABASE_REPLICA'):
+    DATABASES[REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DATABASE_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['productos.enrutador_bd.EnrutadorReplica']
+# Segundos que un cliente sigue leyendo del primario después de escribir
+REPLICA_STICKY_SEGUNDOS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,18 +166,87 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-import os
 # Archivos multimedia
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Las subidas llevan el hash de su contenido en el nombre (URLs inmutables)
+STORAGES = {
+    'default': {'BACKEND': 'productos.media.ContenidoHashStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Servir /media/ con productos.media.servir_media también con DEBUG = False
+MEDIA_SERVIR = False
+# Cache-Control max-age de los archivos sin hash en el nombre
+MEDIA_CACHE_SEGUNDOS = 3600
+# None (Django envía los bytes), 'x-accel-redirect' (nginx) o 'x-sendfile' (Apache/lighttpd)
+MEDIA_SENDFILE = None
+# Prefijo de la location `internal` de nginx que apunta a MEDIA_ROOT
+MEDIA_X_ACCEL_PREFIJO = '/media-interna/'
+
 # Configuración de Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_PAGINATION_CLASS': 'productos.pagination.CursorPorId',
+    'PAGE_SIZE': 20,
+    # JSON con orjson (mismos bytes que JSONRenderer; sin orjson se usa el de DRF)
+    'DEFAULT_RENDERER_CLASSES': [
+        'productos.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'productos.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Filas por trozo en las exportaciones en streaming (/api/productos/exportar/, /api/resenas/exportar/)
+PRODUCTOS_EXPORTACION_CHUNK = 2000
+
+# Máximo de ids en ?ids= de /api/productos/ y /api/categorias/
+PRODUCTOS_IDS_MAXIMO = 100
+
+# /api/sincronizar/: cambios por respuesta y días que se conservan (manage.py purgar_cambios)
+PRODUCTOS_SINCRONIZACION_LIMITE = 500
+PRODUCTOS_SINCRONIZACION_RETENCION_DIAS = 30
+
+# Máximo de elementos por petición en /api/productos/bulk/ y /api/resenas/bulk/
+PRODUCTOS_MASIVO_MAXIMO = 1000
+
+# Destino de `manage.py exportar_catalogo`: JSON estático por categoría para nginx / CDN
+CATALOGO_ESTATICO_DIR = os.environ.get('CATALOGO_ESTATICO_DIR', os.path.join(BASE_DIR, 'catalogo_estatico'))
+
+# Compresión de respuestas (productos/compresion.py); brotli solo si el paquete está instalado
+COMPRESION_MINIMO_BYTES = 1024
+COMPRESION_NIVEL_GZIP = 6
+COMPRESION_NIVEL_BROTLI = 5
+
 # Permitir peticiones desde cualquier origen (desarrollo)
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Número máximo de reseñas embebidas en cada producto (el resto se pagina en /api/resenas/)
+PRODUCTOS_RESENAS_EMBEBIDAS = 5
+
+# Duración por defecto (segundos) de las reservas de stock de un carrito
+PRODUCTOS_RESERVA_TTL = 15 * 60
+
+# Variantes responsive de las imágenes de productos (anchos en px, calidad WebP)
+PRODUCTOS_VARIANTES_ANCHOS = (320, 640, 1024)
+PRODUCTOS_VARIANTES_CALIDAD = 80
+PRODUCTOS_VARIANTES_PROCESOS = 2
+# True genera las variantes dentro de la petición (útil en pruebas)
+PRODUCTOS_VARIANTES_SINCRONAS = False
+
+# Caché de respuestas de las vistas de lectura del catálogo (productos/cache.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sweetify',
+    }
+}
+PRODUCTOS_CACHE_ALIAS = 'default'
+PRODUCTOS_CACHE_TIMEOUT = 300
@@ -1,9 +1,9 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenRefreshView
 from productos.views import RegistroView, CustomTokenObtainPairView  # ✅ Importar vista personalizada
+from productos.media import servir_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -19,5 +19,8 @@ urlpatterns = [
     path('api/registro/', RegistroView.as_view(), name='registro'),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Archivos multimedia con ETag, Range y Cache-Control (o delegados a nginx con X-Accel-Redirect)
+if settings.DEBUG or settings.MEDIA_SERVIR:
+    urlpatterns += [
+        re_path(r'^%s(?P<ruta>.+)$' % settings.MEDIA_URL.lstrip('/'), servir_media, name='media'),
+    ]